@@ -0,0 +1,154 @@
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.knowledge import job_title
+from app.llm import complete
+from app.logging_config import get_logger
+from app.model import CandidateCV, JobMatchBatch, JobMatchResult
+from app.prompts import MATCHER_SYSTEM, batch_match_prompt
+from app.validation import validate_many
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_RETRIES = 2
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.I)
+
+
+class BatchMatchError(Exception):
+    """Raised when some job descriptions still have no valid match result after all retries."""
+
+    def __init__(self, failed_job_ids: List[str], results: List[JobMatchResult]):
+        super().__init__(f"No valid match result for job(s): {', '.join(failed_job_ids)}")
+        self.failed_job_ids = failed_job_ids
+        self.results = results
+
+
+def _raw_items(raw: Any) -> List[Any]:
+    """Return the list of per-job items in a batch reply, tolerating partial or loose shapes."""
+    if isinstance(raw, BaseModel):
+        raw = raw.model_dump(mode="json")
+    if isinstance(raw, str):
+        raw = json.loads(_CODE_FENCE.sub("", raw.strip()))
+    if isinstance(raw, dict):
+        raw = raw.get("matches", [])
+    return raw if isinstance(raw, list) else []
+
+
+def resolve_job_ids(
+    items: List[Any],
+    jobs: List[Dict[str, Any]],
+    known_ids: Iterable[str] = (),
+    by_position: bool = True,
+) -> List[Optional[str]]:
+    """
+    Work out which job each match result item belongs to.
+
+    An item is matched by its job_id (one of jobs, or of known_ids), then by
+    job_title, then, when by_position is set and there is one item per job,
+    by its position.
+
+    Returns:
+        One job_id per item, None for the items that could not be resolved
+    """
+    job_ids = [job.get("job_id") for job in jobs]
+    ids = set(job_ids) | set(known_ids)
+    by_title = {job_title(job).lower(): job.get("job_id") for job in jobs}
+    resolved: List[Optional[str]] = []
+    for position, item in enumerate(items):
+        job_id = None
+        if isinstance(item, dict):
+            job_id = item.get("job_id")
+            if job_id not in ids:
+                job_id = by_title.get(str(item.get("job_title", "")).lower())
+            if job_id is None and by_position and position < len(job_ids) and len(items) == len(job_ids):
+                job_id = job_ids[position]
+        resolved.append(job_id)
+    return resolved
+
+
+def parse_batch(raw: Any, jobs: List[Dict[str, Any]]) -> Tuple[Dict[str, JobMatchResult], List[str]]:
+    """
+    Validate each item of a batch reply on its own and pair it with its job.
+
+    Items are matched to jobs by job_id, then by job_title, then by position,
+    and validated together (app.validation.validate_many). Invalid values are
+    coerced or dropped where possible; one malformed item does not invalidate
+    the others.
+
+    Returns:
+        (job_id -> JobMatchResult for the valid items, job_ids still missing a valid result)
+    """
+    job_ids = [job.get("job_id") for job in jobs]
+    try:
+        items = _raw_items(raw)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Unparseable batch match reply: {e}")
+        items = []
+    paired: List[Tuple[str, Dict[str, Any]]] = [
+        (job_id, {**item, "job_id": job_id}) for item, job_id in zip(items, resolve_job_ids(items, jobs)) if job_id
+    ]
+
+    # one validation call for the whole batch; invalid items are isolated, not repaired here
+    results: Dict[str, JobMatchResult] = {}
+    validated = validate_many([item for _, item in paired], JobMatchResult)
+    for (job_id, _), result in zip(paired, validated):
+        if result is None:
+            logger.debug(f"Invalid match result for {job_id}")
+        elif job_id not in results:
+            results[job_id] = result
+
+    return results, [job_id for job_id in job_ids if job_id not in results]
+
+
+def match_candidate_batch(
+    cv: CandidateCV,
+    jobs: List[Dict[str, Any]],
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    complete_fn: Callable[..., Any] = complete,
+    model: Optional[str] = None,
+) -> List[JobMatchResult]:
+    """
+    Match one candidate against all jobs with a single structured call.
+
+    The CV is sent once together with every job description and the reply is a
+    JobMatchBatch. Items that fail validation (or are missing) are retried in a
+    smaller batch holding only those jobs, up to max_retries times.
+
+    Args:
+        cv: Candidate to match
+        jobs: Job description dicts (each with a job_id)
+        max_retries: Extra calls allowed for jobs whose result was invalid
+        complete_fn: Function performing the model call (see app.llm.complete)
+        model: Model name (default: MODEL env var)
+
+    Returns:
+        One JobMatchResult per job, in the order of jobs
+
+    Raises:
+        BatchMatchError: if some jobs still have no valid result after the retries
+    """
+    by_id = {job.get("job_id"): job for job in jobs}
+    results: Dict[str, JobMatchResult] = {}
+    pending = list(jobs)
+
+    for attempt in range(max_retries + 1):
+        raw = complete_fn(batch_match_prompt(cv, pending), JobMatchBatch, model=model, system=MATCHER_SYSTEM)
+        valid, failed = parse_batch(raw, pending)
+        results.update(valid)
+        if not failed:
+            break
+        logger.info(
+            f"Batch match for {cv.contact_information.full_name}: {len(failed)}/{len(pending)} "
+            f"job(s) invalid on attempt {attempt + 1}, retrying only those"
+        )
+        pending = [by_id[job_id] for job_id in failed]
+
+    ordered = [results[job.get("job_id")] for job in jobs if job.get("job_id") in results]
+    missing = [job.get("job_id") for job in jobs if job.get("job_id") not in results]
+    if missing:
+        raise BatchMatchError(missing, ordered)
+    return ordered
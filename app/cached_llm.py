@@ -0,0 +1,96 @@
+from typing import Any, Optional
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+
+from app.dispatcher import PRIORITY_BULK, LLMDispatcher, estimate_tokens, get_default_dispatcher
+from app.llm import EXPECTED_COMPLETION_TOKENS, model_name
+from app.llm_cache import LLMResponseCache, cache_key, get_default_cache
+from app.logging_config import get_logger
+from app.telemetry import Span, span
+
+logger = get_logger(__name__)
+
+
+class CachedLLM(BaseLLM):
+    """
+    crewai LLM wrapper that serves repeated agent prompts from the LLM response cache.
+
+    Can be passed as the `llm` of a crew agent. Calls that offer tools are not
+    cached, since tool-calling replies depend on live tool state and are not
+    safe to replay, so only tool-less agent calls benefit. The agents of
+    app.crew are still to be written and do not use it yet: on the crew path
+    (app.main.run) nothing is cached. The other pipelines call app.llm.complete,
+    which uses the same cache directly. Cache misses go through the
+    rate-limited LLM dispatcher when one is configured.
+    """
+
+    def __init__(
+        self,
+        llm: Optional[BaseLLM] = None,
+        cache: Optional[LLMResponseCache] = None,
+        dispatcher: Optional[LLMDispatcher] = None,
+        priority: int = PRIORITY_BULK,
+        **kwargs,
+    ):
+        self.inner = llm or LLM(model=model_name(), **kwargs)
+        super().__init__(model=self.inner.model, temperature=self.inner.temperature)
+        self.stop = self.inner.stop
+        self.cache = cache or get_default_cache()
+        self.dispatcher = dispatcher or get_default_dispatcher()
+        self.priority = priority
+
+    def _call_inner(self, messages, s: Span, *args) -> Any:
+        text = messages if isinstance(messages, str) else " ".join(str(m.get("content") or "") for m in messages)
+        prompt_tokens = estimate_tokens(text)
+        if self.dispatcher is None:
+            reply = self.inner.call(messages, *args)
+        else:
+            future = self.dispatcher.submit(
+                lambda: self.inner.call(messages, *args),
+                priority=self.priority,
+                tokens=prompt_tokens + EXPECTED_COMPLETION_TOKENS,
+            )
+            try:
+                reply = future.result()
+            finally:
+                s.set(retries=getattr(future, "retries", 0))
+        s.set(prompt_tokens=prompt_tokens, completion_tokens=estimate_tokens(str(reply)))
+        return reply
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+    ) -> Any:
+        with span("llm", model=self.model, agent=getattr(from_agent, "role", None)) as s:
+            if self.cache is None or tools:
+                return self._call_inner(messages, s, tools, callbacks, available_functions, from_task, from_agent)
+
+            response_model = getattr(self.inner, "response_format", None)
+            if not (isinstance(response_model, type) and hasattr(response_model, "model_json_schema")):
+                response_model = None
+            key = cache_key(self.model, messages, response_model, self.temperature)
+            cached = self.cache.get(key)
+            if cached is not None:
+                s.set(cache="hit")
+                return cached
+
+            s.set(cache="miss")
+            reply = self._call_inner(messages, s, tools, callbacks, available_functions, from_task, from_agent)
+            if isinstance(reply, str):
+                self.cache.put(key, self.model, reply)
+            return reply
+
+    def supports_function_calling(self) -> bool:
+        return getattr(self.inner, "supports_function_calling", lambda: False)()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
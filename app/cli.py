@@ -0,0 +1,287 @@
+"""
+Command-line interface: python -m app.cli <command>.
+
+    extract   PDF -> txt for new or changed CVs
+    analyze   txt -> CandidateCV JSON (analyzer LLM calls)
+    match     CandidateCV JSON -> match results (batched LLM calls, or --local scoring into --local-dir)
+    run       the full crew pipeline (app.main.run)
+    status    what each stage still has to do, without running anything
+    daemon    stay up: process new PDFs in the CV folder and serve POST /match (app.daemon)
+
+Every command works incrementally from the pipeline manifest (use --all to
+redo everything) and the folders can be overridden with flags. Modules are
+imported inside the commands that need them: this module itself only
+imports argparse, `extract` and `status` never import crewai, and only
+`run` loads the crew and its knowledge stack, so short cron / service
+invocations start fast.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+def _inputs(args: argparse.Namespace) -> Dict[str, str]:
+    return {
+        "pdf_files_path": args.cv_dir,
+        "txt_files_path": args.txt_dir,
+        "json_files_path": args.json_dir,
+        "matches_output_path": args.matches_dir,
+    }
+
+
+def _plan(args: argparse.Namespace):
+    from app.manifest import PipelineManifest
+
+    manifest = PipelineManifest.load(args.manifest)
+    return manifest, manifest.plan(_inputs(args), knowledge_dir=args.knowledge_dir)
+
+
+def _pending(stems: List[str], directory: str, suffix: str) -> List[str]:
+    """Stems whose input file exists (an earlier stage may have failed for the others)."""
+    return [stem for stem in stems if os.path.exists(os.path.join(directory, f"{stem}{suffix}"))]
+
+
+def cmd_extract(args: argparse.Namespace) -> int:
+    from app.manifest import PipelinePlan
+    from app.pdf_extraction import batch_extract
+
+    manifest, plan = _plan(args)
+    stems = manifest.stems(args.cv_dir) if args.all else plan.extract
+    if not stems:
+        print("Nothing to extract")
+        return 0
+    summary = batch_extract(
+        args.cv_dir,
+        args.txt_dir,
+        max_workers=args.workers,
+        file_paths=[os.path.join(args.cv_dir, f"{stem}.pdf") for stem in stems],
+    )
+    extracted = [
+        os.path.splitext(os.path.basename(result.file_path))[0] for result in summary.results if result.status == "success"
+    ]
+    manifest.record(_inputs(args), PipelinePlan(extract=stems), PipelinePlan(extract=extracted), update_jobs=False)
+    manifest.save()
+    for result in summary.results:
+        if result.status == "error":
+            print(f"failed: {os.path.basename(result.file_path)}: {result.error}", file=sys.stderr)
+    print(f"Extracted {summary.succeeded}/{summary.total} PDF(s) in {summary.seconds:.2f}s")
+    return 1 if summary.failed else 0
+
+
+def cmd_analyze(args: argparse.Namespace) -> int:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.manifest import PipelinePlan
+    from app.streaming import analyze_cv_text
+    from app.telemetry import finish_run, span
+
+    manifest, plan = _plan(args)
+    stems = manifest.stems(args.cv_dir) if args.all else plan.analyze
+    stems = _pending(stems, args.txt_dir, ".txt")
+    if not stems:
+        print("Nothing to analyze")
+        return 0
+    os.makedirs(args.json_dir, exist_ok=True)
+    failed: List[str] = []
+
+    def analyze(stem: str) -> None:
+        try:
+            with span("analyze", cv=stem) as s:
+                with open(os.path.join(args.txt_dir, f"{stem}.txt"), "r", encoding="utf-8") as f:
+                    cv_text = f.read()
+                s.set(chars=len(cv_text))
+                cv = analyze_cv_text(cv_text, f"{stem}.pdf")
+            with open(os.path.join(args.json_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+                f.write(cv.model_dump_json(indent=2))
+        except Exception as e:
+            print(f"failed: {stem}: {e}", file=sys.stderr)
+            failed.append(stem)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        list(pool.map(analyze, stems))
+    analyzed = [stem for stem in stems if stem not in failed]
+    manifest.record(_inputs(args), PipelinePlan(analyze=stems), PipelinePlan(analyze=analyzed), update_jobs=False)
+    manifest.save()
+    finish_run()
+    print(f"Analyzed {len(stems) - len(failed)}/{len(stems)} CV(s) in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+def cmd_match(args: argparse.Namespace) -> int:
+    if args.local:
+        # deterministic rule-based scores for every candidate, no LLM calls; written apart from the
+        # LLM match results and left out of the manifest and match store, which track those
+        from app.scoring import score_all, write_match_results
+
+        started = time.perf_counter()
+        engine, matrix = score_all(args.json_dir, args.knowledge_dir)
+        recommend_fn = None
+        if args.recommend:
+            from app.scoring import llm_recommendation as recommend_fn
+        written = write_match_results(engine, matrix, args.local_dir, recommend_fn)
+        print(f"Scored {len(written)} candidate(s) into {args.local_dir} in {time.perf_counter() - started:.2f}s")
+        return 0
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.batch_matching import match_candidate_batch
+    from app.jd_delta import apply_jd_delta, diff_jobs
+    from app.knowledge import load_job_descriptions
+    from app.match_store import MatchStore
+    from app.model import CandidateCV
+    from app.telemetry import finish_run, span
+
+    manifest, plan = _plan(args)
+    inputs = _inputs(args)
+    match_store = MatchStore.from_env()
+    started = time.perf_counter()
+
+    jobs = load_job_descriptions(args.knowledge_dir)
+    delta = diff_jobs(plan.job_hashes, manifest.job_hashes, plan.jd_set_hash, manifest.jd_set_hash)
+    if not args.all and not delta.is_empty():
+        # only match processed candidates against new / edited JDs
+        apply_jd_delta(inputs, jobs, delta, manifest, match_store=match_store)
+        manifest.save()
+        manifest, plan = _plan(args)
+    stems = _pending(manifest.stems(args.cv_dir) if args.all else plan.match, args.json_dir, ".json")
+    os.makedirs(args.matches_dir, exist_ok=True)
+    failed: List[str] = []
+
+    def match(stem: str) -> None:
+        try:
+            with span("match", cv=stem, jobs=len(jobs)):
+                with open(os.path.join(args.json_dir, f"{stem}.json"), "r", encoding="utf-8") as f:
+                    cv = CandidateCV.model_validate_json(f.read())
+                results = sorted(match_candidate_batch(cv, jobs), key=lambda r: r.overall_score, reverse=True)
+            with open(os.path.join(args.matches_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+                json.dump([r.model_dump(mode="json") for r in results], f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"failed: {stem}: {e}", file=sys.stderr)
+            failed.append(stem)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        list(pool.map(match, stems))
+
+    if not stems:
+        print("Nothing to match")
+        return 0
+    matched = [stem for stem in stems if stem not in failed]
+    attempted = plan.model_copy(update={"extract": [], "analyze": [], "match": stems})
+    manifest.record(inputs, attempted, attempted.model_copy(update={"match": matched}))
+    manifest.save()
+    if match_store is not None:
+        match_store.import_results_dir(args.matches_dir, candidate_ids=matched)
+    finish_run()
+    print(f"Matched {len(matched)}/{len(stems)} candidate(s) in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    from app.main import run
+
+    run(_inputs(args), knowledge_dir=args.knowledge_dir, manifest_path=args.manifest)
+    return 0
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    from app.daemon import main as run_daemon
+
+    run_daemon(args)
+    return 0
+
+
+def cmd_status(args: argparse.Namespace) -> int:
+    import logging
+
+    from app.jd_delta import diff_jobs
+
+    # the per-candidate "Skipping ..." lines of plan() are noise here
+    logging.getLogger("app.manifest").setLevel(logging.WARNING)
+    manifest, plan = _plan(args)
+    delta = diff_jobs(plan.job_hashes, manifest.job_hashes, plan.jd_set_hash, manifest.jd_set_hash)
+    status: Dict[str, Any] = {
+        "candidates": len(manifest.stems(args.cv_dir)),
+        "to_extract": len(plan.extract),
+        "to_analyze": len(plan.analyze),
+        "to_match": len(plan.match),
+        "up_to_date": len(plan.skipped),
+        "jobs": len(plan.job_hashes),
+        "jobs_added": delta.added,
+        "jobs_changed": delta.changed,
+        "jobs_removed": delta.removed,
+    }
+    if args.json:
+        print(json.dumps(status, indent=2))
+        return 0
+    for key, value in status.items():
+        if isinstance(value, list):
+            value = ", ".join(value) or "-"
+        print(f"{key.replace('_', ' '):<15} {value}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser with one subcommand per pipeline stage."""
+    folders = argparse.ArgumentParser(add_help=False)
+    folders.add_argument("--cv-dir", default="CV", help="PDF CVs")
+    folders.add_argument("--txt-dir", default="preprocessed-CVs", help="Extracted text")
+    folders.add_argument("--json-dir", default="processed-CVs", help="Structured CandidateCV JSON")
+    folders.add_argument("--matches-dir", default="job-matches-results", help="Match results")
+    folders.add_argument("--knowledge-dir", default="knowledge", help="Job description JSON files")
+    folders.add_argument("--manifest", default=os.path.join(".cache", "manifest.json"), help="Pipeline manifest")
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="HR recruitment pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    extract = sub.add_parser("extract", parents=[folders], help="Extract text from new or changed PDFs")
+    extract.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    extract.set_defaults(func=cmd_extract)
+
+    analyze = sub.add_parser("analyze", parents=[folders], help="Turn extracted text into CandidateCV JSON")
+    analyze.add_argument("--concurrency", type=int, default=4, help="Concurrent analyzer calls")
+    analyze.set_defaults(func=cmd_analyze)
+
+    match = sub.add_parser("match", parents=[folders], help="Match candidates against the job descriptions")
+    match.add_argument("--concurrency", type=int, default=4, help="Concurrent matcher calls")
+    match.add_argument("--local", action="store_true", help="Rule-based scoring of every candidate, no LLM")
+    match.add_argument("--local-dir", default="job-matches-local", help="Where --local writes its scores")
+    match.add_argument(
+        "--recommend", action="store_true", help="With --local, have the model write each recommendation text"
+    )
+    match.set_defaults(func=cmd_match)
+
+    for command in (extract, analyze, match):
+        command.add_argument("--all", action="store_true", help="Redo every candidate, not only pending ones")
+
+    run = sub.add_parser("run", parents=[folders], help="Run the full crew pipeline")
+    run.set_defaults(func=cmd_run)
+
+    status = sub.add_parser("status", parents=[folders], help="Show what each stage still has to do")
+    status.add_argument("--json", action="store_true", help="Print JSON")
+    status.set_defaults(func=cmd_status)
+
+    daemon = sub.add_parser("daemon", parents=[folders], help="Watch the CV folder and serve single-CV matches")
+    # same options as python -m app.daemon (kept here so building the parser imports nothing)
+    daemon.add_argument("--host", default="127.0.0.1")
+    daemon.add_argument("--port", type=int, default=8010, help="HTTP port (0: no endpoint)")
+    daemon.add_argument("--poll", type=float, default=10.0, help="Seconds between CV folder polls")
+    daemon.add_argument("--concurrency", type=int, default=4, help="Candidates processed at once")
+    daemon.set_defaults(func=cmd_daemon)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from app.logging_config import setup_logging
+
+    setup_logging()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
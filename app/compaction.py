@@ -0,0 +1,298 @@
+"""
+Token-budgeted compaction of extracted CV text before analysis.
+
+The .txt files written by the PDF reader keep everything PyPDF2 returns:
+running page headers and footers, page break markers, hyphenated line breaks,
+whitespace runs and one links block per page. compact_cv_text() drops the
+repeated headers / footers, merges hyphenated words, normalizes whitespace,
+lists every link once, splits the text into labeled sections and, when the
+result is still over the token budget, trims sections from the end. Sections
+the analyzer gets little from (publications, awards, interests, references)
+go first, down to nothing if needed; sections that back CandidateCV fields
+(certifications, languages, projects, volunteer work, the summary) are only
+cut once those are gone, and always keep their first lines. Contact details,
+experience, education and skills are never trimmed.
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.dispatcher import estimate_tokens
+from app.logging_config import get_logger
+from app.pdf_extraction import LINKS_HEADER
+from app.pre_extract import segment_sections
+from app.telemetry import current_span
+
+logger = get_logger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 4000
+# a trimmed section keeps at least this many tokens
+MIN_SECTION_TOKENS = 100
+# 0 is never trimmed; higher numbers are trimmed first
+SECTION_PRIORITIES: Dict[str, int] = {
+    "header": 0,
+    "experience": 0,
+    "education": 0,
+    "skills": 0,
+    "summary": 1,
+    "certifications": 1,
+    "languages": 1,
+    "projects": 2,
+    "volunteer": 2,
+    "awards": 3,
+    "publications": 3,
+    "interests": 4,
+    "references": 4,
+}
+DEFAULT_PRIORITY = 2
+# sections at or above this priority may be cut entirely, and are before any lower-priority one is touched
+EXPENDABLE_PRIORITY = 3
+
+_PAGE_BREAK = re.compile(r"^\s*--- PAGE BREAK ---\s*$", re.M)
+_LINK_LINE = re.compile(r"^\s*\d+\.\s+(\S+)\s*$")
+_HYPHEN_BREAK = re.compile(r"([A-Za-z])-\n([a-z])")
+_SPACES = re.compile(r"[ \t ]+")
+# lines looked at for running headers / footers at each end of a page
+_EDGE_LINES = 2
+
+
+class CompactedCV(BaseModel):
+    """Compacted CV text and what compaction did to it"""
+    text: str = Field(..., description="Compacted text, sections under their canonical headings")
+    tokens_before: int = Field(0, description="Estimated tokens of the extracted text")
+    tokens_after: int = Field(0, description="Estimated tokens of the compacted text")
+    sections: Dict[str, int] = Field(default_factory=dict, description="Section name -> tokens after compaction")
+    trimmed: List[str] = Field(default_factory=list, description="Sections cut to fit the token budget")
+    furniture_lines: int = Field(0, description="Repeated page header / footer lines removed")
+
+
+def _split_links(page: str) -> tuple:
+    """Split one page into (text lines, links of its links block)."""
+    lines, links, in_links = [], [], False
+    for line in page.splitlines():
+        if line.strip() == LINKS_HEADER:
+            in_links = True
+            continue
+        match = _LINK_LINE.match(line) if in_links else None
+        if match:
+            links.append(match.group(1))
+            continue
+        in_links = False
+        lines.append(line)
+    return lines, links
+
+
+def _furniture_key(line: str) -> str:
+    """Running headers / footers differ only by their page number."""
+    return re.sub(r"\d+", "#", _SPACES.sub(" ", line.strip().lower()))
+
+
+def remove_page_furniture(pages: List[List[str]]) -> int:
+    """
+    Drop running headers and footers repeated at the top or bottom of most pages (in place).
+
+    The first occurrence is kept, so a name repeated as a page header still
+    appears once. Returns the number of lines removed.
+    """
+    if len(pages) < 2:
+        return 0
+    counts: Counter = Counter()
+    for lines in pages:
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        edges = set(content[:_EDGE_LINES] + content[-_EDGE_LINES:])
+        counts.update({_furniture_key(lines[i]) for i in edges})
+    repeated = {key for key, count in counts.items() if count >= max(2, len(pages) // 2 + 1)}
+    if not repeated:
+        return 0
+
+    removed, seen = 0, set()
+    for lines in pages:
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        edges = set(content[:_EDGE_LINES] + content[-_EDGE_LINES:])
+        drop = set()
+        for i in sorted(edges):
+            key = _furniture_key(lines[i])
+            if key in repeated:
+                if key in seen:
+                    drop.add(i)
+                seen.add(key)
+        if drop:
+            lines[:] = [line for i, line in enumerate(lines) if i not in drop]
+            removed += len(drop)
+    return removed
+
+
+def normalize_text(text: str) -> str:
+    """Merge hyphenated line breaks, collapse whitespace runs and blank-line runs."""
+    text = _HYPHEN_BREAK.sub(r"\1\2", text.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+    out: List[str] = []
+    for line in lines:
+        if line or (out and out[-1]):
+            out.append(line)
+    return "\n".join(out).strip()
+
+
+def _omitted(count: int) -> str:
+    return f"[... {count} more line(s) omitted]"
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    """Keep the leading lines of a section that fit max_tokens with the omission note (at least one line)."""
+    lines = text.splitlines()
+    costs = [estimate_tokens(line + "\n") for line in lines]
+    kept, used = len(lines), sum(costs)
+    while kept > 1 and used + (estimate_tokens(_omitted(len(lines) - kept)) if kept < len(lines) else 0) > max_tokens:
+        kept -= 1
+        used -= costs[kept]
+    if kept == len(lines):
+        return text
+    return "\n".join(lines[:kept] + [_omitted(len(lines) - kept)])
+
+
+def _render(sections: Dict[str, str], links: List[str]) -> str:
+    blocks = []
+    for name, body in sections.items():
+        if not body:
+            continue
+        blocks.append(body if name == "header" else f"{name.upper()}\n{body}")
+    if links:
+        blocks.append(f"{LINKS_HEADER}\n" + "\n".join(f"{i + 1}. {link}" for i, link in enumerate(links)))
+    return "\n\n".join(blocks)
+
+
+def compact_cv_text(
+    text: str,
+    token_budget: Optional[int] = DEFAULT_TOKEN_BUDGET,
+    priorities: Optional[Dict[str, int]] = None,
+) -> CompactedCV:
+    """
+    Compact extracted CV text for the analyzer.
+
+    Args:
+        text: Text written by the PDF reader
+        token_budget: Estimated tokens to trim the text down to (None or 0: no trimming)
+        priorities: Section name -> priority (0 is never trimmed, higher is trimmed first,
+            EXPENDABLE_PRIORITY and above down to nothing); defaults to SECTION_PRIORITIES
+
+    Returns:
+        CompactedCV with the text and the tokens before / after
+    """
+    priorities = SECTION_PRIORITIES if priorities is None else priorities
+    pages, links = [], []
+    for page in _PAGE_BREAK.split(text):
+        lines, page_links = _split_links(page)
+        pages.append(lines)
+        links += [link for link in page_links if link not in links]
+    furniture = remove_page_furniture(pages)
+    normalized = normalize_text("\n".join(line for lines in pages for line in lines))
+    sections = segment_sections(normalized)
+
+    trimmed: List[str] = []
+    total = estimate_tokens(_render(sections, links))
+    if token_budget and total > token_budget:
+        # least important sections first, later sections before earlier ones of the same priority
+        order = sorted(
+            (name for name in sections if priorities.get(name, DEFAULT_PRIORITY) > 0),
+            key=lambda name: (-priorities.get(name, DEFAULT_PRIORITY), -list(sections).index(name)),
+        )
+        for name in order:
+            over = total - token_budget
+            if over <= 0:
+                break
+            size = estimate_tokens(sections[name])
+            expendable = priorities.get(name, DEFAULT_PRIORITY) >= EXPENDABLE_PRIORITY
+            keep = size - over if expendable else max(MIN_SECTION_TOKENS, size - over)
+            if keep >= size:
+                continue
+            cut = _trim(sections[name], keep) if keep > 0 else ""
+            if cut == sections[name]:
+                continue
+            sections[name] = cut
+            trimmed.append(name)
+            total = estimate_tokens(_render(sections, links))
+
+    compacted = _render(sections, links)
+    return CompactedCV(
+        text=compacted,
+        tokens_before=estimate_tokens(text),
+        tokens_after=estimate_tokens(compacted),
+        sections={name: estimate_tokens(body) for name, body in sections.items() if body},
+        trimmed=trimmed,
+        furniture_lines=furniture,
+    )
+
+
+def token_budget_from_env() -> Optional[int]:
+    """CV_TOKEN_BUDGET (default DEFAULT_TOKEN_BUDGET, also used for invalid values); 0 compacts without trimming."""
+    value = os.getenv("CV_TOKEN_BUDGET")
+    if not value:
+        return DEFAULT_TOKEN_BUDGET
+    try:
+        return max(0, int(value))
+    except ValueError:
+        logger.warning(f"Ignoring CV_TOKEN_BUDGET={value!r} (not an integer); using {DEFAULT_TOKEN_BUDGET}")
+        return DEFAULT_TOKEN_BUDGET
+
+
+def compaction_enabled() -> bool:
+    """Compaction runs unless CV_COMPACT=0."""
+    return os.getenv("CV_COMPACT", "1").lower() not in ("0", "false", "off")
+
+
+def prepare_cv_text(cv_text: str, source_file: str = "") -> str:
+    """
+    Compact a CV's text for the analyzer when enabled, recording the tokens on the current span.
+
+    Args:
+        cv_text: Text written by the PDF reader
+        source_file: Original file name (for logging)
+
+    Returns:
+        The text to send to the analyzer
+    """
+    if not compaction_enabled():
+        return cv_text
+    compacted = compact_cv_text(cv_text, token_budget_from_env())
+    s = current_span()
+    if s is not None:
+        s.set(tokens_before=compacted.tokens_before, tokens_after=compacted.tokens_after)
+    logger.debug(
+        f"{source_file}: compacted {compacted.tokens_before} -> {compacted.tokens_after} tokens"
+        + (f" (trimmed {', '.join(compacted.trimmed)})" if compacted.trimmed else "")
+    )
+    return compacted.text
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Compact extracted CV text and report tokens before / after.")
+    parser.add_argument("txt_dir", nargs="?", default="preprocessed-CVs")
+    parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Token budget (0: no trimming)")
+    parser.add_argument("--output-dir", default=None, help="Also write the compacted texts here")
+    args = parser.parse_args()
+
+    setup_logging()
+    before = after = 0
+    for name in sorted(os.listdir(args.txt_dir)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(args.txt_dir, name), "r", encoding="utf-8") as f:
+            result = compact_cv_text(f.read(), args.budget)
+        before += result.tokens_before
+        after += result.tokens_after
+        trimmed = f"  trimmed: {', '.join(result.trimmed)}" if result.trimmed else ""
+        print(f"{name:<40} {result.tokens_before:>8} -> {result.tokens_after:>7} tokens{trimmed}")
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            with open(os.path.join(args.output_dir, name), "w", encoding="utf-8") as f:
+                f.write(result.text)
+    if before:
+        print(f"{'total':<40} {before:>8} -> {after:>7} tokens ({100 * (1 - after / before):.1f}% saved)")
@@ -7,8 +7,9 @@
 # ------------------------------------------------------------
 
 import os
+from pathlib import Path
 from crewai import Agent, Crew, Process, Task
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from crewai_tools import (
@@ -17,7 +18,18 @@ from crewai_tools import (
     DirectoryReadTool,
 )
 from app.tools.pdf_reader import PDFReaderTool
+from app.jd_delta import diff_jobs
+from app.knowledge import (
+    DEFAULT_KNOWLEDGE_DIR,
+    job_content_hashes,
+    job_set_hash,
+    list_job_description_files,
+    load_job_descriptions,
+)
+from app.knowledge_store import DEFAULT_COLLECTION, JobKnowledgeSource, QdrantKnowledgeStorage
+from app.manifest import PipelineManifest
 from .model import CandidateCV, JobMatchResult
+from crewai.knowledge.knowledge import Knowledge
 from crewai.knowledge.source.json_knowledge_source import JSONKnowledgeSource
 from app.logging_config import get_logger
 
@@ -31,11 +43,33 @@ class HRCrew:
     agents: List[BaseAgent]
     tasks: List[Task]
 
-    def __init__(self) -> None:
+    def __init__(self, knowledge_dir: str = DEFAULT_KNOWLEDGE_DIR, manifest: Optional[PipelineManifest] = None) -> None:
         """Initialize the crew and load knowledge sources."""
-        # TODO: Load job descriptions from knowledge/ folder
-        # TODO: Create JSONKnowledgeSource and assign to self.job_sources
-        pass
+        self.knowledge_dir = knowledge_dir
+        self.jobs = load_job_descriptions(knowledge_dir)
+        self.job_hashes = job_content_hashes(self.jobs)
+        # JDs added, edited or removed since the last recorded run (see app.jd_delta)
+        manifest = manifest or PipelineManifest.load()
+        self.jd_delta = diff_jobs(
+            self.job_hashes, manifest.job_hashes, job_set_hash(self.job_hashes), manifest.jd_set_hash
+        )
+        # JD chunks and embeddings persist in a local Qdrant collection keyed by file
+        # hash, so only new or edited JDs are embedded (see app.knowledge_store)
+        job_files = [Path(path) for path in list_job_description_files(knowledge_dir)]
+        self.job_sources: List[JobKnowledgeSource] = []
+        self.job_knowledge: Optional[Knowledge] = None
+        try:
+            storage = QdrantKnowledgeStorage(DEFAULT_COLLECTION)
+            self.job_sources = [JobKnowledgeSource(file_paths=job_files)] if job_files else []
+            self.job_knowledge = Knowledge(collection_name=DEFAULT_COLLECTION, sources=self.job_sources, storage=storage)
+            if self.job_sources:
+                self.job_knowledge.add_sources()
+            else:
+                storage.sync({})
+        except Exception as e:
+            # local Qdrant allows one client per folder, e.g. a running app.daemon holds it
+            logger.warning(f"Could not open the knowledge index, continuing without job knowledge: {e}")
+            self.job_sources, self.job_knowledge = [], None
 
     # ===================== AGENTS =====================
 
@@ -49,12 +83,16 @@ class HRCrew:
     def cv_analyzer(self) -> Agent:
         """CV Analyzer Agent - analyzes and structures CV data."""
         # TODO: Return Agent with config and tools
+        # Tip: llm=CachedLLM() (app.cached_llm) replays identical tool-less prompts from the LLM response cache
         pass
 
     @agent
     def job_matcher(self) -> Agent:
         """Job Matcher Agent - matches candidates to jobs."""
         # TODO: Return Agent with config, tools, and knowledge sources
+        # Tip: llm=CachedLLM() (app.cached_llm) replays identical tool-less prompts from the LLM response cache
+        # Tip: knowledge=self.job_knowledge (None when the index could not be opened) reuses
+        #      the persisted JD embeddings instead of re-embedding them
         pass
 
     # ===================== TASKS =====================
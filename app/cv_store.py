@@ -0,0 +1,279 @@
+"""
+Consolidated, append-only store of processed CVs.
+
+Each run writes one segment directory under the store root:
+
+    cv-store/<run_id>/columns.jsonl   flattened columns, one line per candidate
+    cv-store/<run_id>/cvs.jsonl       the full CandidateCV JSON, one line per candidate
+
+Loading for matching only reads the small columns files (skills, years of
+experience, career level, education, rating score) into a CandidateTable of
+plain lists and NumPy arrays, without building or validating CandidateCV
+objects. Later segments win when a candidate appears more than once. Full CVs
+are read back on demand by byte offset, and export_json() rewrites the
+per-candidate JSON files for tools that still expect processed-CVs/.
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.logging_config import get_logger
+from app.model import CandidateCV
+from app.scoring import (
+    CAREER_LEVELS,
+    EDUCATION_RANKS,
+    candidate_career_level,
+    candidate_education_rank,
+    candidate_skills,
+    candidate_years,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_CV_STORE_DIR = "cv-store"
+COLUMNS_FILE = "columns.jsonl"
+CVS_FILE = "cvs.jsonl"
+
+
+def new_run_id() -> str:
+    """Sortable run id: UTC timestamp plus a random suffix."""
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + "-" + uuid.uuid4().hex[:6]
+
+
+def highest_education_level(cv: CandidateCV) -> Optional[str]:
+    """Return the highest EducationLevel value listed on the CV, if any."""
+    levels = [edu.level.value for edu in cv.education if edu.level]
+    return max(levels, key=lambda level: EDUCATION_RANKS.get(level, 0), default=None)
+
+
+def flatten_cv(candidate_id: str, cv: CandidateCV) -> Dict[str, Any]:
+    """Flattened column values stored for one candidate."""
+    assessment = cv.agent_assessment
+    return {
+        "id": candidate_id,
+        "name": cv.contact_information.full_name,
+        "email": str(cv.contact_information.email) if cv.contact_information.email else None,
+        "source_file": cv.source_file,
+        "skills": candidate_skills(cv),
+        "total_years_experience": round(candidate_years(cv), 2),
+        "career_level": CAREER_LEVELS[candidate_career_level(cv)],
+        "education_level": highest_education_level(cv),
+        "education_rank": candidate_education_rank(cv),
+        "rating_score": assessment.rating_score if assessment else None,
+    }
+
+
+class CandidateTable:
+    """
+    Column-oriented view of the stored candidates.
+
+    Attributes:
+        ids, names, emails, source_files, education_levels: one entry per candidate
+        skills: normalized skills per candidate (tuples of interned strings)
+        years: total years of experience (float64)
+        career: career level as an index into CAREER_LEVELS (int8)
+        education: highest education rank (int8, 0 if unknown)
+        rating_score: analyzer rating (float32, NaN if missing)
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], locations: List[Tuple[str, int, int]]):
+        self.ids = [row["id"] for row in rows]
+        self.names = [row.get("name") or row["id"] for row in rows]
+        self.emails = [row.get("email") for row in rows]
+        self.source_files = [row.get("source_file") for row in rows]
+        self.education_levels = [row.get("education_level") for row in rows]
+        self.skills = [tuple(sys.intern(s) for s in row.get("skills") or ()) for row in rows]
+        self.years = np.array([row.get("total_years_experience") or 0.0 for row in rows], dtype=np.float64)
+        self.career = np.array([CAREER_LEVELS.index(row.get("career_level") or "entry") for row in rows], dtype=np.int8)
+        self.education = np.array([row.get("education_rank") or 0 for row in rows], dtype=np.int8)
+        self.rating_score = np.array(
+            [np.nan if row.get("rating_score") is None else row["rating_score"] for row in rows], dtype=np.float32
+        )
+        self._locations = locations
+        self._positions = {candidate_id: i for i, candidate_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index(self, candidate_id: str) -> int:
+        """Row of a candidate id (KeyError if absent)."""
+        return self._positions[candidate_id]
+
+    def raw_cv(self, i: int) -> str:
+        """Full stored CandidateCV JSON of row i."""
+        path, offset, length = self._locations[i]
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return f.read(length).decode("utf-8")
+
+    def cv(self, i: int) -> CandidateCV:
+        """Full CandidateCV of row i, validated."""
+        return CandidateCV.model_validate_json(self.raw_cv(i))
+
+
+class CVStoreWriter:
+    """Appends candidates to one segment of a CVStore; use as a context manager."""
+
+    def __init__(self, segment_dir: str):
+        os.makedirs(segment_dir, exist_ok=True)
+        self.segment_dir = segment_dir
+        self.count = 0
+        self._cvs = open(os.path.join(segment_dir, CVS_FILE), "ab")
+        self._columns = open(os.path.join(segment_dir, COLUMNS_FILE), "a", encoding="utf-8")
+
+    def append(self, candidate_id: str, cv: CandidateCV) -> None:
+        """Store one candidate (the full CV first, then its column row pointing at it)."""
+        data = cv.model_dump_json().encode("utf-8")
+        offset = self._cvs.tell()
+        self._cvs.write(data + b"\n")
+        self._cvs.flush()
+        row = flatten_cv(candidate_id, cv)
+        row["offset"], row["length"] = offset, len(data)
+        self._columns.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._columns.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        for f in (self._cvs, self._columns):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+    def __enter__(self) -> "CVStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class CVStore:
+    """
+    Append-only dataset of processed CVs, one segment per run.
+
+    Args:
+        root: Store directory (default: cv-store)
+    """
+
+    def __init__(self, root: str = DEFAULT_CV_STORE_DIR):
+        self.root = root
+
+    def segments(self) -> List[str]:
+        """Segment directories, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return [
+            os.path.join(self.root, name)
+            for name in sorted(os.listdir(self.root))
+            if os.path.isfile(os.path.join(self.root, name, COLUMNS_FILE))
+        ]
+
+    def exists(self) -> bool:
+        return bool(self.segments())
+
+    def is_current(self, json_dir: str, table: CandidateTable) -> bool:
+        """
+        Whether table (loaded from this store) holds json_dir's candidates as they are now.
+
+        The store is stale when json_dir has other candidate ids than the table, or
+        a file modified after the store's last write (e.g. by app.cli or the daemon,
+        which only write json_dir). A missing json_dir does not make it stale.
+        """
+        if not os.path.isdir(json_dir):
+            return True
+        names = [name for name in os.listdir(json_dir) if name.endswith(".json")]
+        if {os.path.splitext(name)[0] for name in names} != set(table.ids):
+            return False
+        written = max(os.path.getmtime(os.path.join(segment, COLUMNS_FILE)) for segment in self.segments())
+        return all(os.path.getmtime(os.path.join(json_dir, name)) <= written for name in names)
+
+    def writer(self, run_id: Optional[str] = None) -> CVStoreWriter:
+        """Open a new segment for this run."""
+        return CVStoreWriter(os.path.join(self.root, run_id or new_run_id()))
+
+    def load(self) -> CandidateTable:
+        """
+        Read the column files of every segment into a CandidateTable.
+
+        Rows are trusted (written by CVStoreWriter) and are not validated; a
+        truncated last line from an interrupted run is skipped.
+        """
+        started = time.perf_counter()
+        latest: Dict[str, Tuple[Dict[str, Any], Tuple[str, int, int]]] = {}
+        for segment in self.segments():
+            cvs_path = os.path.join(segment, CVS_FILE)
+            with open(os.path.join(segment, COLUMNS_FILE), "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, start=1):
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable row {line_no} of {segment}")
+                        continue
+                    latest[row["id"]] = (row, (cvs_path, row.pop("offset"), row.pop("length")))
+
+        ordered = sorted(latest)
+        table = CandidateTable([latest[c][0] for c in ordered], [latest[c][1] for c in ordered])
+        logger.info(f"Loaded {len(table)} candidates from {self.root} in {time.perf_counter() - started:.2f}s")
+        return table
+
+    def import_json_dir(self, json_dir: str, run_id: Optional[str] = None) -> int:
+        """
+        Validate every CandidateCV JSON file in json_dir and append it as a new segment.
+
+        Returns:
+            Number of candidates imported (invalid files are logged and skipped)
+        """
+        from app.scoring import load_candidates
+
+        ids, candidates = load_candidates(json_dir)
+        with self.writer(run_id) as writer:
+            for candidate_id, cv in zip(ids, candidates):
+                writer.append(candidate_id, cv)
+        logger.info(f"Imported {len(ids)} candidates from {json_dir} into {self.root}")
+        return len(ids)
+
+    def export_json(self, output_dir: str, candidate_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Write <id>.json CandidateCV files to output_dir (all candidates by default).
+
+        Returns:
+            The written file paths
+        """
+        table = self.load()
+        rows = range(len(table)) if candidate_ids is None else [table.index(c) for c in candidate_ids]
+        os.makedirs(output_dir, exist_ok=True)
+        written = []
+        for i in rows:
+            path = os.path.join(output_dir, f"{table.ids[i]}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(json.loads(table.raw_cv(i)), f, indent=2, ensure_ascii=False)
+            written.append(path)
+        logger.info(f"Exported {len(written)} candidates to {output_dir}")
+        return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Manage the consolidated processed-CV store.")
+    parser.add_argument("command", choices=["import", "export", "stats"])
+    parser.add_argument("--store", default=DEFAULT_CV_STORE_DIR, help="Store directory")
+    parser.add_argument("--json-dir", default="processed-CVs", help="Per-candidate JSON folder to import / export")
+    args = parser.parse_args()
+
+    setup_logging()
+    store = CVStore(args.store)
+    if args.command == "import":
+        store.import_json_dir(args.json_dir)
+    elif args.command == "export":
+        store.export_json(args.json_dir)
+    else:
+        table = store.load()
+        print(json.dumps({"candidates": len(table), "segments": len(store.segments())}))
@@ -0,0 +1,503 @@
+"""
+Warm pipeline daemon: keeps the job descriptions, their knowledge index and
+the LLM client loaded, processes new PDFs dropped into CV/ and answers
+single-CV match requests over a local HTTP endpoint.
+
+    python -m app.daemon --port 8010 --poll 10
+
+Every poll compares cheap listings of CV/ and knowledge/ (names, sizes,
+mtimes) with the previous ones and only then hashes the job descriptions or
+asks the manifest which candidates need work, so an idle daemon does no
+hashing. Edited job descriptions are picked up on the next poll and only
+re-match what changed (see app.jd_delta). A poll in which some candidate
+failed is retried in full on the next one. A poll that saw the CV folder
+change also refreshes the skill index the shortlist's must-have rule reads
+(see app.skill_index).
+
+HTTP endpoints (bound to 127.0.0.1 by default):
+
+    POST /match   body: a PDF (Content-Type: application/pdf) or the CV text;
+                  optional ?name=<file name>. Returns the CandidateCV and its
+                  JobMatchResults, best first. Nothing is written to disk.
+    GET  /status  counters, job count, last poll
+
+Requests use the dispatcher's interactive lane, so they run ahead of queued
+folder work and their latency is the analyzer and matcher calls alone.
+"""
+
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import BaseModel, Field
+
+from app.batch_matching import match_candidate_batch
+from app.dispatcher import PRIORITY_INTERACTIVE
+from app.jd_delta import apply_jd_delta, diff_jobs
+from app.knowledge import job_content_hashes, job_set_hash, load_job_descriptions
+from app.llm import complete
+from app.logging_config import get_logger
+from app.manifest import DEFAULT_MANIFEST_PATH, PipelineManifest, PipelinePlan
+from app.match_store import MatchStore
+from app.model import CandidateCV, JobMatchResult
+from app.pdf_extraction import ExtractionLimits, extract_pdf_to_file, record_extraction, stream_pdf_text
+from app.skill_index import DEFAULT_INDEX_PATH, load_skill_index
+from app.streaming import analyze_cv_text
+from app.telemetry import finish_run, span
+
+logger = get_logger(__name__)
+
+DEFAULT_PORT = 8010
+DEFAULT_POLL_SECONDS = 10.0
+DEFAULT_CONCURRENCY = 4
+
+AnalyzeFn = Callable[[str, str], CandidateCV]
+BatchMatchFn = Callable[[CandidateCV, List[Dict[str, Any]]], List[JobMatchResult]]
+
+
+class CVInputError(Exception):
+    """Raised when a match request's body is not a readable CV."""
+
+
+class DaemonStatus(BaseModel):
+    """Counters reported by GET /status"""
+    started_at: float = Field(default_factory=time.time)
+    jobs: int = 0
+    jd_set_hash: str = ""
+    polls: int = 0
+    last_poll: Optional[float] = None
+    processed: int = Field(0, description="Candidates from CV/ analyzed and matched")
+    failed: List[str] = Field(default_factory=list, description="Candidates whose last attempt failed")
+    requests: int = Field(0, description="POST /match requests answered")
+    request_errors: int = 0
+
+
+def _list_dir(path: str, suffix: str) -> Tuple:
+    """Names, sizes and mtimes of the files in path ending in suffix: a cheap change check."""
+    if not os.path.isdir(path):
+        return ()
+    with os.scandir(path) as entries:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in entries
+            if entry.name.lower().endswith(suffix) and entry.is_file()
+        ))
+
+
+class PipelineDaemon:
+    """
+    Long-running pipeline over the given folders, with everything loaded once.
+
+    Args:
+        inputs: Folder inputs (pdf_files_path, txt_files_path, json_files_path, matches_output_path)
+        knowledge_dir: Folder holding the job description JSON files
+        poll_seconds: Pause between two looks at the CV folder
+        concurrency: Candidates processed at the same time
+        analyze_fn / match_fn: Stage functions (defaults call the LLM; requests use the interactive lane)
+        match_store: Also write folder results here (default: MatchStore.from_env())
+        manifest_path: Pipeline manifest shared with app.main / app.cli
+        knowledge_index: Keep the Qdrant knowledge index of the JDs in sync (see app.knowledge_store)
+        skill_index_path: Keep this skill index of processed-CVs/ up to date (see app.skill_index; None disables)
+    """
+
+    def __init__(
+        self,
+        inputs: Dict[str, str],
+        knowledge_dir: str = "knowledge",
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        analyze_fn: Optional[AnalyzeFn] = None,
+        match_fn: Optional[BatchMatchFn] = None,
+        match_store: Optional[MatchStore] = None,
+        manifest_path: str = DEFAULT_MANIFEST_PATH,
+        knowledge_index: bool = True,
+        skill_index_path: Optional[str] = DEFAULT_INDEX_PATH,
+    ):
+        self.inputs = inputs
+        self.knowledge_dir = knowledge_dir
+        self.poll_seconds = poll_seconds
+        self.concurrency = max(1, concurrency)
+        self.analyze_fn = analyze_fn or analyze_cv_text
+        self.match_fn = match_fn or match_candidate_batch
+        self.request_analyze_fn = analyze_fn or partial(analyze_cv_text, priority=PRIORITY_INTERACTIVE)
+        self.request_match_fn = match_fn or partial(
+            match_candidate_batch, complete_fn=partial(complete, priority=PRIORITY_INTERACTIVE)
+        )
+        self.match_store = match_store if match_store is not None else MatchStore.from_env()
+        # the manifest is only touched by the polling thread; _lock guards the job list shared with requests
+        self.manifest = PipelineManifest.load(manifest_path)
+        self.knowledge_index = knowledge_index
+        self.skill_index_path = skill_index_path
+        self.status = DaemonStatus()
+        self.jobs: List[Dict[str, Any]] = []
+        self._listing: Optional[Tuple] = None
+        self._jd_listing: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.refresh_jobs()
+
+    # -- job descriptions -------------------------------------------------
+
+    def _sync_knowledge(self) -> None:
+        from pathlib import Path
+
+        from app.knowledge_store import DEFAULT_COLLECTION, JobKnowledgeSource, QdrantKnowledgeStorage
+
+        storage = QdrantKnowledgeStorage(DEFAULT_COLLECTION)
+        files = sorted(Path(self.knowledge_dir).glob("*.json"))
+        if files:
+            JobKnowledgeSource(file_paths=files, storage=storage).add()
+        else:
+            storage.sync({})
+
+    def refresh_jobs(self) -> bool:
+        """Reload the job descriptions when knowledge/ changed; returns True if it did."""
+        jd_listing = _list_dir(self.knowledge_dir, ".json")
+        if jd_listing == self._jd_listing:
+            return False
+        jobs = load_job_descriptions(self.knowledge_dir)
+        job_hashes = job_content_hashes(jobs)
+        jd_set_hash = job_set_hash(job_hashes)
+        if jd_set_hash == self.status.jd_set_hash:
+            # touched, reformatted or renamed, but the same jobs
+            self._jd_listing = jd_listing
+            return False
+        if self.knowledge_index:
+            try:
+                self._sync_knowledge()
+            except Exception as e:
+                logger.warning(f"Could not sync the knowledge index: {e}")
+        delta = diff_jobs(job_hashes, self.manifest.job_hashes, jd_set_hash, self.manifest.jd_set_hash)
+        if not delta.is_empty():
+            apply_jd_delta(self.inputs, jobs, delta, self.manifest, self.match_fn, self.match_store)
+            self.manifest.save()
+        with self._lock:
+            self.jobs = jobs
+        with self._status_lock:
+            self.status.jobs, self.status.jd_set_hash = len(jobs), jd_set_hash
+        self._jd_listing = jd_listing
+        self._listing = None  # pending candidates are matched against the new set on this poll
+        logger.info(f"Loaded {len(jobs)} job description(s) from {self.knowledge_dir}")
+        return True
+
+    # -- CV folder ----------------------------------------------------------
+
+    def process(
+        self,
+        stem: str,
+        extract: bool,
+        analyze: bool,
+        jobs: List[Dict[str, Any]],
+        done: Optional[PipelinePlan] = None,
+    ) -> List[JobMatchResult]:
+        """Run the stages a candidate from the CV folder still needs, adding stem to done's stages as each succeeds."""
+        done = done if done is not None else PipelinePlan()
+        paths = {
+            "pdf": os.path.join(self.inputs["pdf_files_path"], f"{stem}.pdf"),
+            "txt": os.path.join(self.inputs["txt_files_path"], f"{stem}.txt"),
+            "json": os.path.join(self.inputs["json_files_path"], f"{stem}.json"),
+            "match": os.path.join(self.inputs["matches_output_path"], f"{stem}.json"),
+        }
+        if extract:
+            result = extract_pdf_to_file(paths["pdf"], self.inputs["txt_files_path"])
+            record_extraction(result)
+            if result.status != "success":
+                raise RuntimeError(f"extract failed: {result.error}")
+            done.extract.append(stem)
+        if analyze or not os.path.exists(paths["json"]):
+            with span("analyze", cv=stem) as s:
+                with open(paths["txt"], "r", encoding="utf-8") as f:
+                    cv_text = f.read()
+                s.set(chars=len(cv_text))
+                cv = self.analyze_fn(cv_text, f"{stem}.pdf")
+            os.makedirs(self.inputs["json_files_path"], exist_ok=True)
+            with open(paths["json"], "w", encoding="utf-8") as f:
+                f.write(cv.model_dump_json(indent=2))
+            done.analyze.append(stem)
+        else:
+            with open(paths["json"], "r", encoding="utf-8") as f:
+                cv = CandidateCV.model_validate_json(f.read())
+        with span("match", cv=stem, jobs=len(jobs)):
+            results = sorted(self.match_fn(cv, jobs), key=lambda r: r.overall_score, reverse=True)
+        os.makedirs(self.inputs["matches_output_path"], exist_ok=True)
+        with open(paths["match"], "w", encoding="utf-8") as f:
+            json.dump([r.model_dump(mode="json") for r in results], f, indent=2, ensure_ascii=False)
+        done.match.append(stem)
+        return results
+
+    def poll_once(self) -> int:
+        """
+        Process the candidates of the CV folder that need work.
+
+        Returns:
+            Number of candidates processed successfully
+        """
+        self.refresh_jobs()
+        listing = _list_dir(self.inputs["pdf_files_path"], ".pdf")
+        with self._status_lock:
+            self.status.polls += 1
+            self.status.last_poll = time.time()
+        if listing == self._listing:
+            return 0
+
+        plan = self.manifest.plan(self.inputs, knowledge_dir=self.knowledge_dir)
+        with self._lock:
+            jobs = list(self.jobs)
+        failed: List[str] = []
+        done = PipelinePlan(jd_set_hash=plan.jd_set_hash, job_hashes=plan.job_hashes)
+        writer = self.match_store.writer(source="daemon", replace=True) if self.match_store is not None and plan.match else None
+
+        def guarded(stem: str) -> None:
+            try:
+                results = self.process(stem, stem in plan.extract, stem in plan.analyze, jobs, done)
+                if writer is not None:
+                    writer.add(stem, results)
+                logger.info(f"{stem}: processed, best match {results[0].overall_score if results else '-'}")
+            except Exception as e:
+                logger.warning(f"{stem}: failed: {e}")
+                failed.append(stem)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(guarded, plan.match))
+        if writer is not None:
+            writer.flush()
+
+        self.manifest.record(self.inputs, plan, done)
+        self.manifest.save()
+        if self.skill_index_path:
+            try:
+                load_skill_index(self.inputs["json_files_path"], self.skill_index_path)
+            except Exception as e:
+                logger.warning(f"Could not refresh the skill index: {e}")
+        # with a failure the listing stays unset, so the next poll plans (and retries) again
+        self._listing = None if failed else listing
+        done = len(plan.match) - len(failed)
+        with self._status_lock:
+            self.status.processed += done
+            self.status.failed = sorted(set(self.status.failed) - set(plan.match) | set(failed))
+        if plan.match:
+            finish_run()
+        return done
+
+    def run(self) -> None:
+        """Poll the CV folder until stop() is called."""
+        logger.info(f"Watching {self.inputs['pdf_files_path']} every {self.poll_seconds:g}s")
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Poll failed: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status_snapshot(self) -> Dict[str, Any]:
+        """A consistent copy of the status counters (they are updated from several threads)."""
+        with self._status_lock:
+            return self.status.model_dump()
+
+    def count_request(self, ok: bool) -> None:
+        """Count an answered POST /match request."""
+        with self._status_lock:
+            if ok:
+                self.status.requests += 1
+            else:
+                self.status.request_errors += 1
+
+    # -- single-CV requests ---------------------------------------------------
+
+    def match_cv(self, data: bytes, name: str = "upload.pdf", is_pdf: bool = True) -> Dict[str, Any]:
+        """
+        Analyze and match one CV without touching the pipeline folders.
+
+        Args:
+            data: PDF bytes, or UTF-8 CV text when is_pdf is False
+            name: File name used as the CV's source_file
+            is_pdf: Whether data is a PDF
+
+        Returns:
+            {"candidate": CandidateCV, "matches": [JobMatchResult, best first], "seconds": per stage}
+
+        Raises:
+            CVInputError: data is not a readable PDF / UTF-8 text, or has no text
+        """
+        seconds: Dict[str, float] = {}
+        started = time.perf_counter()
+        stem = os.path.splitext(os.path.basename(name))[0] or "upload"
+        if is_pdf:
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+                tmp.write(data)
+                tmp.flush()
+                text = io.StringIO()
+                with span("extract", file=os.path.basename(name), bytes=len(data)) as s:
+                    try:
+                        pages, has_text, _ = stream_pdf_text(tmp.name, text)
+                    except Exception as e:
+                        raise CVInputError(f"Could not read PDF: {e}") from e
+                    s.set(pages=pages)
+                if not has_text:
+                    raise CVInputError("Could not extract text from PDF. The file might be empty or image-based.")
+                cv_text = text.getvalue()
+            seconds["extract"] = round(time.perf_counter() - started, 3)
+        else:
+            try:
+                cv_text = data.decode("utf-8")
+            except UnicodeDecodeError as e:
+                raise CVInputError(f"CV text is not UTF-8: {e}") from e
+
+        step = time.perf_counter()
+        with span("analyze", cv=stem, chars=len(cv_text), interactive=True):
+            cv = self.request_analyze_fn(cv_text, f"{stem}.pdf")
+        seconds["analyze"] = round(time.perf_counter() - step, 3)
+
+        step = time.perf_counter()
+        with self._lock:
+            jobs = list(self.jobs)
+        with span("match", cv=stem, jobs=len(jobs), interactive=True):
+            results = sorted(self.request_match_fn(cv, jobs), key=lambda r: r.overall_score, reverse=True)
+        seconds["match"] = round(time.perf_counter() - step, 3)
+        seconds["total"] = round(time.perf_counter() - started, 3)
+        return {
+            "candidate": cv.model_dump(mode="json"),
+            "matches": [result.model_dump(mode="json") for result in results],
+            "seconds": seconds,
+        }
+
+
+class DaemonServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer carrying the daemon it serves."""
+
+    daemon_threads = True
+
+    def __init__(self, address, daemon: PipelineDaemon, max_bytes: Optional[int] = None):
+        super().__init__(address, _DaemonHandler)
+        self.pipeline = daemon
+        self.max_bytes = max_bytes
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    server: DaemonServer
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, code: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlparse(self.path).path.rstrip("/") not in ("/status", "/health"):
+            self._send(404, {"error": "not found"})
+            return
+        self._send(200, self.server.pipeline.status_snapshot())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/match":
+            self._send(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            self._send(400, {"error": "empty body"})
+            return
+        if self.server.max_bytes and length > self.server.max_bytes:
+            self._send(413, {"error": f"body over {self.server.max_bytes} bytes"})
+            return
+        data = self.rfile.read(length)
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        is_pdf = content_type == "application/pdf" or data.startswith(b"%PDF")
+        name = (parse_qs(url.query).get("name") or ["upload.pdf" if is_pdf else "upload.txt"])[0]
+        pipeline = self.server.pipeline
+        try:
+            body = pipeline.match_cv(data, name=name, is_pdf=is_pdf)
+        except CVInputError as e:
+            pipeline.count_request(ok=False)
+            self._send(422, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.warning(f"Match request for {name} failed: {e}")
+            pipeline.count_request(ok=False)
+            self._send(500, {"error": str(e)})
+            return
+        pipeline.count_request(ok=True)
+        self._send(200, body)
+
+
+def serve(daemon: PipelineDaemon, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> DaemonServer:
+    """
+    Start the HTTP endpoint on a background thread.
+
+    Args:
+        daemon: Pipeline answering the requests
+        host: Interface to bind
+        port: Port to bind (0 picks a free one; see server.server_address)
+
+    Returns:
+        The running DaemonServer (call .shutdown() to stop it)
+    """
+    server = DaemonServer((host, port), daemon, max_bytes=ExtractionLimits.from_env().max_bytes)
+    threading.Thread(target=server.serve_forever, name="daemon-http", daemon=True).start()
+    logger.info(f"Match endpoint listening on http://{host}:{server.server_address[1]}/match")
+    return server
+
+
+def main(args) -> None:
+    """Run the daemon (and its HTTP endpoint unless args.port is 0) until interrupted; args as parsed below."""
+    daemon = PipelineDaemon(
+        {
+            "pdf_files_path": args.cv_dir,
+            "txt_files_path": args.txt_dir,
+            "json_files_path": args.json_dir,
+            "matches_output_path": args.matches_dir,
+        },
+        knowledge_dir=args.knowledge_dir,
+        poll_seconds=args.poll,
+        concurrency=args.concurrency,
+        manifest_path=args.manifest,
+    )
+    server = serve(daemon, args.host, args.port) if args.port else None
+    try:
+        daemon.run()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Stopping")
+    finally:
+        daemon.stop()
+        if server is not None:
+            server.shutdown()
+        finish_run()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Warm pipeline daemon: watch CV/ and serve single-CV matches.")
+    parser.add_argument("--cv-dir", default="CV")
+    parser.add_argument("--txt-dir", default="preprocessed-CVs")
+    parser.add_argument("--json-dir", default="processed-CVs")
+    parser.add_argument("--matches-dir", default="job-matches-results")
+    parser.add_argument("--knowledge-dir", default="knowledge")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="HTTP port (0: no endpoint)")
+    parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS, help="Seconds between CV folder polls")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Candidates processed at once")
+    args = parser.parse_args()
+
+    setup_logging()
+    main(args)
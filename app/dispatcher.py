@@ -0,0 +1,260 @@
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Priority lanes: lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = ("ratelimit", "timeout", "apiconnection", "serviceunavailable", "internalserver", "overloaded")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """Return the HTTP status code carried by a provider exception, if any."""
+    for attr in ("status_code", "status", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for 429 / 5xx / timeout / connection errors from the provider."""
+    code = status_code_of(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    name = type(error).__name__.lower()
+    return any(part in name for part in _RETRYABLE_NAMES)
+
+
+def retry_after_of(error: BaseException) -> Optional[float]:
+    """Return the Retry-After delay (seconds) sent with a provider error, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` tokens per minute.
+
+    A request larger than the capacity is allowed once the bucket is full, so a
+    single oversized prompt cannot block forever.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            needed = min(amount, self.capacity) - self.tokens
+            return max(0.0, needed / self.rate) if self.rate > 0 else 0.0
+
+    def try_acquire(self, amount: float) -> bool:
+        """Take `amount` tokens if available."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= min(amount, self.capacity):
+                self.tokens -= amount
+                return True
+            return False
+
+    def acquire(self, amount: float) -> None:
+        """Block until `amount` tokens are taken."""
+        while not self.try_acquire(amount):
+            time.sleep(min(1.0, max(0.005, self.wait_time(amount))))
+
+    def refund(self, amount: float) -> None:
+        """Return tokens that were reserved but not used."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LLMDispatcher:
+    """
+    Runs model calls on a fixed pool of worker threads within provider rate limits.
+
+    Calls wait in a priority queue (interactive lane ahead of bulk work), each
+    worker takes one request from the RPM bucket and the estimated tokens from
+    the TPM bucket before calling, so at most `max_in_flight` calls are open at
+    once. 429 / 5xx / timeout errors are retried with jittered exponential
+    backoff, honoring Retry-After when the provider sends it.
+
+    Args:
+        rpm: Requests per minute allowed (None = unlimited)
+        tpm: Tokens per minute allowed (None = unlimited)
+        max_in_flight: Number of concurrent calls
+        max_retries: Retries per call on retryable errors
+        base_delay: First backoff delay in seconds (doubles each retry)
+        max_delay: Backoff ceiling in seconds
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.rpm_bucket = TokenBucket(rpm) if rpm else None
+        self.tpm_bucket = TokenBucket(tpm) if tpm else None
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "retries": 0, "rate_limited": 0}
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._stats_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"llm-dispatch-{i}", daemon=True)
+            for i in range(max_in_flight)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMDispatcher"]:
+        """Build a dispatcher from LLM_RPM / LLM_TPM / LLM_MAX_IN_FLIGHT; None if none are set."""
+        rpm, tpm, in_flight = os.getenv("LLM_RPM"), os.getenv("LLM_TPM"), os.getenv("LLM_MAX_IN_FLIGHT")
+        if not (rpm or tpm or in_flight):
+            return None
+        return cls(
+            rpm=float(rpm) if rpm else None,
+            tpm=float(tpm) if tpm else None,
+            max_in_flight=int(in_flight) if in_flight else 4,
+        )
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        priority: int = PRIORITY_BULK,
+        tokens: int = 0,
+    ) -> Future:
+        """
+        Queue a call.
+
+        Args:
+            fn: Zero-argument callable performing the model call
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BULK (lower runs first)
+            tokens: Estimated prompt + completion tokens, charged to the TPM bucket
+
+        Returns:
+            Future resolving to fn's return value; once done, its `retries`
+            attribute holds the number of retries the call needed
+        """
+        future: Future = Future()
+        self._count("submitted")
+        self._queue.put((priority, next(self._sequence), fn, tokens, future))
+        return future
+
+    def run(self, fn: Callable[[], Any], priority: int = PRIORITY_BULK, tokens: int = 0) -> Any:
+        """Queue a call and wait for its result."""
+        return self.submit(fn, priority=priority, tokens=tokens).result()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = retry_after_of(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        # full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _worker(self) -> None:
+        while True:
+            priority, _, fn, tokens, future = self._queue.get()
+            if fn is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            attempt = 0
+            while True:
+                if self.rpm_bucket:
+                    self.rpm_bucket.acquire(1)
+                if self.tpm_bucket and tokens:
+                    self.tpm_bucket.acquire(tokens)
+                try:
+                    result = fn()
+                except BaseException as e:
+                    if is_retryable(e) and attempt < self.max_retries:
+                        if status_code_of(e) == 429 or "ratelimit" in type(e).__name__.lower():
+                            self._count("rate_limited")
+                        self._count("retries")
+                        delay = self._backoff(attempt, e)
+                        logger.warning(f"Retryable LLM error ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                        attempt += 1
+                        time.sleep(delay)
+                        continue
+                    self._count("failed")
+                    future.retries = attempt
+                    future.set_exception(e)
+                else:
+                    self._count("completed")
+                    future.retries = attempt
+                    future.set_result(result)
+                break
+
+    def shutdown(self) -> None:
+        """Stop the workers after the queued calls finish."""
+        for _ in self._workers:
+            self._queue.put((float("inf"), next(self._sequence), None, 0, None))
+        for worker in self._workers:
+            worker.join()
+
+    def log_stats(self) -> None:
+        """Log the dispatcher counters as a structured record."""
+        logger.info(
+            f"LLM dispatcher: {self.stats['completed']} completed, {self.stats['failed']} failed, "
+            f"{self.stats['retries']} retries ({self.stats['rate_limited']} rate limited)",
+            extra={"extra_fields": {"llm_dispatcher": dict(self.stats)}},
+        )
+
+
+_default_dispatcher: Optional[LLMDispatcher] = None
+_default_dispatcher_loaded = False
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_default_dispatcher() -> Optional[LLMDispatcher]:
+    """Return the process-wide dispatcher configured from the environment (None if not configured)."""
+    global _default_dispatcher, _default_dispatcher_loaded
+    with _default_dispatcher_lock:
+        if not _default_dispatcher_loaded:
+            _default_dispatcher = LLMDispatcher.from_env()
+            _default_dispatcher_loaded = True
+    return _default_dispatcher
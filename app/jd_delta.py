@@ -0,0 +1,256 @@
+"""
+Delta matching when job descriptions are added, edited or removed.
+
+The manifest keeps the content hash of every job description from the last
+recorded run. diff_jobs() compares them with the JDs loaded now, and
+apply_jd_delta() then only matches the already-processed candidates against
+the new and changed JDs, drops the results of changed and removed JDs from
+their result files, and marks the candidates as up to date with the new JD
+set. Adding one JD to a pool of N candidates costs N single-job matches
+instead of re-matching every candidate against every JD.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.batch_matching import match_candidate_batch, resolve_job_ids
+from app.knowledge import job_title
+from app.logging_config import get_logger
+from app.manifest import PipelineManifest
+from app.match_store import MatchStore
+from app.model import CandidateCV, JobMatchResult
+from app.shortlist import prune_prefiltered
+from app.telemetry import span
+
+logger = get_logger(__name__)
+
+DEFAULT_DELTA_WORKERS = 4
+
+BatchMatchFn = Callable[[CandidateCV, List[Dict[str, Any]]], List[JobMatchResult]]
+
+
+class JDDelta(BaseModel):
+    """Job descriptions that changed since the last recorded run"""
+    added: List[str] = Field(default_factory=list, description="job_ids not seen in the last run")
+    changed: List[str] = Field(default_factory=list, description="job_ids whose content hash changed")
+    removed: List[str] = Field(default_factory=list, description="job_ids no longer in knowledge/")
+    unchanged: List[str] = Field(default_factory=list)
+    previous_set_hash: Optional[str] = Field(None, description="JD set hash of the last run (None on a first run)")
+    jd_set_hash: str = ""
+    job_hashes: Dict[str, str] = Field(default_factory=dict, description="job_id -> content hash of the current JDs")
+
+    @property
+    def affected(self) -> List[str]:
+        """job_ids that candidates must be (re)matched against."""
+        return self.added + self.changed
+
+    def is_empty(self) -> bool:
+        """
+        True when no job changed and the recorded JD set hash is the current one.
+
+        A manifest written when the set hash still covered raw file bytes has the
+        same jobs under another hash; apply_jd_delta() then only rebases it.
+        """
+        if self.added or self.changed or self.removed:
+            return False
+        return self.previous_set_hash is None or self.previous_set_hash == self.jd_set_hash
+
+
+class JDDeltaSummary(BaseModel):
+    """Totals for one apply_jd_delta() call"""
+    candidates: int = Field(0, description="Candidates whose matches were current for the previous JD set")
+    updated: List[str] = Field(default_factory=list)
+    failed: List[str] = Field(default_factory=list)
+    matches: int = Field(0, description="New JobMatchResults computed")
+    retired: int = Field(0, description="Match store rows of removed JDs no longer current")
+    seconds: float = 0.0
+
+
+def diff_jobs(
+    job_hashes: Dict[str, str],
+    previous_hashes: Dict[str, str],
+    jd_set_hash: str = "",
+    previous_set_hash: Optional[str] = None,
+) -> JDDelta:
+    """
+    Compare the current job content hashes with those of the last run.
+
+    Args:
+        job_hashes: job_id -> content hash of the current job descriptions
+        previous_hashes: job_id -> content hash recorded by the last run
+        jd_set_hash: job_set_hash() of the current job descriptions
+        previous_set_hash: JD set hash recorded by the last run
+
+    Returns:
+        JDDelta listing added, changed, removed and unchanged job_ids
+    """
+    delta = JDDelta(jd_set_hash=jd_set_hash, previous_set_hash=previous_set_hash, job_hashes=dict(job_hashes))
+    for job_id, content_hash in sorted(job_hashes.items()):
+        if job_id not in previous_hashes:
+            delta.added.append(job_id)
+        elif previous_hashes[job_id] != content_hash:
+            delta.changed.append(job_id)
+        else:
+            delta.unchanged.append(job_id)
+    delta.removed = sorted(set(previous_hashes) - set(job_hashes))
+    return delta
+
+
+class UnresolvedResultsError(Exception):
+    """Raised when some existing match results cannot be attributed to a job description."""
+
+
+def merge_results(existing: List[Dict[str, Any]], new: List[JobMatchResult], drop: set) -> List[Dict[str, Any]]:
+    """Replace the results of the `drop` job_ids with `new`, best overall score first (items need a job_id)."""
+    merged = [item for item in existing if item.get("job_id") not in drop]
+    merged.extend(result.model_dump(mode="json") for result in new)
+    merged.sort(key=lambda item: item.get("overall_score") or 0.0, reverse=True)
+    return merged
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def apply_jd_delta(
+    inputs: Dict[str, str],
+    jobs: List[Dict[str, Any]],
+    delta: JDDelta,
+    manifest: PipelineManifest,
+    match_fn: BatchMatchFn = match_candidate_batch,
+    match_store: Optional[MatchStore] = None,
+    max_workers: int = DEFAULT_DELTA_WORKERS,
+) -> JDDeltaSummary:
+    """
+    Bring the match results of already-processed candidates up to date with the current JDs.
+
+    Only candidates whose results were current for the previous JD set are
+    touched; the others are still pending for a full match in manifest.plan().
+    Each one is matched against the added and changed jobs only (one batched
+    call) and its result file keeps the results of the unchanged jobs. Existing
+    results are attributed to jobs by job_id or job title; a candidate with a
+    result that matches neither is left for a full match as well. Stale
+    pre-filtered results (see app.shortlist) of removed jobs, and of the
+    affected jobs for updated candidates, are dropped. The manifest entries
+    of updated candidates and its JD state are updated in memory; call
+    manifest.save() afterwards.
+
+    Args:
+        inputs: The crew inputs (json_files_path, matches_output_path, ...)
+        jobs: Current job description dicts (see load_job_descriptions)
+        delta: Result of diff_jobs() for these jobs
+        manifest: Pipeline manifest of the last run
+        match_fn: Batched matcher, called as match_fn(cv, affected_jobs)
+        match_store: Also write new results here and retire removed JDs
+        max_workers: Candidates matched concurrently
+
+    Returns:
+        JDDeltaSummary
+    """
+    started = time.perf_counter()
+    summary = JDDeltaSummary()
+    if delta.previous_set_hash is None:
+        logger.info("No job description state recorded yet, skipping delta matching")
+        return summary
+    if delta.previous_set_hash == delta.jd_set_hash:
+        return summary
+
+    affected = set(delta.affected)
+    drop = affected | set(delta.removed)
+    affected_jobs = [job for job in jobs if job.get("job_id") in affected]
+    current = manifest.current_matches(inputs, delta.previous_set_hash)
+    summary.candidates = len(current)
+    logger.info(
+        f"Job descriptions since last run: {len(delta.added)} added, {len(delta.changed)} changed, "
+        f"{len(delta.removed)} removed; matching {len(current)} candidate(s) against {len(affected_jobs)} job(s)"
+    )
+
+    # ids an existing result may carry: current jobs, plus those removed since the last run
+    known_ids = set(delta.job_hashes) | set(delta.removed)
+
+    def update(stem: str) -> Tuple[str, int, List[JobMatchResult]]:
+        match_path = os.path.join(inputs["matches_output_path"], f"{stem}.json")
+        with open(match_path, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+        existing = existing if isinstance(existing, list) else [existing]
+        # results written by the crew carry no job_id; the files are sorted by score, so not by position
+        job_ids = resolve_job_ids(existing, jobs, known_ids, by_position=False)
+        unresolved = [item.get("job_title") for item, job_id in zip(existing, job_ids) if job_id is None]
+        if unresolved:
+            raise UnresolvedResultsError(f"no job description for result(s) {unresolved}")
+
+        with span("match", cv=stem, jobs=len(affected_jobs), delta=True):
+            results: List[JobMatchResult] = []
+            if affected_jobs:
+                with open(os.path.join(inputs["json_files_path"], f"{stem}.json"), "r", encoding="utf-8") as f:
+                    cv = CandidateCV.model_validate_json(f.read())
+                results = match_fn(cv, affected_jobs)
+            existing = [{**item, "job_id": job_id} for item, job_id in zip(existing, job_ids)]
+            merged = merge_results(existing, results, drop)
+            validated = [JobMatchResult.model_validate(item) for item in merged]
+            _write_json(match_path, merged)
+        return stem, len(results), validated
+
+    def guarded(stem: str) -> Optional[Tuple[str, int, List[JobMatchResult]]]:
+        try:
+            return update(stem)
+        except Exception as e:
+            logger.warning(f"{stem}: delta matching failed, leaving it for a full match: {e}")
+            summary.failed.append(stem)
+            return None
+
+    # every updated candidate's full list is written, which also retires its rows stored under a job title
+    writer = match_store.writer(source="jd-delta", replace=True) if match_store is not None else None
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for outcome in pool.map(guarded, sorted(current)):
+            if outcome is None:
+                continue
+            stem, new_matches, merged = outcome
+            summary.updated.append(stem)
+            summary.matches += new_matches
+            if writer is not None:
+                writer.add(stem, merged)
+    if writer is not None:
+        writer.flush()
+    if match_store is not None:
+        summary.retired = match_store.retire_jobs(delta.removed, [job_title(job) for job in jobs])
+    # pre-filtered results of removed jobs are stale for everyone; updated candidates now have full ones
+    prune_prefiltered(inputs["matches_output_path"], delta.removed)
+    prune_prefiltered(inputs["matches_output_path"], affected, summary.updated)
+
+    manifest.rebase_matches(inputs, summary.updated, delta.jd_set_hash)
+    manifest.jd_set_hash, manifest.job_hashes = delta.jd_set_hash, dict(delta.job_hashes)
+    summary.failed.sort()
+    summary.seconds = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Delta matching: {len(summary.updated)} candidate(s) updated with {summary.matches} new match(es), "
+        f"{len(summary.failed)} failed, {summary.retired} retired result(s) in {summary.seconds:.2f}s"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.knowledge import job_content_hashes, job_set_hash, load_job_descriptions
+    from app.logging_config import setup_logging
+    from app.manifest import DEFAULT_MANIFEST_PATH
+
+    parser = argparse.ArgumentParser(description="Show which job descriptions changed since the last run.")
+    parser.add_argument("--knowledge-dir", default="knowledge")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH)
+    args = parser.parse_args()
+
+    setup_logging()
+    manifest = PipelineManifest.load(args.manifest)
+    job_hashes = job_content_hashes(load_job_descriptions(args.knowledge_dir))
+    delta = diff_jobs(job_hashes, manifest.job_hashes, job_set_hash(job_hashes), manifest.jd_set_hash)
+    print(delta.model_dump_json(indent=2, exclude={"job_hashes"}))
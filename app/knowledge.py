@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_KNOWLEDGE_DIR = "knowledge"
+
+
+def list_job_description_files(knowledge_dir: str = DEFAULT_KNOWLEDGE_DIR) -> List[str]:
+    """Return the sorted paths of every job description JSON file in knowledge_dir."""
+    if not os.path.isdir(knowledge_dir):
+        return []
+    return sorted(
+        os.path.join(knowledge_dir, name)
+        for name in os.listdir(knowledge_dir)
+        if name.endswith(".json")
+    )
+
+
+def load_job_descriptions(knowledge_dir: str = DEFAULT_KNOWLEDGE_DIR) -> List[Dict[str, Any]]:
+    """
+    Load every job description JSON file in knowledge_dir.
+
+    Files that cannot be parsed are logged and skipped. Each returned dict gets a
+    `job_id` (falling back to the file stem) and a `_source_file` key.
+
+    Args:
+        knowledge_dir: Folder holding the job description JSON files
+
+    Returns:
+        List of job description dicts, sorted by file name
+    """
+    jobs = []
+    for path in list_job_description_files(knowledge_dir):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                job = json.load(f)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable job description {path}: {e}")
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        job.setdefault("job_id", stem)
+        job["_source_file"] = os.path.basename(path)
+        jobs.append(job)
+    return jobs
+
+
+def job_title(job: Dict[str, Any]) -> str:
+    """Return a job's title, accepting both `title` and the README's `job_title` key."""
+    return job.get("title") or job.get("job_title") or job.get("job_id", "")
+
+
+def job_must_have_skills(job: Dict[str, Any]) -> List[str]:
+    """Return the required skills, accepting both `must_have_skills` and `required_skills`."""
+    return list(job.get("must_have_skills") or job.get("required_skills") or [])
+
+
+def job_required_years(job: Dict[str, Any]) -> float:
+    """Return the required years of experience, accepting both key spellings."""
+    value = job.get("experience_required_years", job.get("required_experience_years", 0))
+    try:
+        return max(0.0, float(value or 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def job_content_hash(job: Dict[str, Any]) -> str:
+    """
+    Return a hash of a job description's content.
+
+    Keys added by load_job_descriptions (`_source_file`) are ignored and keys are
+    sorted, so reformatting or renaming a file does not change the hash.
+    """
+    content = {key: value for key, value in job.items() if not key.startswith("_")}
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def job_content_hashes(jobs: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Return job_id -> job_content_hash for a list of loaded job descriptions."""
+    return {job["job_id"]: job_content_hash(job) for job in jobs}
+
+
+def job_set_hash(job_hashes: Dict[str, str]) -> str:
+    """
+    Return a single hash for a JD set from its job_content_hashes().
+
+    Like the per-job hashes it ignores formatting and file names, so it only
+    changes when a job is added, removed or edited.
+    """
+    data = "\n".join(f"{job_id}:{content_hash}" for job_id, content_hash in sorted(job_hashes.items()))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
@@ -0,0 +1,286 @@
+"""
+Persisted, content-hash keyed knowledge embeddings in a local Qdrant collection.
+
+JobKnowledgeSource chunks each job description file and QdrantKnowledgeStorage
+keeps the chunks and their embeddings in an on-disk Qdrant collection under
+.cache/knowledge-qdrant. Points are keyed by the content hash of their file, so
+a JD is only embedded again when its file changes; chunks of edited and removed
+files are deleted. A small index file next to the collection records the hash
+of every stored file, so building the knowledge with an unchanged knowledge/
+folder only hashes the files and does not open the Qdrant collection.
+
+The default embedder is HashingEmbedder, an offline signed feature-hashing
+vectorizer (no model download or network access). Any object with `name`,
+`dim` and `embed(texts) -> List[List[float]]` can be plugged in instead; the
+embedder name is part of the collection name, so switching embedders never
+mixes vectors of different models. An embedder may also set `score_threshold`:
+cosine scores depend on the model, so search() applies the embedder's
+threshold instead of the caller's (crewai passes 0.6, tuned for dense models,
+under which hashing vectors match nothing).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from crewai.knowledge.source.json_knowledge_source import JSONKnowledgeSource
+from crewai.knowledge.storage.knowledge_storage import KnowledgeStorage
+
+from app.logging_config import get_logger
+from app.manifest import hash_bytes, hash_file
+
+logger = get_logger(__name__)
+
+DEFAULT_KNOWLEDGE_STORE_PATH = os.path.join(".cache", "knowledge-qdrant")
+DEFAULT_COLLECTION = "job_descriptions"
+DEFAULT_EMBEDDING_DIM = 512
+# hashing-vectorizer cosine scores are lower than those of dense models (a relevant chunk scores ~0.2-0.3)
+DEFAULT_SCORE_THRESHOLD = 0.1
+INDEX_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+# local Qdrant locks its folder: one client per path and process
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _qdrant(path: str):
+    from qdrant_client import QdrantClient
+
+    with _clients_lock:
+        if path not in _clients:
+            os.makedirs(path, exist_ok=True)
+            _clients[path] = QdrantClient(path=path)
+        return _clients[path]
+
+
+class HashingEmbedder:
+    """
+    Offline embedder: signed feature hashing of lower-cased word unigrams and bigrams, L2-normalized.
+
+    Args:
+        dim: Vector size
+        score_threshold: Minimum cosine score of a search hit
+    """
+
+    def __init__(self, dim: int = DEFAULT_EMBEDDING_DIM, score_threshold: float = DEFAULT_SCORE_THRESHOLD):
+        self.dim = dim
+        self.score_threshold = score_threshold
+
+    @property
+    def name(self) -> str:
+        return f"hashing{self.dim}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
+
+
+def _point_id(source: str, content_hash: str, chunk: int) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}:{content_hash}:{chunk}"))
+
+
+class QdrantKnowledgeStorage(KnowledgeStorage):
+    """
+    CrewAI knowledge storage backed by an on-disk local Qdrant collection.
+
+    Args:
+        collection_name: Knowledge collection (the Qdrant collection is knowledge_<name>_<embedder name>)
+        path: Qdrant storage folder (default: .cache/knowledge-qdrant)
+        embedder: Embedder with name, dim and embed() (default: HashingEmbedder)
+        score_threshold: Minimum score of a search hit, used instead of the one search() is
+            called with (default: the embedder's score_threshold; the caller's if it has none)
+    """
+
+    def __init__(
+        self,
+        collection_name: str = DEFAULT_COLLECTION,
+        path: str = DEFAULT_KNOWLEDGE_STORE_PATH,
+        embedder: Optional[Any] = None,
+        score_threshold: Optional[float] = None,
+    ):
+        super().__init__(collection_name=collection_name)
+        self.path = path
+        self.embedder = embedder or HashingEmbedder()
+        self.score_threshold = (
+            score_threshold if score_threshold is not None else getattr(self.embedder, "score_threshold", None)
+        )
+        self.qdrant_collection = f"knowledge_{collection_name}_{self.embedder.name}"
+        self.index_path = os.path.join(path, f"{self.qdrant_collection}.index.json")
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """source -> {"hash", "points"} of everything stored in the collection."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data.get("sources", {})
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable knowledge index {self.index_path}: {e}")
+        return {}
+
+    def _save_index(self, sources: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "sources": dict(sorted(sources.items()))}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _open(self, create: bool = False):
+        from qdrant_client import models
+
+        client = _qdrant(self.path)
+        if create and not client.collection_exists(self.qdrant_collection):
+            client.create_collection(
+                self.qdrant_collection,
+                vectors_config=models.VectorParams(size=self.embedder.dim, distance=models.Distance.COSINE),
+            )
+        return client
+
+    def sync(self, documents: Dict[str, Tuple[str, List[str]]], prune: bool = True) -> int:
+        """
+        Make the collection hold exactly the given documents, embedding only new content.
+
+        Args:
+            documents: source name -> (content hash, chunks)
+            prune: Delete the chunks of sources that are not in documents
+
+        Returns:
+            Number of chunks embedded
+        """
+        index = self._load_index()
+        stale = [
+            source for source, entry in index.items()
+            if (source in documents and entry["hash"] != documents[source][0]) or (prune and source not in documents)
+        ]
+        new = {
+            source: (content_hash, chunks) for source, (content_hash, chunks) in documents.items()
+            if source not in index or index[source]["hash"] != content_hash
+        }
+        if not stale and not new:
+            return 0
+
+        from qdrant_client import models
+
+        client = self._open(create=True)
+        stale_ids = [point for source in stale for point in index.pop(source)["points"]]
+        if stale_ids:
+            client.delete(self.qdrant_collection, points_selector=models.PointIdsList(points=stale_ids))
+
+        embedded = 0
+        for source, (content_hash, chunks) in sorted(new.items()):
+            vectors = self.embedder.embed(chunks) if chunks else []
+            points = [
+                models.PointStruct(
+                    id=_point_id(source, content_hash, i),
+                    vector=vector,
+                    payload={"content": chunk, "source": source, "content_hash": content_hash, "chunk": i},
+                )
+                for i, (chunk, vector) in enumerate(zip(chunks, vectors))
+            ]
+            if points:
+                client.upsert(self.qdrant_collection, points=points)
+            index[source] = {"hash": content_hash, "points": [point.id for point in points]}
+            embedded += len(points)
+
+        self._save_index(index)
+        logger.info(
+            f"Knowledge {self.qdrant_collection}: embedded {embedded} chunk(s) from {len(new)} source(s), "
+            f"removed {len(stale_ids)} stale chunk(s)"
+        )
+        return embedded
+
+    def save(self, documents: List[str]) -> None:
+        """Store documents (each its own source, keyed by content hash); already stored ones are skipped."""
+        keyed = {}
+        for document in documents:
+            content_hash = hash_bytes(document.encode("utf-8"))
+            keyed[f"doc:{content_hash}"] = (content_hash, [document])
+        self.sync(keyed, prune=False)
+
+    def search(
+        self,
+        query: List[str],
+        limit: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        score_threshold: float = DEFAULT_SCORE_THRESHOLD,
+    ) -> List[Dict[str, Any]]:
+        """Chunks closest to the query; score_threshold is replaced by the storage's own (see above)."""
+        if not query or not self._load_index():
+            return []
+        if self.score_threshold is not None:
+            score_threshold = self.score_threshold
+        from qdrant_client import models
+
+        query_filter = None
+        if metadata_filter:
+            query_filter = models.Filter(must=[
+                models.FieldCondition(key=key, match=models.MatchValue(value=value))
+                for key, value in metadata_filter.items()
+            ])
+        vector = self.embedder.embed([" ".join(query)])[0]
+        points = self._open().query_points(
+            self.qdrant_collection,
+            query=vector,
+            limit=limit,
+            query_filter=query_filter,
+            score_threshold=score_threshold,
+            with_payload=True,
+        ).points
+        return [
+            {
+                "id": str(point.id),
+                "content": point.payload.get("content", ""),
+                "metadata": {key: value for key, value in point.payload.items() if key != "content"},
+                "score": point.score,
+            }
+            for point in points
+        ]
+
+    def reset(self) -> None:
+        if self._load_index():
+            client = self._open()
+            if client.collection_exists(self.qdrant_collection):
+                client.delete_collection(self.qdrant_collection)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+
+class JobKnowledgeSource(JSONKnowledgeSource):
+    """
+    JSONKnowledgeSource that chunks each file on its own and syncs the chunks by file hash.
+
+    Use with QdrantKnowledgeStorage: unchanged files are neither re-chunked into
+    the store nor re-embedded, and chunks of files no longer listed are removed.
+    """
+
+    def add(self) -> None:
+        documents = {}
+        for path, text in self.content.items():
+            content_hash = hash_file(str(path)) or hash_bytes(text.encode("utf-8"))
+            chunks = self._chunk_text(text)
+            documents[Path(path).name] = (content_hash, chunks)
+            self.chunks.extend(chunks)
+        if isinstance(self.storage, QdrantKnowledgeStorage):
+            self.storage.sync(documents)
+        else:
+            self._save_documents()
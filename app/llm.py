@@ -0,0 +1,165 @@
+import os
+import re
+from functools import partial
+from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+from app.dispatcher import PRIORITY_BULK, LLMDispatcher, estimate_tokens, get_default_dispatcher
+from app.llm_cache import LLMResponseCache, cache_key, get_default_cache
+from app.logging_config import get_logger
+from app.telemetry import span
+from app.validation import validate_reply
+
+logger = get_logger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+DEFAULT_MODEL = "openai/gpt-4o-mini"
+DEFAULT_TEMPERATURE = 0.0
+# completion tokens charged to the TPM budget before the real count is known
+EXPECTED_COMPLETION_TOKENS = 1500
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.I)
+
+
+def model_name() -> str:
+    """Return the model configured in the MODEL environment variable."""
+    return os.getenv("MODEL", DEFAULT_MODEL)
+
+
+def to_messages(prompt: Union[str, List[Dict[str, str]]], system: Optional[str] = None) -> List[Dict[str, str]]:
+    """Turn a prompt string (plus optional system message) into chat messages."""
+    if isinstance(prompt, list):
+        return prompt
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def parse_structured(raw: Any, response_model: Type[T]) -> T:
+    """
+    Validate a raw model reply against response_model.
+
+    Accepts an already-parsed model instance, a dict, or a JSON string
+    (optionally wrapped in a markdown code fence).
+    """
+    if isinstance(raw, response_model):
+        return raw
+    if isinstance(raw, BaseModel):
+        return response_model.model_validate(raw.model_dump())
+    if isinstance(raw, dict):
+        return response_model.model_validate(raw)
+    return response_model.model_validate_json(_CODE_FENCE.sub("", str(raw).strip()))
+
+
+def complete(
+    prompt: Union[str, List[Dict[str, str]]],
+    response_model: Optional[Type[BaseModel]] = None,
+    model: Optional[str] = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    system: Optional[str] = None,
+    cache: Union[LLMResponseCache, None, bool] = True,
+    dispatcher: Union[LLMDispatcher, None, bool] = True,
+    priority: int = PRIORITY_BULK,
+) -> Any:
+    """
+    Send one chat completion through crewai's LLM and return the raw reply.
+
+    Replies are served from / stored in the LLM response cache, so identical
+    requests (same model, normalized prompt, schema and temperature) are only
+    paid for once. Each call is recorded as an "llm" telemetry span (cache
+    hit/miss, tokens, retries).
+
+    Args:
+        prompt: User prompt, or a full list of chat messages
+        response_model: Pydantic model to request structured output for
+        model: Model name (default: MODEL env var)
+        temperature: Sampling temperature
+        system: Optional system message
+        cache: Cache to use; True for the default cache, False/None to bypass
+        dispatcher: Rate-limited dispatcher to route the call through; True for the
+            default one (configured via LLM_RPM / LLM_TPM / LLM_MAX_IN_FLIGHT), False/None to call directly
+        priority: Dispatcher lane (PRIORITY_INTERACTIVE runs ahead of PRIORITY_BULK)
+
+    Returns:
+        The provider's reply (string or parsed object)
+    """
+    model = model or model_name()
+    messages = to_messages(prompt, system)
+    if cache is True:
+        cache = get_default_cache()
+
+    with span("llm", model=model, schema=response_model.__name__ if response_model else None) as s:
+        key = None
+        if cache:
+            key = cache_key(model, messages, response_model, temperature)
+            cached = cache.get(key)
+            if cached is not None:
+                s.set(cache="hit")
+                return cached
+            s.set(cache="miss")
+
+        from crewai import LLM
+
+        if dispatcher is True:
+            dispatcher = get_default_dispatcher()
+        # the dispatcher retries with its own backoff and rate accounting; the provider SDK must not retry too
+        retry_params = {"max_retries": 0} if dispatcher else {}
+        llm = LLM(model=model, temperature=temperature, response_format=response_model, **retry_params)
+        if dispatcher and getattr(llm, "is_litellm", False):
+            llm.additional_params["num_retries"] = 0
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        if dispatcher:
+            future = dispatcher.submit(
+                lambda: llm.call(messages), priority=priority, tokens=prompt_tokens + EXPECTED_COMPLETION_TOKENS
+            )
+            try:
+                raw = future.result()
+            finally:
+                s.set(retries=getattr(future, "retries", 0))
+        else:
+            raw = llm.call(messages)
+
+        text = raw.model_dump_json() if isinstance(raw, BaseModel) else str(raw)
+        # provider-reported usage when available, else the ~4 chars/token estimate
+        usage = getattr(llm, "_token_usage", None) or {}
+        s.set(
+            prompt_tokens=usage.get("prompt_tokens") or prompt_tokens,
+            completion_tokens=usage.get("completion_tokens") or estimate_tokens(text),
+        )
+        if cache and raw is not None:
+            cache.put(key, model, text)
+        return raw
+
+
+def structured_call(
+    prompt: Union[str, List[Dict[str, str]]],
+    response_model: Type[T],
+    model: Optional[str] = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    system: Optional[str] = None,
+    cache: Union[LLMResponseCache, None, bool] = True,
+    priority: int = PRIORITY_BULK,
+) -> T:
+    """
+    Call the model and return its reply validated as response_model.
+
+    Invalid values are coerced or dropped and the fields that lost data are
+    repaired with one follow-up call for only those fields (see
+    app.validation), so one bad value does not cost a full retry. A reply that
+    still does not validate is removed from the cache and the error raised.
+    """
+    raw = complete(
+        prompt, response_model, model=model, temperature=temperature, system=system, cache=cache, priority=priority
+    )
+    try:
+        repair_fn = partial(complete, model=model, temperature=temperature, cache=cache, priority=priority)
+        return validate_reply(raw, response_model, complete_fn=repair_fn, system=system)[0]
+    except Exception:
+        # never replay a reply that does not validate
+        if cache is True:
+            cache = get_default_cache()
+        if cache:
+            cache.delete(cache_key(model or model_name(), to_messages(prompt, system), response_model, temperature))
+        raise
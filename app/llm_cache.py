@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_cache.sqlite3")
+DEFAULT_MAX_MB = 512
+DEFAULT_MAX_AGE_DAYS = 30
+# least-recently-used entries looked up per round of size eviction
+EVICTION_BATCH = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at);
+"""
+
+
+def normalize_messages(messages: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, str]]:
+    """Collapse whitespace in every message so cosmetic prompt edits do not bust the cache."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    return [
+        {"role": str(m.get("role", "user")), "content": " ".join(str(m.get("content") or "").split())}
+        for m in messages
+    ]
+
+
+def cache_key(
+    model: str,
+    messages: Union[str, List[Dict[str, Any]]],
+    response_model: Optional[Type[BaseModel]] = None,
+    temperature: Optional[float] = None,
+) -> str:
+    """Hash of model name, normalized prompt, output JSON schema and temperature."""
+    payload = {
+        "model": model,
+        "messages": normalize_messages(messages),
+        "schema": response_model.model_json_schema() if response_model else None,
+        "temperature": temperature,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed store of model replies with size- and age-based LRU eviction.
+
+    Args:
+        path: SQLite file (created if missing)
+        max_bytes: Total response size kept before least-recently-used entries are evicted
+        max_age_seconds: Entries older than this are evicted regardless of use
+
+    The total response size is kept as a running count (read from the file when
+    it is opened), so a put does not have to sum the table. Entries written by
+    other processes sharing the file are only counted after it is reopened.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        max_age_seconds: float = DEFAULT_MAX_AGE_DAYS * 86400,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        """Build the cache from LLM_CACHE* env vars; returns None when LLM_CACHE=0."""
+        if os.getenv("LLM_CACHE", "1").lower() in ("0", "false", "off"):
+            return None
+        return cls(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+            max_age_seconds=float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)) * 86400,
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reply for key, or None (counted as a miss)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        logger.debug(f"LLM cache hit {key[:12]}")
+        return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a reply and evict entries beyond the age and size limits."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model, response, size, now, now),
+            )
+            self._bytes += size - (replaced[0] if replaced else 0)
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.max_age_seconds
+        # both statements use the created_at index and usually find nothing
+        expired, expired_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE created_at < ?", (cutoff,)
+        ).fetchone()
+        if expired:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+            self.evictions += expired
+            self._bytes -= expired_bytes
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT ?", (EVICTION_BATCH,)
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= size
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Forget one cached reply (e.g. one that failed validation)."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            self._bytes -= row[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current entry count and size."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries, "bytes": size}
+
+    def log_stats(self) -> None:
+        """Log the cache counters as a structured record."""
+        stats = self.stats()
+        logger.info(
+            f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries",
+            extra={"extra_fields": {"llm_cache": stats}},
+        )
+
+    def clear(self) -> None:
+        """Delete every cached reply."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_loaded = False
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide cache configured from the environment (None if disabled)."""
+    global _default_cache, _default_cache_loaded
+    with _default_cache_lock:
+        if not _default_cache_loaded:
+            _default_cache = LLMResponseCache.from_env()
+            _default_cache_loaded = True
+    return _default_cache
@@ -1,7 +1,23 @@
+import atexit
 import logging
+import os
+import queue
+import signal
 import sys
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 import json
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional, TextIO
+
+# queued mode defaults
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+_encoder = json.JSONEncoder(default=str)
 
 
 class StructuredFormatter(logging.Formatter):
@@ -11,7 +27,8 @@ class StructuredFormatter(logging.Formatter):
 
     def format(self, record):
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            # time the record was created, not formatted (they differ in queued mode)
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -23,30 +40,360 @@ class StructuredFormatter(logging.Formatter):
         # Add exception info if present
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
 
         # Add any extra fields passed via extra parameter
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
 
-        return json.dumps(log_data)
+        return _encoder.encode(log_data)
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse "app.telemetry=0.1,httpx=0" into {logger_name: keep_rate}."""
+    rates = {}
+    for part in (value or "").split(","):
+        name, sep, rate = part.strip().partition("=")
+        if sep and name:
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the low-severity records of chosen loggers.
+
+    Rates apply to a logger and its children (the most specific name wins) and
+    only to records below `max_level`; warnings and errors are always kept.
+    Sampling is deterministic: with a rate of 0.1 every tenth record is kept.
+
+    Args:
+        rates: Logger name -> share of records to keep (0..1)
+        max_level: Records at this level or above are never sampled out
+    """
+
+    def __init__(self, rates: Dict[str, float], max_level: int = logging.WARNING):
+        super().__init__()
+        self.rates = dict(rates)
+        self.max_level = max_level
+        self._credit: Dict[str, float] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _rule_for(self, name: str) -> Optional[str]:
+        if name not in self._resolved:
+            candidates = [key for key in self.rates if name == key or name.startswith(key + ".")]
+            self._resolved[name] = max(candidates, key=len) if candidates else None
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.max_level:
+            return True
+        rule = self._rule_for(record.name)
+        if rule is None:
+            return True
+        with self._lock:
+            credit = self._credit.get(rule, 0.0) + self.rates[rule]
+            keep = credit >= 1.0
+            self._credit[rule] = credit - 1.0 if keep else credit
+        return keep
+
+
+class LogSink:
+    """
+    Destination of a queued log writer: a stream, or a file rotated by size.
+
+    Args:
+        stream: Stream to write to when no path is given (default: stdout)
+        path: Log file path
+        max_bytes: Rotate the file once it would exceed this size (0 = never)
+        backup_count: Number of rotated files kept (path.1 ... path.N)
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        path: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.size = 0
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.stream = open(path, "a", encoding="utf-8")
+            self.size = self.stream.tell()
+        else:
+            self.stream = stream or sys.stdout
+
+    def _rotate(self) -> None:
+        self.stream.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.stream = open(self.path, "w", encoding="utf-8")
+        self.size = 0
+
+    def write(self, text: str) -> None:
+        """Write a batch of formatted lines and flush."""
+        if self.path and self.max_bytes and self.size and self.size + len(text) > self.max_bytes:
+            self._rotate()
+        self.stream.write(text)
+        self.stream.flush()
+        self.size += len(text)
+
+    def close(self) -> None:
+        if self.path:
+            self.stream.close()
+
+
+class QueuedLogHandler(logging.Handler):
+    """
+    Hands records to a background thread that formats and writes them in batches.
+
+    The logging thread only renders the message (so later changes to mutable
+    arguments do not leak in) and enqueues the record; formatting, JSON
+    serialization and I/O happen on the writer thread, which writes up to
+    `batch_size` records per write call and at least every `flush_interval`
+    seconds. When the queue is full the caller waits for the writer, or, with
+    drop_when_full, records below WARNING are dropped and counted instead.
+
+    Args:
+        sink: Where formatted records are written
+        queue_size: Max records waiting to be written
+        batch_size: Max records formatted and written together
+        flush_interval: Max seconds a record waits before being written
+        drop_when_full: Drop low-severity records rather than wait when the queue is full
+    """
+
+    def __init__(
+        self,
+        sink: LogSink,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        drop_when_full: bool = False,
+    ):
+        super().__init__()
+        self.sink = sink
+        self.drop_when_full = drop_when_full
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._start()
+
+    def _start(self) -> None:
+        self.queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._flushed = threading.Condition()
+        self._written = 0
+        self._enqueued = 0
+        self._writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._writer.start()
+
+    def _restart_after_fork(self) -> None:
+        # the writer thread does not survive fork(); give the child its own
+        self._start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record = self.prepare(record)
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                if self.drop_when_full and record.levelno < logging.WARNING:
+                    with self._dropped_lock:
+                        self.dropped += 1
+                    return
+                self.queue.put(record)
+            with self._flushed:
+                self._enqueued += 1
+        except Exception:
+            self.handleError(record)
+
+    def _format_batch(self, records: List[logging.LogRecord]) -> str:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                lines.append(f"{record.levelname} {record.name}: {record.msg} (unformattable record)")
+        return "\n".join(lines) + "\n"
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                first = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            if first is None:
+                stop = True
+            else:
+                batch.append(first)
+            while len(batch) < self.batch_size and not stop:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                else:
+                    batch.append(record)
+            received = len(batch)
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                batch.append(logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"Log queue full: dropped {dropped} record(s) below WARNING",
+                }))
+            if batch:
+                try:
+                    self.sink.write(self._format_batch(batch))
+                except Exception as e:
+                    sys.stderr.write(f"log writer failed: {e}\n")
+            with self._flushed:
+                self._written += received
+                self._flushed.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every record enqueued so far is written (or timeout)."""
+        with self._flushed:
+            target = self._enqueued
+            self._flushed.wait_for(lambda: self._written >= target or not self._writer.is_alive(), timeout)
+
+    def close(self) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if self._writer.is_alive():
+            self.queue.put(None)
+            self._writer.join(timeout=10)
+        self.sink.close()
+        super().close()
+
+
+_queued_handler: Optional[QueuedLogHandler] = None
+_hooks_installed = False
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the queued log writer, if any (runs automatically at exit)."""
+    global _queued_handler
+    handler, _queued_handler = _queued_handler, None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+        handler.close()
 
 
-def setup_logging(level=logging.INFO, json_format=False):
+def _after_fork_in_child() -> None:
+    if _queued_handler is not None:
+        _queued_handler._restart_after_fork()
+
+
+def _install_exit_hooks() -> None:
+    """Make sure queued records are written on normal exit and uncaught exceptions (chaining the previous hooks)."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+    atexit.register(shutdown_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_after_fork_in_child)
+
+    previous_excepthook = sys.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        if not issubclass(exc_type, KeyboardInterrupt):
+            logging.getLogger(__name__).critical("Uncaught exception", exc_info=(exc_type, exc, tb))
+        shutdown_logging()
+        previous_excepthook(exc_type, exc, tb)
+
+    sys.excepthook = excepthook
+
+    previous_thread_excepthook = threading.excepthook
+
+    def thread_excepthook(args):
+        logging.getLogger(__name__).error(
+            f"Uncaught exception in thread {args.thread.name if args.thread else '?'}",
+            exc_info=(args.exc_type, args.exc_value, args.exc_traceback),
+        )
+        previous_thread_excepthook(args)
+
+    threading.excepthook = thread_excepthook
+
+
+def _install_sigterm_handler() -> None:
+    """Exit through sys.exit on SIGTERM, so atexit handlers (and the queued writer) run."""
+    # only when nobody else handles SIGTERM; signal handlers can only be set from the main thread
+    if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+
+def setup_logging(
+    level=logging.INFO,
+    json_format=False,
+    queued=None,
+    log_file=None,
+    sample_rates=None,
+    max_bytes=DEFAULT_MAX_BYTES,
+    backup_count=DEFAULT_BACKUP_COUNT,
+    batch_size=DEFAULT_BATCH_SIZE,
+    flush_interval=DEFAULT_FLUSH_INTERVAL,
+    handle_sigterm=None,
+):
     """
     Set up structured logging for the application.
 
     Args:
         level: Logging level (default: INFO)
         json_format: If True, use JSON formatting; otherwise use readable format
+        queued: If True, records go through a queue to a background writer that
+            formats and writes them in batches (default: LOG_QUEUED env var)
+        log_file: Write to this file, rotated by size, instead of stdout
+            (default: LOG_FILE env var)
+        sample_rates: Logger name -> share of its records below WARNING to keep,
+            e.g. {"app.telemetry": 0.1} (default: LOG_SAMPLE_RATES env var,
+            "app.telemetry=0.1,httpx=0")
+        max_bytes: Rotate log_file once it reaches this size
+        backup_count: Rotated log files kept
+        batch_size: Max records written per batch in queued mode
+        flush_interval: Max seconds a queued record waits before being written
+        handle_sigterm: In queued mode, turn SIGTERM into sys.exit so queued records
+            are written before the process ends; only when SIGTERM has no handler yet
+            (default: LOG_SIGTERM env var)
     """
     root_logger = logging.getLogger()
 
     # Remove existing handlers
+    shutdown_logging()
     root_logger.handlers.clear()
 
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
+    if queued is None:
+        queued = os.getenv("LOG_QUEUED", "").lower() in ("1", "true", "yes")
+    log_file = log_file or os.getenv("LOG_FILE") or None
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES"))
+    if handle_sigterm is None:
+        handle_sigterm = os.getenv("LOG_SIGTERM", "").lower() in ("1", "true", "yes")
 
     # Set formatter based on preference
     if json_format:
@@ -58,8 +405,27 @@ def setup_logging(level=logging.INFO, json_format=False):
             datefmt="%Y-%m-%d %H:%M:%S"
         )
 
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    if queued:
+        global _queued_handler
+        sink = LogSink(path=log_file, max_bytes=max_bytes, backup_count=backup_count)
+        handler = QueuedLogHandler(sink, batch_size=batch_size, flush_interval=flush_interval)
+        _queued_handler = handler
+        _install_exit_hooks()
+        if handle_sigterm:
+            _install_sigterm_handler()
+    elif log_file:
+        if os.path.dirname(log_file):
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    else:
+        # Create console handler
+        handler = logging.StreamHandler(sys.stdout)
+
+    handler.setLevel(level)
+    handler.setFormatter(formatter)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    root_logger.addHandler(handler)
     root_logger.setLevel(level)
 
     return root_logger
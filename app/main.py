@@ -1,15 +1,68 @@
-from app.crew import HRCrew
+import time
+from typing import Dict, Optional
 
+from app.jd_delta import apply_jd_delta
+from app.llm_cache import get_default_cache
+from app.logging_config import get_logger
+from app.manifest import DEFAULT_MANIFEST_PATH, PipelineManifest
+from app.match_store import MatchStore
+from app.telemetry import finish_run
 
-def run():
+logger = get_logger(__name__)
+
+
+def run(
+    inputs: Optional[Dict[str, str]] = None,
+    knowledge_dir: str = "knowledge",
+    manifest_path: str = DEFAULT_MANIFEST_PATH,
+):
+    """
+    Run the crew over the candidates that need work.
+
+    Args:
+        inputs: Folder inputs (pdf_files_path, txt_files_path, json_files_path,
+            matches_output_path); missing keys use the default folders
+        knowledge_dir: Folder holding the job description JSON files
+        manifest_path: Pipeline manifest recording what is up to date
+    """
     inputs = {
         "pdf_files_path": "CV",
         "txt_files_path": "preprocessed-CVs",
         "json_files_path": "processed-CVs",
         "matches_output_path": "job-matches-results",
+        **(inputs or {}),
     }
     try:
-        results = HRCrew().crew().kickoff(inputs=inputs)
+        # crewai and the knowledge stack are only imported when the crew actually runs
+        from app.crew import HRCrew
+
+        manifest = PipelineManifest.load(manifest_path)
+        hr_crew = HRCrew(knowledge_dir=knowledge_dir, manifest=manifest)
+        match_store = MatchStore.from_env()
+        if not hr_crew.jd_delta.is_empty():
+            # only match processed candidates against new / edited JDs
+            apply_jd_delta(inputs, hr_crew.jobs, hr_crew.jd_delta, manifest, match_store=match_store)
+            manifest.save()
+
+        plan = manifest.plan(inputs, knowledge_dir=knowledge_dir)
+        if plan.is_empty():
+            logger.info("All candidates are up to date, nothing to run")
+            return None
+
+        inputs.update(plan.as_inputs())
+        started = time.time()
+        results = hr_crew.crew().kickoff(inputs=inputs)
+
+        # the crew reports no per-candidate outcome: a stage succeeded if it wrote its output during this run
+        succeeded = manifest.written_since(inputs, plan, started)
+        manifest.record(inputs, plan, succeeded)
+        manifest.save()
+        if match_store and succeeded.match:
+            match_store.import_results_dir(inputs["matches_output_path"], candidate_ids=succeeded.match)
+        cache = get_default_cache()
+        if cache:
+            cache.log_stats()
+        finish_run()
         return results
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
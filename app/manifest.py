@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.knowledge import job_content_hashes, job_set_hash, load_job_descriptions
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MANIFEST_PATH = os.path.join(".cache", "manifest.json")
+MANIFEST_VERSION = 1
+# recorded stage outputs, upstream first
+STAGE_OUTPUTS = ("txt", "json", "match")
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest of data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> Optional[str]:
+    """Return the SHA-256 hex digest of a file, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+class ManifestEntry(BaseModel):
+    """Hashes recorded for one candidate across the pipeline stages"""
+    pdf_hash: Optional[str] = None
+    txt_source: Optional[str] = Field(None, description="PDF hash the txt was extracted from")
+    txt_hash: Optional[str] = None
+    json_source: Optional[str] = Field(None, description="txt hash the CandidateCV was built from")
+    json_hash: Optional[str] = None
+    match_source: Optional[str] = Field(None, description="'<json hash>:<JD set hash>' the matches were built from")
+    match_hash: Optional[str] = None
+
+    def clear(self, stage: str) -> None:
+        """Forget the recorded output of stage ("txt", "json" or "match") and of every stage after it."""
+        for name in STAGE_OUTPUTS[STAGE_OUTPUTS.index(stage):]:
+            setattr(self, f"{name}_source", None)
+            setattr(self, f"{name}_hash", None)
+
+
+class PipelinePlan(BaseModel):
+    """Candidates (file stems) that still need work, per stage"""
+    extract: List[str] = Field(default_factory=list)
+    analyze: List[str] = Field(default_factory=list)
+    match: List[str] = Field(default_factory=list)
+    skipped: List[str] = Field(default_factory=list)
+    jd_set_hash: str = ""
+    job_hashes: Dict[str, str] = Field(default_factory=dict, description="job_id -> content hash of the JD set")
+
+    def is_empty(self) -> bool:
+        return not (self.extract or self.analyze or self.match)
+
+    def as_inputs(self) -> Dict[str, str]:
+        """Render the plan as crew input placeholders (comma-separated file names)."""
+        return {
+            "pending_pdf_files": ", ".join(f"{stem}.pdf" for stem in self.extract),
+            "pending_txt_files": ", ".join(f"{stem}.txt" for stem in self.analyze),
+            "pending_json_files": ", ".join(f"{stem}.json" for stem in self.match),
+        }
+
+
+class PipelineManifest:
+    """
+    Content-hash manifest that lets reruns skip unchanged candidates.
+
+    Each candidate is tracked by the stem of its PDF file. A stage is up to date
+    when its output exists, still has the recorded hash, and was produced from
+    the current hash of its upstream input (PDF -> txt -> CandidateCV JSON ->
+    JobMatchResult, the last one also keyed on the content hash of the JD set,
+    see app.knowledge.job_set_hash). The JD set hash and per-job content hashes of the last recorded run are kept so a
+    later run can tell which job descriptions changed (see app.jd_delta).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_MANIFEST_PATH,
+        entries: Optional[Dict[str, ManifestEntry]] = None,
+        jd_set_hash: Optional[str] = None,
+        job_hashes: Optional[Dict[str, str]] = None,
+    ):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+        self.jd_set_hash = jd_set_hash
+        self.job_hashes: Dict[str, str] = job_hashes or {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MANIFEST_PATH) -> "PipelineManifest":
+        """Load a manifest from disk, starting empty if it is missing or unreadable."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                logger.warning(f"Ignoring manifest {path} with unsupported version {data.get('version')}")
+                return cls(path)
+            entries = {stem: ManifestEntry(**entry) for stem, entry in data.get("entries", {}).items()}
+            return cls(path, entries, data.get("jd_set_hash"), data.get("job_hashes"))
+        except FileNotFoundError:
+            return cls(path)
+        except Exception as e:
+            logger.warning(f"Could not read manifest {path}, starting fresh: {e}")
+            return cls(path)
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "jd_set_hash": self.jd_set_hash,
+                    "job_hashes": dict(sorted(self.job_hashes.items())),
+                    "entries": {stem: entry.model_dump() for stem, entry in sorted(self.entries.items())},
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def stems(pdf_dir: str) -> List[str]:
+        """File stems of the PDFs in pdf_dir, sorted."""
+        if not os.path.isdir(pdf_dir):
+            return []
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(pdf_dir) if name.lower().endswith(".pdf"))
+
+    @staticmethod
+    def _paths(inputs: Dict[str, str], stem: str) -> Dict[str, str]:
+        return {
+            "pdf": os.path.join(inputs["pdf_files_path"], f"{stem}.pdf"),
+            "txt": os.path.join(inputs["txt_files_path"], f"{stem}.txt"),
+            "json": os.path.join(inputs["json_files_path"], f"{stem}.json"),
+            "match": os.path.join(inputs["matches_output_path"], f"{stem}.json"),
+        }
+
+    def plan(self, inputs: Dict[str, str], knowledge_dir: str = "knowledge") -> PipelinePlan:
+        """
+        Work out which candidates need each stage re-run.
+
+        Args:
+            inputs: The crew inputs (pdf_files_path, txt_files_path, json_files_path, matches_output_path)
+            knowledge_dir: Folder holding the job description JSON files
+
+        Returns:
+            PipelinePlan listing pending stems per stage
+        """
+        job_hashes = job_content_hashes(load_job_descriptions(knowledge_dir))
+        plan = PipelinePlan(jd_set_hash=job_set_hash(job_hashes), job_hashes=job_hashes)
+
+        for stem in self.stems(inputs["pdf_files_path"]):
+            paths = self._paths(inputs, stem)
+            entry = self.entries.get(stem, ManifestEntry())
+            pdf_hash = hash_file(paths["pdf"])
+            txt_hash = hash_file(paths["txt"])
+            json_hash = hash_file(paths["json"])
+            match_hash = hash_file(paths["match"])
+
+            needs_extract = txt_hash is None or entry.txt_source != pdf_hash or entry.txt_hash != txt_hash
+            needs_analyze = (
+                needs_extract or json_hash is None or entry.json_source != txt_hash or entry.json_hash != json_hash
+            )
+            needs_match = (
+                needs_analyze
+                or match_hash is None
+                or entry.match_source != f"{json_hash}:{plan.jd_set_hash}"
+                or entry.match_hash != match_hash
+            )
+
+            if needs_extract:
+                plan.extract.append(stem)
+            if needs_analyze:
+                plan.analyze.append(stem)
+            if needs_match:
+                plan.match.append(stem)
+            if not needs_match:
+                plan.skipped.append(stem)
+                logger.info(f"Skipping {stem}: PDF, CV and JD set unchanged since last run")
+            elif not needs_analyze:
+                logger.info(f"Skipping extraction and analysis of {stem}: only matching is stale")
+            elif not needs_extract:
+                logger.info(f"Skipping extraction of {stem}: PDF unchanged")
+
+        logger.info(
+            f"Incremental plan: {len(plan.extract)} to extract, {len(plan.analyze)} to analyze, "
+            f"{len(plan.match)} to match, {len(plan.skipped)} unchanged"
+        )
+        return plan
+
+    def record(
+        self, inputs: Dict[str, str], plan: PipelinePlan, succeeded: PipelinePlan, update_jobs: bool = True
+    ) -> None:
+        """
+        Record the hashes of the outputs produced for the stems in plan.
+
+        Only the stems listed in `succeeded` for a stage get that stage's output
+        recorded. A stem that was attempted but did not succeed has the record
+        of that stage and of every later stage cleared, so an output left on
+        disk by an earlier run is never taken as built from the new input. A
+        recorded output whose hash changed also clears the later stages. Pass
+        update_jobs=False when only extraction / analysis ran, so the recorded
+        JD state (used for delta matching) stays that of the last match.
+
+        Args:
+            inputs: The crew inputs (pdf_files_path, txt_files_path, json_files_path, matches_output_path)
+            plan: Stems each stage was run for
+            succeeded: Stems each stage actually produced output for
+            update_jobs: Also record the JD set of plan as the one matched against
+        """
+        for stem in sorted(set(plan.extract) | set(plan.analyze) | set(plan.match)):
+            paths = self._paths(inputs, stem)
+            entry = self.entries.get(stem, ManifestEntry())
+            pdf_hash = hash_file(paths["pdf"])
+            txt_hash = hash_file(paths["txt"])
+            json_hash = hash_file(paths["json"])
+            match_hash = hash_file(paths["match"])
+
+            entry.pdf_hash = pdf_hash
+            if stem in plan.extract:
+                if stem in succeeded.extract and txt_hash is not None:
+                    if entry.txt_hash != txt_hash:
+                        entry.clear("json")
+                    entry.txt_source, entry.txt_hash = pdf_hash, txt_hash
+                else:
+                    entry.clear("txt")
+            if stem in plan.analyze:
+                if stem in succeeded.analyze and json_hash is not None and txt_hash and entry.txt_hash == txt_hash:
+                    if entry.json_hash != json_hash:
+                        entry.clear("match")
+                    entry.json_source, entry.json_hash = txt_hash, json_hash
+                else:
+                    entry.clear("json")
+            if stem in plan.match:
+                if stem in succeeded.match and match_hash is not None and json_hash and entry.json_hash == json_hash:
+                    entry.match_source, entry.match_hash = f"{json_hash}:{plan.jd_set_hash}", match_hash
+                else:
+                    entry.clear("match")
+            self.entries[stem] = entry
+        if update_jobs:
+            self.jd_set_hash, self.job_hashes = plan.jd_set_hash, dict(plan.job_hashes)
+
+        # forget candidates whose PDF was removed
+        current = set(self.stems(inputs["pdf_files_path"]))
+        for stem in list(self.entries):
+            if stem not in current:
+                del self.entries[stem]
+
+    def written_since(self, inputs: Dict[str, str], plan: PipelinePlan, since: float) -> PipelinePlan:
+        """
+        The stems of plan whose stage output was (re)written at or after `since` (a time.time() value).
+
+        For runs that cannot report per-stem success themselves (the crew
+        writes the files through its tools), an output older than the run
+        is one left over from an earlier run.
+        """
+        def written(path: str) -> bool:
+            try:
+                return os.path.getmtime(path) >= since
+            except OSError:
+                return False
+
+        return PipelinePlan(
+            extract=[s for s in plan.extract if written(self._paths(inputs, s)["txt"])],
+            analyze=[s for s in plan.analyze if written(self._paths(inputs, s)["json"])],
+            match=[s for s in plan.match if written(self._paths(inputs, s)["match"])],
+            jd_set_hash=plan.jd_set_hash,
+            job_hashes=plan.job_hashes,
+        )
+
+    def current_matches(self, inputs: Dict[str, str], jd_set_hash: str) -> Dict[str, str]:
+        """
+        Return stem -> CandidateCV JSON hash for candidates whose recorded matches are
+        up to date with their current CV and were built against jd_set_hash.
+        """
+        current = {}
+        for stem, entry in sorted(self.entries.items()):
+            paths = self._paths(inputs, stem)
+            json_hash = hash_file(paths["json"])
+            if (
+                json_hash is not None
+                and entry.json_hash == json_hash
+                and entry.match_source == f"{json_hash}:{jd_set_hash}"
+                and entry.match_hash == hash_file(paths["match"])
+            ):
+                current[stem] = json_hash
+        return current
+
+    def rebase_matches(self, inputs: Dict[str, str], stems: List[str], jd_set_hash: str) -> None:
+        """Record that the match results of stems were brought up to date with jd_set_hash."""
+        for stem in stems:
+            paths = self._paths(inputs, stem)
+            entry = self.entries[stem]
+            entry.match_source = f"{entry.json_hash}:{jd_set_hash}"
+            entry.match_hash = hash_file(paths["match"])
@@ -0,0 +1,422 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from app.cv_store import new_run_id
+from app.logging_config import get_logger
+from app.model import JobMatchResult
+
+logger = get_logger(__name__)
+
+DEFAULT_MATCH_DB_PATH = "job-matches.sqlite3"
+DEFAULT_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    run_id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    is_current INTEGER NOT NULL DEFAULT 1,
+    candidate_name TEXT,
+    job_title TEXT,
+    overall_score REAL NOT NULL,
+    skills_score REAL,
+    experience_score REAL,
+    education_score REAL,
+    career_level_score REAL,
+    skills_match_percentage REAL,
+    candidate_experience_years REAL,
+    required_experience_years REAL,
+    education_match INTEGER,
+    career_level_match TEXT,
+    match_category TEXT,
+    pre_filtered INTEGER NOT NULL DEFAULT 0,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, candidate_id, job_id)
+);
+CREATE INDEX IF NOT EXISTS idx_matches_job_score ON matches (job_id, is_current, overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_job_category_score
+    ON matches (job_id, is_current, match_category, overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_candidate_score ON matches (candidate_id, is_current, overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_pair ON matches (candidate_id, job_id);
+CREATE INDEX IF NOT EXISTS idx_matches_score ON matches (overall_score);
+CREATE INDEX IF NOT EXISTS idx_matches_category ON matches (match_category);
+"""
+
+# columns returned by the ranking queries (the full result JSON is only read on request)
+SUMMARY_COLUMNS = (
+    "candidate_id", "job_id", "run_id", "candidate_name", "job_title", "overall_score",
+    "skills_match_percentage", "match_category", "pre_filtered",
+)
+
+_INSERT = (
+    "INSERT OR REPLACE INTO matches (run_id, candidate_id, job_id, is_current, candidate_name, job_title, "
+    "overall_score, skills_score, experience_score, education_score, career_level_score, skills_match_percentage, "
+    "candidate_experience_years, required_experience_years, education_match, career_level_match, match_category, "
+    "pre_filtered, result, created_at) VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _row(run_id: str, candidate_id: str, result: JobMatchResult, now: float) -> Tuple[Any, ...]:
+    breakdown = result.breakdown
+    return (
+        run_id, candidate_id, result.job_id or result.job_title, result.candidate_name, result.job_title,
+        result.overall_score, breakdown.skills_score, breakdown.experience_score, breakdown.education_score,
+        breakdown.career_level_score, result.skills_match_percentage, result.candidate_experience_years,
+        result.required_experience_years, int(result.education_match), result.career_level_match,
+        result.match_category, int(result.pre_filtered), result.model_dump_json(), now,
+    )
+
+
+class MatchStore:
+    """
+    Indexed SQLite store of JobMatchResults keyed by run, candidate and job.
+
+    Every (candidate, job) pair keeps its history across runs; the row from the
+    latest run that scored the pair is flagged is_current, and the ranking
+    queries read current rows unless a run_id is given.
+
+    Args:
+        path: SQLite file (created if missing)
+    """
+
+    def __init__(self, path: str = DEFAULT_MATCH_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> Optional["MatchStore"]:
+        """Open the store at MATCH_DB_PATH (default job-matches.sqlite3); None when MATCH_DB=0."""
+        if os.getenv("MATCH_DB", "1").lower() in ("0", "false", "off"):
+            return None
+        return cls(os.getenv("MATCH_DB_PATH", DEFAULT_MATCH_DB_PATH))
+
+    def start_run(self, run_id: Optional[str] = None, source: str = "") -> str:
+        """Register a run and return its id."""
+        run_id = run_id or new_run_id()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, source, started_at) VALUES (?, ?, ?)",
+                (run_id, source, time.time()),
+            )
+        return run_id
+
+    def write(self, run_id: str, items: Iterable[Tuple[str, JobMatchResult]], replace: bool = False) -> int:
+        """
+        Insert (candidate id, JobMatchResult) pairs for a run in one transaction.
+
+        Earlier runs' rows for the same pairs stop being current. With replace,
+        the items are each candidate's complete result list and every earlier
+        current row of those candidates is retired, whatever job key it was
+        stored under (results without a job_id are keyed by job title).
+
+        Returns:
+            Number of results written
+        """
+        now = time.time()
+        rows = [_row(run_id, candidate_id, result, now) for candidate_id, result in items]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            if replace:
+                self._conn.executemany(
+                    "UPDATE matches SET is_current = 0 WHERE candidate_id = ? AND run_id <> ? AND is_current = 1",
+                    [(candidate_id, run_id) for candidate_id in sorted({row[1] for row in rows})],
+                )
+            else:
+                self._conn.executemany(
+                    "UPDATE matches SET is_current = 0 WHERE candidate_id = ? AND job_id = ? AND run_id <> ? "
+                    "AND is_current = 1",
+                    [(row[1], row[2], run_id) for row in rows],
+                )
+            self._conn.executemany(_INSERT, rows)
+        return len(rows)
+
+    def retire_jobs(self, job_ids: Iterable[str], current_titles: Optional[Iterable[str]] = None) -> int:
+        """
+        Stop treating the results of removed job descriptions as current (history is kept).
+
+        Args:
+            job_ids: Removed job ids
+            current_titles: Titles of the remaining jobs; when given, current rows keyed
+                by a job title (results without a job_id) outside these are retired too
+
+        Returns:
+            Number of rows retired
+        """
+        job_ids = list(job_ids)
+        retired = 0
+        with self._lock, self._conn:
+            if job_ids:
+                retired += self._conn.executemany(
+                    "UPDATE matches SET is_current = 0 WHERE job_id = ? AND is_current = 1",
+                    [(job_id,) for job_id in job_ids],
+                ).rowcount
+            if current_titles is not None:
+                titles = sorted({title.lower() for title in current_titles})
+                retired += self._conn.execute(
+                    "UPDATE matches SET is_current = 0 WHERE job_id = job_title AND is_current = 1 "
+                    f"AND lower(job_title) NOT IN ({', '.join('?' * len(titles))})",
+                    titles,
+                ).rowcount
+        return retired
+
+    def writer(
+        self, run_id: Optional[str] = None, source: str = "", batch_size: int = DEFAULT_BATCH_SIZE, replace: bool = False
+    ):
+        """Open a batching MatchStoreWriter for a (new) run; replace as in write()."""
+        return MatchStoreWriter(self, self.start_run(run_id, source), batch_size, replace)
+
+    def _query(
+        self,
+        where: List[str],
+        params: List[Any],
+        run_id: Optional[str],
+        min_score: Optional[float],
+        category: Optional[str],
+        min_skills_pct: Optional[float],
+        limit: Optional[int],
+        full: bool,
+    ) -> List[Dict[str, Any]]:
+        if run_id:
+            where.append("run_id = ?")
+            params.append(run_id)
+        else:
+            where.append("is_current = 1")
+        if category:
+            where.append("match_category = ?")
+            params.append(category)
+        if min_score is not None:
+            where.append("overall_score > ?")
+            params.append(min_score)
+        if min_skills_pct is not None:
+            where.append("skills_match_percentage > ?")
+            params.append(min_skills_pct)
+        columns = ", ".join(SUMMARY_COLUMNS + (("result",) if full else ()))
+        sql = f"SELECT {columns} FROM matches WHERE {' AND '.join(where)} ORDER BY overall_score DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        results = []
+        for row in rows:
+            item = dict(row)
+            if full:
+                item["result"] = json.loads(item["result"])
+            results.append(item)
+        return results
+
+    def top_for_job(
+        self,
+        job_id: str,
+        k: int = 20,
+        category: Optional[str] = None,
+        min_score: Optional[float] = None,
+        min_skills_pct: Optional[float] = None,
+        run_id: Optional[str] = None,
+        full: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Best candidates for a job, highest overall_score first.
+
+        Args:
+            job_id: Job description id (e.g. JD-002)
+            k: Number of candidates returned
+            category: Only this match_category (e.g. strong_match)
+            min_score: Only results with overall_score above this
+            min_skills_pct: Only results with skills_match_percentage above this
+            run_id: Read this run instead of the current results
+            full: Include the full JobMatchResult JSON under "result"
+        """
+        return self._query(["job_id = ?"], [job_id], run_id, min_score, category, min_skills_pct, k, full)
+
+    def for_candidate(
+        self,
+        candidate_id: str,
+        min_score: Optional[float] = None,
+        category: Optional[str] = None,
+        run_id: Optional[str] = None,
+        full: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Every job result of a candidate (file stem), highest overall_score first."""
+        return self._query(["candidate_id = ?"], [candidate_id], run_id, min_score, category, None, None, full)
+
+    def result(self, candidate_id: str, job_id: str, run_id: Optional[str] = None) -> Optional[JobMatchResult]:
+        """The current (or given run's) JobMatchResult of one pair."""
+        rows = self._query(
+            ["candidate_id = ?", "job_id = ?"], [candidate_id, job_id], run_id, None, None, None, 1, True
+        )
+        return JobMatchResult.model_validate(rows[0]["result"]) if rows else None
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """Runs with their result counts, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.run_id, r.source, r.started_at, COUNT(m.run_id) AS results "
+                "FROM runs r LEFT JOIN matches m ON m.run_id = r.run_id "
+                "GROUP BY r.run_id ORDER BY r.started_at DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def import_results_dir(
+        self,
+        results_dir: str,
+        run_id: Optional[str] = None,
+        candidate_ids: Optional[Sequence[str]] = None,
+    ) -> int:
+        """
+        Load <candidate id>.json result files from results_dir into a new run.
+
+        Args:
+            results_dir: Folder with per-candidate JobMatchResult JSON files
+            run_id: Run to write (default: a new one)
+            candidate_ids: Only import these file stems
+
+        Returns:
+            Number of results imported (invalid items are logged and skipped)
+        """
+        if not os.path.isdir(results_dir):
+            return 0
+        wanted = set(candidate_ids) if candidate_ids is not None else None
+        files: Dict[str, List[str]] = {}
+        for name in sorted(os.listdir(results_dir)):
+            stem, ext = os.path.splitext(name)
+            candidate_id = stem[: -len(".prefiltered")] if stem.endswith(".prefiltered") else stem
+            if ext == ".json" and (wanted is None or candidate_id in wanted):
+                files.setdefault(candidate_id, []).append(name)
+
+        # each candidate's files hold its complete result list, so they replace its current rows
+        with self.writer(run_id, source=results_dir, replace=True) as writer:
+            for candidate_id, names in files.items():
+                results: List[JobMatchResult] = []
+                try:
+                    for name in names:
+                        with open(os.path.join(results_dir, name), "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                        items = data if isinstance(data, list) else [data]
+                        results.extend(JobMatchResult.model_validate(item) for item in items)
+                except (ValueError, ValidationError) as e:
+                    logger.warning(f"Skipping invalid match results of {candidate_id}: {e}")
+                    continue
+                writer.add(candidate_id, results)
+        logger.info(f"Imported {writer.count} match results from {results_dir} into {self.path}")
+        return writer.count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class MatchStoreWriter:
+    """
+    Buffers results from the matching stage and writes them in batched transactions.
+
+    Thread-safe; use as a context manager so the last batch is written. With
+    replace, each add() call must hold a candidate's complete result list
+    (see MatchStore.write).
+    """
+
+    def __init__(self, store: MatchStore, run_id: str, batch_size: int = DEFAULT_BATCH_SIZE, replace: bool = False):
+        self.store = store
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.replace = replace
+        self.count = 0
+        self._pending: List[Tuple[str, JobMatchResult]] = []
+        self._lock = threading.Lock()
+
+    def add(self, candidate_id: str, results: Iterable[JobMatchResult]) -> None:
+        """Queue a candidate's results; writes a batch once batch_size results are pending."""
+        with self._lock:
+            self._pending.extend((candidate_id, result) for result in results)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        pending, self._pending = self._pending, []
+        self.count += self.store.write(self.run_id, pending, replace=self.replace)
+
+    def flush(self) -> None:
+        """Write every pending result."""
+        with self._lock:
+            self._flush_locked()
+
+    def __enter__(self) -> "MatchStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+
+def _print_rows(rows: List[Dict[str, Any]]) -> None:
+    for row in rows:
+        print(
+            f"{row['overall_score']:6.2f}  {row['match_category']:<15} {row['skills_match_percentage']:6.1f}%  "
+            f"{row['candidate_id']:<30} {row['job_id']:<10} {row['candidate_name']}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Query the match results database.")
+    parser.add_argument("--db", default=os.getenv("MATCH_DB_PATH", DEFAULT_MATCH_DB_PATH))
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    top = sub.add_parser("top", help="Top-K candidates for a job")
+    top.add_argument("job_id")
+    top.add_argument("-k", type=int, default=20)
+    top.add_argument("--category", choices=["strong_match", "moderate_match", "weak_match"])
+    top.add_argument("--min-score", type=float)
+    top.add_argument("--min-skills", type=float, help="skills_match_percentage greater than")
+    top.add_argument("--run")
+
+    candidate = sub.add_parser("candidate", help="Every job result of a candidate")
+    candidate.add_argument("candidate_id")
+    candidate.add_argument("--min-score", type=float)
+    candidate.add_argument("--run")
+
+    imp = sub.add_parser("import", help="Import per-candidate result JSON files as a new run")
+    imp.add_argument("results_dir", nargs="?", default="job-matches-results")
+
+    sub.add_parser("runs", help="List runs")
+    args = parser.parse_args()
+
+    setup_logging()
+    store = MatchStore(args.db)
+    started = time.perf_counter()
+    if args.command == "top":
+        rows = store.top_for_job(args.job_id, args.k, args.category, args.min_score, args.min_skills, args.run)
+    elif args.command == "candidate":
+        rows = store.for_candidate(args.candidate_id, args.min_score, run_id=args.run)
+    elif args.command == "import":
+        rows = [{"imported": store.import_results_dir(args.results_dir)}]
+    else:
+        rows = store.runs()
+
+    if args.json or args.command in ("import", "runs"):
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_rows(rows)
+        logger.info(f"{len(rows)} row(s) in {(time.perf_counter() - started) * 1000:.1f}ms")
@@ -269,7 +269,7 @@ class CandidateCV(BaseModel):
 # ------------------------------------------------------------
 
 from pydantic import BaseModel, Field
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 
 class ScoreBreakdown(BaseModel):
@@ -286,6 +286,7 @@ class JobMatchResult(BaseModel):
     # Basic Information
     candidate_name: str = Field(..., description="Full name of the candidate")
     job_title: str = Field(..., description="Job title being matched against")
+    job_id: Optional[str] = Field(None, description="ID of the job description (e.g. JD-001)")
 
     # Overall Score
     overall_score: float = Field(..., ge=0, le=100, description="Total match score out of 100")
@@ -320,3 +321,18 @@ class JobMatchResult(BaseModel):
     match_category: Literal["strong_match", "moderate_match", "weak_match"] = Field(
         ..., description="Overall match category: strong (≥80), moderate (60-79), weak (<60)"
     )
+
+    # Provenance
+    pre_filtered: bool = Field(
+        default=False,
+        description="True when the result was generated by the local pre-score filter instead of the job matcher"
+    )
+
+
+class JobMatchBatch(BaseModel):
+    """Results of matching one candidate CV against several job descriptions in a single call"""
+
+    matches: List[JobMatchResult] = Field(
+        ...,
+        description="One match result per job description, each with its job_id, in the order the jobs were given"
+    )
@@ -0,0 +1,318 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Literal, Optional, TextIO
+
+import PyPDF2
+from pydantic import BaseModel, Field
+
+from app.logging_config import get_logger
+from app.telemetry import record_span
+
+logger = get_logger(__name__)
+
+PAGE_BREAK = "\n\n--- PAGE BREAK ---\n\n"
+LINKS_HEADER = "[Links on this page]"
+DEFAULT_MAX_PAGES = 100
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# leading pages without any text after which a PDF is treated as image-only
+DEFAULT_EMPTY_PAGES_ABORT = 3
+
+
+class ExtractionResult(BaseModel):
+    """Outcome of extracting a single PDF to text"""
+    file_path: str = Field(..., description="Source PDF path")
+    output_path: Optional[str] = Field(None, description="Written .txt path, if any")
+    status: Literal["success", "error"] = Field(..., description="Extraction status")
+    error: Optional[str] = Field(None, description="Error message when status is 'error'")
+    pages: int = Field(0, ge=0, description="Number of pages read")
+    skipped_pages: int = Field(0, ge=0, description="Pages not read because of the page limit")
+    bytes: int = Field(0, ge=0, description="Size of the source PDF")
+    seconds: float = Field(0.0, ge=0, description="Wall-clock extraction time")
+
+
+class BatchExtractionSummary(BaseModel):
+    """Per-file results and totals for a batch extraction run"""
+    input_dir: str
+    output_dir: str
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    results: List[ExtractionResult] = Field(default_factory=list)
+
+
+def extract_links_from_page(page: PyPDF2._page.PageObject) -> List[str]:
+    """Extract hyperlinks from a single PDF page, if any."""
+    links = []
+    if "/Annots" in page:
+        for annot in page["/Annots"]:
+            try:
+                annot_obj = annot.get_object()
+                if "/A" in annot_obj and "/URI" in annot_obj["/A"]:
+                    uri = annot_obj["/A"]["/URI"]
+                    links.append(uri)
+            except Exception:
+                continue
+    return links
+
+
+def format_page(page_text: str, page_links: List[str]) -> str:
+    """Render one page's text followed by its links block."""
+    page_output = page_text.rstrip()
+
+    if page_links:
+        # add a small header so we know these links belong to this page
+        links_lines = [f"{i+1}. {link}" for i, link in enumerate(page_links)]
+        page_output += f"\n\n{LINKS_HEADER}\n" + "\n".join(links_lines)
+
+    return page_output
+
+
+def output_path_for(file_path: str, output_dir: str) -> str:
+    """Return the .txt path a PDF is written to inside output_dir."""
+    base_name = os.path.basename(file_path)
+    return os.path.join(output_dir, os.path.splitext(base_name)[0] + ".txt")
+
+
+class ExtractionLimits(BaseModel):
+    """Caps applied while extracting a PDF"""
+    max_pages: Optional[int] = Field(DEFAULT_MAX_PAGES, ge=1, description="Pages read at most (the rest is skipped)")
+    max_bytes: Optional[int] = Field(DEFAULT_MAX_BYTES, ge=1, description="Larger PDFs are rejected unread")
+    empty_pages_abort: Optional[int] = Field(
+        DEFAULT_EMPTY_PAGES_ABORT, ge=1, description="Give up when this many leading pages have no text"
+    )
+
+    @classmethod
+    def from_env(cls) -> "ExtractionLimits":
+        """Limits from PDF_MAX_PAGES, PDF_MAX_MB and PDF_EMPTY_PAGES_ABORT (0 disables a limit)."""
+        def read(name: str, default: Optional[int], scale: int = 1) -> Optional[int]:
+            value = os.getenv(name)
+            if value is None or value == "":
+                return default
+            return int(float(value) * scale) or None
+
+        return cls(
+            max_pages=read("PDF_MAX_PAGES", DEFAULT_MAX_PAGES),
+            max_bytes=read("PDF_MAX_MB", DEFAULT_MAX_BYTES, 1024 * 1024),
+            empty_pages_abort=read("PDF_EMPTY_PAGES_ABORT", DEFAULT_EMPTY_PAGES_ABORT),
+        )
+
+
+class ImageOnlyPDFError(ValueError):
+    """Raised when the first pages of a PDF have no text (it is probably scanned)."""
+
+    def __init__(self, pages: int):
+        super().__init__(f"No text on the first {pages} page(s); the PDF is probably image-based (scanned).")
+        self.pages = pages
+
+
+class _StrippedWriter:
+    """Writes chunks so the file ends up equal to "".join(chunks).strip(), holding back only trailing whitespace."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self.started = False
+        self.pending = ""
+
+    def write(self, chunk: str) -> None:
+        if not self.started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self.started = True
+        body = chunk.rstrip()
+        if body:
+            self.out.write(self.pending + body)
+            self.pending = chunk[len(body):]
+        else:
+            self.pending += chunk
+
+
+def stream_pdf_text(file_path: str, out: TextIO, limits: Optional[ExtractionLimits] = None) -> tuple:
+    """
+    Extract a PDF page by page, writing each page (and its links block) to `out` as soon as it is read.
+
+    The written text is identical to extract_pdf_text()'s and is never held
+    in memory as a whole. PyPDF2's cache of resolved objects is cleared after
+    every page, so the content streams of pages already read can be freed;
+    the reader still keeps every page's dictionary (PdfReader.pages), and
+    resources shared between pages (fonts, images) are parsed again for each
+    page that uses them, trading some CPU for a flatter peak.
+
+    Args:
+        file_path: PDF to read
+        out: Text stream the pages are written to
+        limits: Page / byte caps and the image-only check (default: ExtractionLimits.from_env())
+
+    Returns:
+        (pages read, any page had text, pages skipped because of max_pages)
+
+    Raises:
+        ValueError: The PDF is over max_bytes
+        ImageOnlyPDFError: Its first pages have no text
+    """
+    limits = limits or ExtractionLimits.from_env()
+    size = os.path.getsize(file_path)
+    if limits.max_bytes and size > limits.max_bytes:
+        raise ValueError(f"PDF is {size / 1024 / 1024:.1f} MB, over the {limits.max_bytes / 1024 / 1024:g} MB limit")
+
+    writer = _StrippedWriter(out)
+    pages = text_pages = 0
+    with open(file_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        total = len(pdf_reader.pages)
+        for index in range(total):
+            if limits.max_pages and index >= limits.max_pages:
+                break
+            page = pdf_reader.pages[index]
+            page_text = page.extract_text() or ""
+            page_links = extract_links_from_page(page)
+            writer.write((PAGE_BREAK if index else "") + format_page(page_text, page_links))
+            pages += 1
+            text_pages += bool(page_text.strip())
+            del page
+            pdf_reader.resolved_objects.clear()
+            if limits.empty_pages_abort and not text_pages and limits.empty_pages_abort <= pages < total:
+                raise ImageOnlyPDFError(pages)
+    return pages, text_pages > 0, total - pages
+
+
+def extract_pdf_text(file_path: str, limits: Optional[ExtractionLimits] = None) -> tuple:
+    """
+    Extract the text of a PDF, appending each page's hyperlinks after that page.
+
+    Returns:
+        (full_text, page_count)
+    """
+    buffer = io.StringIO()
+    pages, _, _ = stream_pdf_text(file_path, buffer, limits)
+    return buffer.getvalue(), pages
+
+
+def extract_pdf_to_file(
+    file_path: str, output_dir: str, limits: Optional[ExtractionLimits] = None
+) -> ExtractionResult:
+    """
+    Extract one PDF and write it to output_dir as a .txt file.
+
+    Pages are streamed to a temporary file that replaces the .txt once the
+    whole PDF is read, so memory stays flat whatever the document size.
+    Never raises: failures are reported in the returned ExtractionResult so the
+    function is safe to run inside a worker process.
+    """
+    started = time.perf_counter()
+    pages = 0
+    size = 0
+    tmp_path = None
+    try:
+        size = os.path.getsize(file_path)
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = output_path_for(file_path, output_dir)
+        tmp_path = f"{output_path}.part"
+        with open(tmp_path, "w", encoding="utf-8") as out_file:
+            pages, has_text, skipped = stream_pdf_text(file_path, out_file, limits)
+        if not has_text:
+            raise ValueError("Could not extract text from PDF. The file might be empty or image-based.")
+        os.replace(tmp_path, output_path)
+        tmp_path = None
+        if skipped:
+            logger.warning(f"{os.path.basename(file_path)}: page limit reached, skipped the last {skipped} page(s)")
+
+        return ExtractionResult(
+            file_path=file_path,
+            output_path=output_path,
+            status="success",
+            pages=pages,
+            skipped_pages=skipped,
+            bytes=size,
+            seconds=time.perf_counter() - started,
+        )
+    except Exception as e:
+        return ExtractionResult(
+            file_path=file_path,
+            status="error",
+            error=str(e),
+            pages=e.pages if isinstance(e, ImageOnlyPDFError) else pages,
+            bytes=size,
+            seconds=time.perf_counter() - started,
+        )
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def record_extraction(result: ExtractionResult) -> None:
+    """Record an extraction (possibly done in a worker process) as an "extract" span."""
+    record_span(
+        "extract",
+        result.seconds,
+        status="ok" if result.status == "success" else "error",
+        error=result.error,
+        file=os.path.basename(result.file_path),
+        pages=result.pages,
+        bytes=result.bytes,
+    )
+
+
+def list_pdf_files(input_dir: str) -> List[str]:
+    """Return the sorted paths of all .pdf files directly inside input_dir."""
+    return sorted(
+        os.path.join(input_dir, name)
+        for name in os.listdir(input_dir)
+        if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(input_dir, name))
+    )
+
+
+def batch_extract(
+    input_dir: str,
+    output_dir: str,
+    max_workers: Optional[int] = None,
+    file_paths: Optional[List[str]] = None,
+) -> BatchExtractionSummary:
+    """
+    Extract every PDF in input_dir to output_dir using a process pool.
+
+    Args:
+        input_dir: Folder containing the PDF files
+        output_dir: Folder the .txt files are written to
+        max_workers: Pool size (default: PDF_EXTRACT_WORKERS env var or CPU count).
+            A value of 1 runs in-process without a pool.
+        file_paths: Explicit subset of PDFs to extract instead of the whole folder
+
+    Returns:
+        BatchExtractionSummary with one ExtractionResult per file
+    """
+    started = time.perf_counter()
+    pdf_files = list_pdf_files(input_dir) if file_paths is None else list(file_paths)
+    if max_workers is None:
+        max_workers = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(pdf_files) or 1))
+
+    results: List[ExtractionResult] = []
+    if max_workers == 1:
+        results = [extract_pdf_to_file(path, output_dir) for path in pdf_files]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(extract_pdf_to_file, path, output_dir) for path in pdf_files]
+            for future in as_completed(futures):
+                results.append(future.result())
+        results.sort(key=lambda r: r.file_path)
+    for result in results:
+        record_extraction(result)
+
+    summary = BatchExtractionSummary(
+        input_dir=input_dir,
+        output_dir=output_dir,
+        total=len(results),
+        succeeded=sum(1 for r in results if r.status == "success"),
+        failed=sum(1 for r in results if r.status == "error"),
+        seconds=time.perf_counter() - started,
+        results=results,
+    )
+    logger.info(
+        f"Extracted {summary.succeeded}/{summary.total} PDFs from {input_dir} "
+        f"with {max_workers} worker(s) in {summary.seconds:.2f}s"
+    )
+    return summary
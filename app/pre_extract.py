@@ -0,0 +1,541 @@
+"""
+Rule-based pre-extraction of CandidateCV fields from the extracted CV text.
+
+Compiled regexes and a few layout heuristics pull out what does not need a
+model: contact details (name, email, phone, location, LinkedIn / GitHub /
+other links, including the [Links on this page] blocks written by the PDF
+reader), section boundaries, work experience and education entries with their
+date ranges, and the skills list. Each field gets a confidence; the analyzer
+is then only asked for the top-level fields that could not be filled with
+enough confidence (see analyze_with_pre_extraction). The analyzer always
+provides cv_analysis, but its total years of experience and employment gaps
+are replaced by values computed locally from the dates.
+"""
+
+import os
+import re
+from datetime import date
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field
+
+from app.llm import complete
+from app.logging_config import get_logger
+from app.model import (
+    CandidateCV,
+    ContactInformation,
+    CVAnalysis,
+    Education,
+    EducationLevel,
+    Skill,
+    WorkExperience,
+)
+from app.pdf_extraction import LINKS_HEADER
+from app.prompts import ANALYZER_SYSTEM, partial_analysis_prompt
+from app.scoring import career_level_from_years
+from app.validation import field_subset_model, validate_reply
+
+logger = get_logger(__name__)
+
+# fields with at least this confidence are not requested from the analyzer
+DEFAULT_CONFIDENCE_THRESHOLD = 0.7
+# gaps between jobs longer than this are reported (12 when a boundary is only known to the year)
+GAP_MONTHS = 6
+# top-level CandidateCV fields the pre-extractor can fill (the rest always come from the analyzer)
+PRE_EXTRACTED_FIELDS = ("contact_information", "summary", "work_experience", "education", "skills")
+# cv_analysis fields computed from the dates; the others are the analyzer's judgement
+LOCAL_ANALYSIS_FIELDS = ("total_years_experience", "has_gaps", "gap_details")
+
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE = re.compile(r"(?<![\w/])(\+?\d[\d\s().-]{6,}\d)(?![\w/])")
+_URL = re.compile(r"(?:https?://|www\.)[^\s|,<>\"')]+|(?:linkedin\.com|github\.com)/[^\s|,<>\"')]+", re.I)
+_LINK_LINE = re.compile(r"^\s*\d+\.\s+(\S+)\s*$")
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+          r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?")
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}}-\d{{2}}|(?:19|20)\d{{2}})"
+_DATE_RANGE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|present|current|now|today)", re.I
+)
+_MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "professional summary", "objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"),
+    "education": ("education", "academic background", "qualifications", "education and training"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "competencies", "core competencies"),
+    "certifications": ("certifications", "certificates", "licenses", "certifications and licenses"),
+    "projects": ("projects", "personal projects", "key projects"),
+    "publications": ("publications", "selected publications", "papers", "presentations",
+                     "conference presentations", "talks"),
+    "awards": ("awards", "honors", "honours", "awards and honors", "grants", "grants and awards"),
+    "languages": ("languages",),
+    "interests": ("interests", "hobbies"),
+    "references": ("references",),
+    "volunteer": ("volunteer", "volunteering", "volunteer experience"),
+}
+_HEADING_OF = {alias: name for name, aliases in _SECTION_HEADINGS.items() for alias in aliases}
+_BULLET = re.compile(r"^\s*(?:[-•*▪◦·]|\d+[.)])\s+")
+_TECH_LINE = re.compile(r"^\s*(?:technologies|tech stack|tools|stack)\s*:\s*(.+)$", re.I)
+_AT = re.compile(r"\s+(?:at|@)\s+", re.I)
+_SPLIT = re.compile(r"\s+[-–—|]\s+|,\s+")
+_COMPANY_HINT = re.compile(
+    r"\b(inc|llc|ltd|limited|corp|corporation|company|co\.|group|bank|plc|gmbh|university|ministry|"
+    r"authority|holding|technologies|solutions|systems|analytics|telecom)\b", re.I
+)
+_EDUCATION_LEVELS = [
+    (EducationLevel.DOCTORATE, re.compile(r"\b(ph\.?d|doctor(ate)?)\b", re.I)),
+    (EducationLevel.MASTER, re.compile(r"\b(master|m\.?sc|mba|m\.?a\.|m\.?eng)\b", re.I)),
+    (EducationLevel.BACHELOR, re.compile(r"\b(bachelor|b\.?sc|b\.?a\.|b\.?eng|undergraduate)\b", re.I)),
+    (EducationLevel.ASSOCIATE, re.compile(r"\bassociate\b", re.I)),
+    (EducationLevel.DIPLOMA, re.compile(r"\bdiploma\b", re.I)),
+    (EducationLevel.CERTIFICATE, re.compile(r"\bcertificate\b", re.I)),
+    (EducationLevel.HIGH_SCHOOL, re.compile(r"\b(high school|secondary)\b", re.I)),
+]
+
+
+class PreExtraction(BaseModel):
+    """Partial CandidateCV found by the rule-based pre-extractor"""
+    cv: CandidateCV = Field(..., description="CV with the pre-extracted fields filled")
+    confidence: Dict[str, float] = Field(default_factory=dict, description="Field path -> confidence (0-1)")
+    sections: Dict[str, str] = Field(default_factory=dict, description="Section name -> text")
+
+    def filled(self, threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> List[str]:
+        """Top-level CandidateCV fields filled with at least `threshold` confidence."""
+        return [name for name in PRE_EXTRACTED_FIELDS if self.confidence.get(name, 0.0) >= threshold]
+
+    def missing(self, threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> List[str]:
+        """Top-level CandidateCV fields the analyzer still has to provide (always including cv_analysis)."""
+        filled = set(self.filled(threshold))
+        return [name for name in CandidateCV.model_fields if name not in filled and name != "source_file"]
+
+
+def _heading(line: str) -> Optional[str]:
+    text = line.strip().strip(":").strip()
+    if not text or len(text) > 40:
+        return None
+    return _HEADING_OF.get(text.lower())
+
+
+def strip_links(text: str) -> str:
+    """Drop the PDF reader's [Links on this page] blocks from CV text."""
+    kept, in_links = [], False
+    for line in text.splitlines():
+        if line.strip() == LINKS_HEADER:
+            in_links = True
+            continue
+        if in_links and _LINK_LINE.match(line):
+            continue
+        in_links = False
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def segment_sections(text: str) -> Dict[str, str]:
+    """
+    Split CV text into sections by their headings.
+
+    Lines before the first heading go to "header"; the PDF reader's links
+    blocks and page breaks are dropped.
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in strip_links(text).splitlines():
+        stripped = line.strip()
+        if stripped.startswith("--- PAGE BREAK"):
+            continue
+        name = _heading(stripped)
+        if name:
+            current = name
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+def _parse_date(text: str) -> Tuple[Optional[date], bool]:
+    """Parse one date of a range; returns (date, known to the month)."""
+    token = text.strip().lower().rstrip(".")
+    if token in ("present", "current", "now", "today"):
+        return None, True
+    month_match = re.match(rf"({_MONTH})\s+(\d{{4}})", token)
+    if month_match:
+        return date(int(month_match.group(2)), _MONTH_NAMES.index(month_match.group(1)[:3]) + 1, 1), True
+    numeric = re.match(r"(\d{1,2})/(\d{4})$", token) or re.match(r"(\d{4})-(\d{2})$", token)
+    if numeric:
+        a, b = int(numeric.group(1)), int(numeric.group(2))
+        year, month = (b, a) if a <= 12 and b > 12 else (a, b)
+        if 1 <= month <= 12:
+            return date(year, month, 1), True
+    if re.match(r"\d{4}$", token):
+        return date(int(token), 1, 1), False
+    return None, False
+
+
+def _months_between(start: date, end: date) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def _split_title_company(header: str) -> Tuple[Optional[str], Optional[str]]:
+    """Split an entry header into (position or degree, company or institution)."""
+    header = header.strip(" \t|,;:-–—()")
+    if not header:
+        return None, None
+    parts = _AT.split(header, maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    parts = [p.strip() for p in _SPLIT.split(header, maxsplit=1) if p.strip()]
+    if len(parts) != 2:
+        return header, None
+    first, second = parts
+    if _COMPANY_HINT.search(first) and not _COMPANY_HINT.search(second):
+        return second, first
+    return first, second
+
+
+def _entries(section: str) -> List[Dict[str, Any]]:
+    """Find dated entries in a section: header, dates and the lines that follow until the next entry."""
+    lines = section.splitlines()
+    entries: List[Dict[str, Any]] = []
+    header_lines = set()
+    for i, line in enumerate(lines):
+        match = _DATE_RANGE.search(line)
+        if not match:
+            continue
+        header = (line[:match.start()] + " " + line[match.end():]).strip()
+        header = re.sub(r"\(\s*\)|\[\s*\]", "", header).strip(" \t|,;:-–—()")
+        if not header:
+            # dates on their own line: the entry header is on the (up to two) lines above
+            above = [j for j in range(max(0, i - 2), i) if lines[j].strip() and j not in header_lines]
+            above = [j for j in above if not _BULLET.match(lines[j]) and not _TECH_LINE.match(lines[j])]
+            header = " - ".join(lines[j].strip() for j in above)
+            header_lines.update(above)
+        start, start_month = _parse_date(match.group("start"))
+        end, end_month = _parse_date(match.group("end"))
+        entries.append({
+            "line": i, "header": header, "start": start, "end": end,
+            "current": match.group("end").lower() in ("present", "current", "now", "today"),
+            "body": [],
+        })
+    for index, entry in enumerate(entries):
+        stop = entries[index + 1]["line"] if index + 1 < len(entries) else len(lines)
+        entry["body"] = [
+            lines[j].strip() for j in range(entry["line"] + 1, stop) if lines[j].strip() and j not in header_lines
+        ]
+    return entries
+
+
+def _work_experience(section: str) -> Tuple[List[WorkExperience], float]:
+    experience, scores = [], []
+    for entry in _entries(section):
+        position, company = _split_title_company(entry["header"])
+        if not position or entry["start"] is None:
+            continue
+        technologies: List[str] = []
+        responsibilities: List[str] = []
+        description: List[str] = []
+        for line in entry["body"]:
+            tech = _TECH_LINE.match(line)
+            if tech:
+                technologies += [t.strip() for t in re.split(r"[,;]", tech.group(1)) if t.strip()]
+            elif _BULLET.match(line):
+                responsibilities.append(_BULLET.sub("", line).strip())
+            else:
+                description.append(line)
+        end = None if entry["current"] else entry["end"]
+        duration = _months_between(entry["start"], end or date.today()) / 12.0
+        experience.append(WorkExperience(
+            company=company or "",
+            position=position,
+            start_date=entry["start"],
+            end_date=end,
+            is_current=entry["current"],
+            description=" ".join(description) or None,
+            responsibilities=responsibilities,
+            technologies=technologies,
+            duration_years=round(max(0.0, duration), 2),
+        ))
+        scores.append(0.85 if company else 0.5)
+    return experience, min(scores) if scores else 0.0
+
+
+def _education(section: str) -> Tuple[List[Education], float]:
+    education, scores = [], []
+    entries = _entries(section)
+    for entry in entries:
+        degree, institution = _split_title_company(entry["header"])
+        if not degree:
+            continue
+        if institution and not any(p.search(degree) for _, p in _EDUCATION_LEVELS) and any(
+            p.search(institution) for _, p in _EDUCATION_LEVELS
+        ):
+            degree, institution = institution, degree
+        level = next((lvl for lvl, pattern in _EDUCATION_LEVELS if pattern.search(degree)), None)
+        education.append(Education(
+            institution=institution or "",
+            degree=degree,
+            level=level,
+            start_date=entry["start"],
+            end_date=None if entry["current"] else entry["end"],
+        ))
+        scores.append(0.85 if institution and level else 0.5)
+    return education, min(scores) if scores else 0.0
+
+
+def _skills(section: str) -> List[Skill]:
+    names: List[str] = []
+    for line in section.splitlines():
+        line = _BULLET.sub("", line).strip()
+        if ":" in line and len(line.split(":", 1)[0]) < 30:
+            line = line.split(":", 1)[1]  # "Languages: Python, Go"
+        items = [item.strip(" .") for item in re.split(r"[,;•|]", line) if item.strip(" .")]
+        # prose lines (wrapped sentences, project blurbs) are not skill lists
+        if not items or any(len(item) > 30 or len(item.split()) > 4 for item in items):
+            if names:
+                break
+            continue
+        for item in items:
+            if item.lower() not in (n.lower() for n in names):
+                names.append(item)
+    return [Skill(name=name) for name in names]
+
+
+def _links(text: str) -> List[str]:
+    links = []
+    for raw in _URL.findall(text):
+        link = raw.rstrip(".;")
+        if not link.lower().startswith("http"):
+            link = "https://" + link
+        if link not in links:
+            links.append(link)
+    return links
+
+
+def _contact(header: str, text: str, source_file: str) -> Tuple[ContactInformation, Dict[str, float]]:
+    confidence: Dict[str, float] = {}
+    email_match = _EMAIL.search(text)
+    email = email_match.group(0) if email_match else None
+    phone = None
+    for line in header.splitlines() or text.splitlines()[:10]:
+        match = _PHONE.search(line)
+        if match and len(re.sub(r"\D", "", match.group(1))) >= 8 and not _DATE_RANGE.search(line):
+            phone = match.group(1).strip()
+            break
+
+    # name: first short line of capitalized words, without digits or @
+    name, name_confidence = None, 0.0
+    for line in header.splitlines()[:5]:
+        candidate = line.strip()
+        words = candidate.split()
+        if 2 <= len(words) <= 5 and not re.search(r"[\d@|/:]", candidate) and all(w[:1].isupper() for w in words):
+            name, name_confidence = candidate, 0.75
+            break
+    if name and email:
+        local = re.sub(r"[^a-z]", " ", email.split("@")[0].lower()).split()
+        if any(part in local or any(part.startswith(l) for l in local) for part in name.lower().split()):
+            name_confidence = 0.95
+    if not name:
+        name = os.path.splitext(source_file)[0].replace("_", " ").replace("-", " ").title() or "Unknown"
+        name_confidence = 0.2
+
+    location = None
+    for line in header.splitlines()[:6]:
+        if "|" in line or (email and email in line):
+            parts = [p.strip() for p in re.split(r"\s*[|•·]\s*", line) if p.strip()]
+            rest = [p for p in parts if not _EMAIL.search(p) and not _PHONE.search(p) and not _URL.search(p)]
+            if rest and len(rest[-1]) <= 60:
+                location = rest[-1]
+                break
+
+    links = _links(text)
+    linkedin = next((l for l in links if "linkedin.com" in l.lower()), None)
+    github = next((l for l in links if "github.com" in l.lower()), None)
+    others = [l for l in links if l not in (linkedin, github)]
+    try:
+        contact = ContactInformation(
+            full_name=name, email=email, phone=phone, location=location,
+            linkedin=linkedin, github=github, other_links=others[:10],
+        )
+    except ValueError:
+        contact = ContactInformation(full_name=name, email=None, phone=phone, location=location)
+        email = None
+    confidence.update({
+        "contact_information.full_name": name_confidence,
+        "contact_information.email": 0.95 if email else 0.0,
+        "contact_information.phone": 0.8 if phone else 0.0,
+        "contact_information.location": 0.5 if location else 0.0,
+        "contact_information.links": 0.95 if links else 0.0,
+    })
+    # the block is filled when the name is reliable and there is a way to reach the candidate
+    confidence["contact_information"] = min(name_confidence, 0.9 if (email or phone) else 0.4)
+    return contact, confidence
+
+
+def merge_intervals(spans: List[Tuple[date, date, bool]]) -> List[Tuple[date, date, bool]]:
+    """Merge overlapping (start, end, known to the month) intervals."""
+    merged: List[Tuple[date, date, bool]] = []
+    for start, end, precise in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            last_start, last_end, last_precise = merged[-1]
+            merged[-1] = (last_start, max(last_end, end), last_precise and precise)
+        else:
+            merged.append((start, end, precise))
+    return merged
+
+
+def local_analysis(cv: CandidateCV, text: str = "", today: Optional[date] = None) -> CVAnalysis:
+    """
+    Compute cv_analysis from the CV's dates instead of asking the analyzer.
+
+    Total years of experience count overlapping jobs once; a gap is reported
+    when more than GAP_MONTHS (12 for dates known only to the year) pass
+    between two jobs.
+    """
+    today = today or date.today()
+    spans = []
+    for job in cv.work_experience:
+        if job.start_date is None:
+            continue
+        end = job.end_date or today
+        # CandidateCV dates keep no precision: January-only boundaries are treated as year-only
+        precise = job.start_date.month != 1 or (job.end_date is not None and job.end_date.month != 1)
+        spans.append((job.start_date, max(end, job.start_date), precise))
+    merged = merge_intervals(spans)
+    months = sum(_months_between(start, end) for start, end, _ in merged)
+    total_years = round(months / 12.0, 2) if merged else None
+
+    gaps = []
+    for (_, previous_end, previous_precise), (start, _, precise) in zip(merged, merged[1:]):
+        gap = _months_between(previous_end, start)
+        limit = GAP_MONTHS if (previous_precise and precise) else 12
+        if gap > limit:
+            gaps.append(f"{gap} months between {previous_end:%Y-%m} and {start:%Y-%m}")
+
+    tenures = [job.duration_years for job in cv.work_experience if job.duration_years]
+    hopping = None
+    if len(tenures) >= 2:
+        average = sum(tenures) / len(tenures)
+        hopping = round(max(0.0, min(10.0, 10.0 - 3.0 * average)), 1)
+
+    levels = [edu.level for edu in cv.education if edu.level]
+    order = [level for level, _ in _EDUCATION_LEVELS]
+    highest = min(levels, key=order.index).value if levels else None
+    lowered = text.lower()
+    density = {skill.name: lowered.count(skill.name.lower()) for skill in cv.skills if skill.name} if text else {}
+
+    return CVAnalysis(
+        total_years_experience=total_years,
+        career_level=career_level_from_years(total_years) if total_years is not None else None,
+        job_titles=list(dict.fromkeys(job.position for job in cv.work_experience if job.position)),
+        companies_worked_at=list(dict.fromkeys(job.company for job in cv.work_experience if job.company)),
+        education_summary=highest,
+        has_gaps=bool(gaps),
+        gap_details=gaps,
+        job_hopping_score=hopping,
+        keyword_density={k: v for k, v in density.items() if v},
+    )
+
+
+def pre_extract(cv_text: str, source_file: str = "") -> PreExtraction:
+    """
+    Fill what the rules can find in a CV's text.
+
+    Args:
+        cv_text: Text written by the PDF reader
+        source_file: Original file name (used as a name fallback)
+
+    Returns:
+        PreExtraction with the partial CandidateCV and a confidence per field
+    """
+    sections = segment_sections(cv_text)
+    contact, confidence = _contact(sections.get("header", ""), cv_text, source_file)
+
+    experience, experience_confidence = _work_experience(sections.get("experience", ""))
+    education, education_confidence = _education(sections.get("education", ""))
+    skills = _skills(sections.get("skills", ""))
+
+    summary = " ".join(line.strip() for line in sections.get("summary", "").splitlines() if line.strip())
+    cv = CandidateCV(
+        contact_information=contact,
+        summary=summary or None,
+        work_experience=experience,
+        education=education,
+        skills=skills,
+        source_file=source_file or None,
+    )
+    cv.cv_analysis = local_analysis(cv, cv_text)
+    confidence.update({
+        "work_experience": experience_confidence,
+        "education": education_confidence,
+        "summary": 0.8 if summary else 0.0,
+        "skills": 0.85 if skills else 0.0,
+        "cv_analysis.total_years_experience": experience_confidence,
+        "cv_analysis.has_gaps": experience_confidence,
+    })
+    return PreExtraction(cv=cv, confidence=confidence, sections=sections)
+
+
+def remainder_model(fields: FrozenSet[str]) -> Type[BaseModel]:
+    """Response model holding only the given top-level CandidateCV fields."""
+    return field_subset_model(CandidateCV, fields)
+
+
+def pre_extract_enabled() -> bool:
+    """Pre-extraction runs unless PRE_EXTRACT=0."""
+    return os.getenv("PRE_EXTRACT", "1").lower() not in ("0", "false", "off")
+
+
+def analyze_with_pre_extraction(
+    cv_text: str,
+    source_file: str,
+    complete_fn: Callable[..., Any] = complete,
+    threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+) -> CandidateCV:
+    """
+    Pre-extract what the rules can, ask the analyzer only for the rest, and merge.
+
+    The total years of experience and the employment gaps of the analyzer's
+    cv_analysis are recomputed locally from the final work history, whichever
+    source its dates came from; the rest of cv_analysis is kept.
+
+    Args:
+        cv_text: Text written by the PDF reader
+        source_file: Original file name
+        complete_fn: Function performing the model call (see app.llm.complete)
+        threshold: Minimum confidence for a pre-extracted field to be kept
+
+    Returns:
+        The merged CandidateCV
+    """
+    pre = pre_extract(cv_text, source_file)
+    missing = pre.missing(threshold)
+    model = remainder_model(frozenset(missing))
+    # the links blocks only feed contact_information; leave them out once that is filled
+    prompt_text = strip_links(cv_text) if "contact_information" not in missing else cv_text
+    raw = complete_fn(partial_analysis_prompt(prompt_text, source_file, missing), model, system=ANALYZER_SYSTEM)
+    remainder, _ = validate_reply(raw, model, complete_fn=complete_fn, system=ANALYZER_SYSTEM)
+    cv = pre.cv.model_copy(update={name: getattr(remainder, name) for name in missing})
+    cv.source_file = source_file
+    local = local_analysis(cv, cv_text)
+    if local.total_years_experience is not None:
+        cv.cv_analysis = (cv.cv_analysis or CVAnalysis()).model_copy(
+            update={name: getattr(local, name) for name in LOCAL_ANALYSIS_FIELDS}
+        )
+    logger.debug(f"{source_file}: pre-extracted {', '.join(pre.filled(threshold)) or 'nothing'}")
+    return cv
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Show what the rule-based pre-extractor finds in a CV text file.")
+    parser.add_argument("txt_file")
+    args = parser.parse_args()
+
+    with open(args.txt_file, "r", encoding="utf-8") as f:
+        result = pre_extract(f.read(), os.path.basename(args.txt_file).replace(".txt", ".pdf"))
+    print(json.dumps({
+        "confidence": result.confidence,
+        "ask_analyzer_for": result.missing(),
+        "cv": result.cv.model_dump(mode="json", exclude_none=True),
+    }, indent=2, ensure_ascii=False))
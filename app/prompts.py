@@ -0,0 +1,85 @@
+import json
+from typing import Any, Dict, List
+
+from app.model import CandidateCV, JobMatchResult
+
+ANALYZER_SYSTEM = (
+    "You are an expert HR CV analyst. You turn raw CV text into structured candidate data. "
+    "Only use facts stated in the CV; leave unknown fields empty. Dates use YYYY-MM-DD "
+    "(use the first day of the month or year when only those are known)."
+)
+
+MATCHER_SYSTEM = (
+    "You are an expert technical recruiter. You score how well a candidate fits a job using fixed rules: "
+    "skills out of 40, experience out of 30, education out of 20 and career level out of 10; "
+    "overall_score is their sum. match_category is strong_match (>= 80), moderate_match (60-79) "
+    "or weak_match (< 60)."
+)
+
+
+def analysis_prompt(cv_text: str, source_file: str = "") -> str:
+    """Prompt asking the analyzer for a CandidateCV from extracted CV text."""
+    return (
+        f"Analyze the CV below (source file: {source_file or 'unknown'}) and return it as structured "
+        f"candidate data, including cv_analysis and agent_assessment.\n\n"
+        f"--- CV TEXT ---\n{cv_text}\n--- END CV TEXT ---"
+    )
+
+
+def partial_analysis_prompt(cv_text: str, source_file: str, fields: List[str]) -> str:
+    """Prompt asking the analyzer for only the CandidateCV fields the pre-extractor could not fill."""
+    return (
+        f"Analyze the CV below (source file: {source_file or 'unknown'}). The other fields were already "
+        f"extracted; return only: {', '.join(fields)}.\n\n"
+        f"--- CV TEXT ---\n{cv_text}\n--- END CV TEXT ---"
+    )
+
+
+def repair_prompt(invalid: Dict[str, Any], errors: List[str]) -> str:
+    """Prompt asking the model to fix only the fields of its reply that failed validation."""
+    return (
+        f"These fields of your previous reply failed validation: {', '.join(invalid)}. Return corrected "
+        f"values for only these fields, keeping every fact and fixing the structure and formats.\n\n"
+        f"--- ERRORS ---\n" + "\n".join(errors) + "\n\n"
+        f"--- INVALID FIELDS ---\n{json.dumps(invalid, ensure_ascii=False, default=str)}"
+    )
+
+
+def job_context(job: Dict[str, Any]) -> str:
+    """Compact JSON rendering of a job description for prompts."""
+    return json.dumps({k: v for k, v in job.items() if not k.startswith("_")}, ensure_ascii=False)
+
+
+def candidate_context(cv: CandidateCV) -> str:
+    """Compact JSON rendering of a candidate for matching prompts (assessment prose omitted)."""
+    return cv.model_dump_json(exclude_none=True, exclude={"agent_assessment"})
+
+
+def match_prompt(cv: CandidateCV, job: Dict[str, Any]) -> str:
+    """Prompt asking the matcher for one JobMatchResult."""
+    return (
+        f"Match this candidate against the job description.\n\n"
+        f"--- CANDIDATE ---\n{candidate_context(cv)}\n\n"
+        f"--- JOB DESCRIPTION ---\n{job_context(job)}"
+    )
+
+
+def recommendation_prompt(result: JobMatchResult) -> str:
+    """Prompt asking the matcher for only the recommendation text of a locally scored match."""
+    return (
+        f"The candidate below was scored against the job by fixed rules. Write the recommendation only: "
+        f"2-3 plain sentences on fit, main strengths and gaps, based on these scores. Do not change "
+        f"or restate the scores.\n\n"
+        f"--- SCORED MATCH ---\n{result.model_dump_json(exclude={'recommendation', 'pre_filtered'})}"
+    )
+
+
+def batch_match_prompt(cv: CandidateCV, jobs: List[Dict[str, Any]]) -> str:
+    """Prompt asking the matcher for one JobMatchResult per job, all in a single reply."""
+    job_blocks = "\n".join(f"[{job.get('job_id')}] {job_context(job)}" for job in jobs)
+    return (
+        f"Match this candidate against each of the {len(jobs)} job descriptions below. Return exactly one "
+        f"match result per job, in the same order, and set job_id on each result.\n\n"
+        f"--- CANDIDATE ---\n{candidate_context(cv)}\n\n"
+        f"--- JOB DESCRIPTIONS ---\n{job_blocks}"
+    )
@@ -0,0 +1,480 @@
+import json
+import os
+import re
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.knowledge import (
+    job_must_have_skills,
+    job_required_years,
+    job_title,
+    load_job_descriptions,
+)
+from app.logging_config import get_logger
+from app.model import CandidateCV, JobMatchResult, ScoreBreakdown
+from app.skill_index import normalize_skill
+
+logger = get_logger(__name__)
+
+# Maximum points per category (see ScoreBreakdown)
+SKILLS_POINTS = 40.0
+EXPERIENCE_POINTS = 30.0
+EDUCATION_POINTS = 20.0
+CAREER_LEVEL_POINTS = 10.0
+
+# Share of the skills points that comes from must-have skills (rest: nice-to-have)
+MUST_HAVE_WEIGHT = 0.8
+
+# match_category thresholds on overall_score (see JobMatchResult)
+STRONG_MATCH_THRESHOLD = 80.0
+MODERATE_MATCH_THRESHOLD = 60.0
+
+CAREER_LEVELS = ["entry", "junior", "mid", "senior", "lead", "executive"]
+
+EDUCATION_RANKS = {
+    "high_school": 1,
+    "certificate": 1,
+    "diploma": 2,
+    "associate": 2,
+    "bachelor": 3,
+    "master": 4,
+    "doctorate": 5,
+}
+
+# Keyword patterns used to read an education level out of free text, lowest first: a job's
+# "Bachelor's or Master's" resolves to bachelor, a candidate's "BSc, MSc" to master.
+_EDUCATION_PATTERNS = [
+    ("high_school", re.compile(r"high school|secondary", re.I)),
+    ("diploma", re.compile(r"diploma", re.I)),
+    ("associate", re.compile(r"associate", re.I)),
+    ("bachelor", re.compile(r"bachelor|b\.?sc|undergraduate", re.I)),
+    ("master", re.compile(r"master|m\.?sc|mba", re.I)),
+    ("doctorate", re.compile(r"doctor|ph\.?d", re.I)),
+]
+
+_TITLE_LEVELS = [
+    ("executive", re.compile(r"\b(chief|director|vp|head of)\b", re.I)),
+    ("lead", re.compile(r"\b(lead|principal|staff)\b", re.I)),
+    ("senior", re.compile(r"\b(senior|sr\.?)\b", re.I)),
+    ("mid", re.compile(r"\bmid(-level)?\b", re.I)),
+    ("junior", re.compile(r"\b(junior|jr\.?)\b", re.I)),
+    ("entry", re.compile(r"\b(entry|intern|graduate|trainee)\b", re.I)),
+]
+
+# Writes the recommendation text of a locally scored JobMatchResult
+RecommendFn = Callable[[JobMatchResult], str]
+
+
+def candidate_skills(cv: CandidateCV) -> List[str]:
+    """Return the normalized skills of a candidate, including technologies used in jobs and projects."""
+    names = [skill.name for skill in cv.skills]
+    for experience in cv.work_experience:
+        names.extend(experience.technologies)
+    for project in cv.projects:
+        names.extend(project.technologies)
+    return sorted({normalize_skill(name) for name in names if name and name.strip()})
+
+
+def candidate_years(cv: CandidateCV, today: Optional[date] = None) -> float:
+    """Return the candidate's total years of experience, computing it from work history if needed."""
+    if cv.cv_analysis and cv.cv_analysis.total_years_experience is not None:
+        return max(0.0, cv.cv_analysis.total_years_experience)
+
+    today = today or date.today()
+    total = 0.0
+    for experience in cv.work_experience:
+        if experience.duration_years is not None:
+            total += max(0.0, experience.duration_years)
+        elif experience.start_date:
+            end = experience.end_date or today
+            total += max(0.0, (end - experience.start_date).days / 365.25)
+    return round(total, 2)
+
+
+def candidate_education_rank(cv: CandidateCV) -> int:
+    """Return the rank of the candidate's highest education level (0 if unknown)."""
+    ranks = [EDUCATION_RANKS.get(edu.level.value, 0) for edu in cv.education if edu.level]
+    if not ranks:
+        for edu in cv.education:
+            ranks.append(_education_rank_from_text(edu.degree, highest=True))
+    return max(ranks, default=0)
+
+
+def career_level_from_years(years: float) -> str:
+    """Map years of experience to a career level."""
+    if years < 1:
+        return "entry"
+    if years < 3:
+        return "junior"
+    if years < 6:
+        return "mid"
+    if years < 10:
+        return "senior"
+    return "lead"
+
+
+def candidate_career_level(cv: CandidateCV) -> int:
+    """Return the candidate's career level as an index into CAREER_LEVELS."""
+    if cv.cv_analysis and cv.cv_analysis.career_level:
+        return CAREER_LEVELS.index(cv.cv_analysis.career_level)
+    return CAREER_LEVELS.index(career_level_from_years(candidate_years(cv)))
+
+
+def _education_rank_from_text(text: str, highest: bool = False) -> int:
+    """Rank of the lowest level named in text (a requirement), or of the highest one (a degree)."""
+    for level, pattern in reversed(_EDUCATION_PATTERNS) if highest else _EDUCATION_PATTERNS:
+        if pattern.search(text or ""):
+            return EDUCATION_RANKS[level]
+    return 0
+
+
+def job_education_rank(job: Dict[str, Any]) -> int:
+    """Return the minimum education rank a job requires (0 if none)."""
+    if job.get("education_level") in EDUCATION_RANKS:
+        return EDUCATION_RANKS[job["education_level"]]
+    ranks = [_education_rank_from_text(text) for text in job.get("education_required") or []]
+    ranks = [rank for rank in ranks if rank]
+    return min(ranks, default=0)
+
+
+def job_career_level(job: Dict[str, Any]) -> int:
+    """Return the career level a job targets, from its explicit level, title or required years."""
+    if job.get("career_level") in CAREER_LEVELS:
+        return CAREER_LEVELS.index(job["career_level"])
+    title = job_title(job)
+    for level, pattern in _TITLE_LEVELS:
+        if pattern.search(title):
+            return CAREER_LEVELS.index(level)
+    return CAREER_LEVELS.index(career_level_from_years(job_required_years(job)))
+
+
+def template_recommendation(overall: float, category: str, matched: int, required: int) -> str:
+    """Fixed recommendation sentence, used when no RecommendFn writes one."""
+    return (
+        f"Rule-based score of {overall:g}/100 ({category.replace('_', ' ')}) with "
+        f"{matched}/{required} required skills matched."
+    )
+
+
+def llm_recommendation(result: JobMatchResult) -> str:
+    """RecommendFn asking the model for the recommendation text only (one call, fed the computed scores)."""
+    from app.llm import complete
+    from app.prompts import MATCHER_SYSTEM, recommendation_prompt
+
+    return str(complete(recommendation_prompt(result), system=MATCHER_SYSTEM)).strip()
+
+
+def match_category(score: float) -> str:
+    """Classify an overall score into a JobMatchResult match_category."""
+    if score >= STRONG_MATCH_THRESHOLD:
+        return "strong_match"
+    if score >= MODERATE_MATCH_THRESHOLD:
+        return "moderate_match"
+    return "weak_match"
+
+
+class ScoreMatrix:
+    """
+    Candidates x jobs score arrays produced by ScoringEngine.score().
+
+    All arrays have shape (n_candidates, n_jobs) unless noted otherwise.
+    """
+
+    def __init__(self, engine: "ScoringEngine", **arrays: np.ndarray):
+        self.engine = engine
+        # scores are reported with two decimals
+        self.skills_score = np.round(arrays["skills_score"], 2)
+        self.experience_score = np.round(arrays["experience_score"], 2)
+        self.education_score = np.round(arrays["education_score"], 2)
+        self.career_level_score = np.round(arrays["career_level_score"], 2)
+        self.overall_score = np.round(arrays["overall_score"], 2)
+        self.skills_match_percentage = np.round(arrays["skills_match_percentage"], 2)
+        self.education_match = arrays["education_match"]
+        self.career_level_diff = arrays["career_level_diff"]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.overall_score.shape
+
+    def result(self, i: int, j: int, recommend_fn: Optional[RecommendFn] = None) -> JobMatchResult:
+        """
+        Build the JobMatchResult for candidate i and job j.
+
+        Args:
+            i: Candidate index
+            j: Job index
+            recommend_fn: Writes the recommendation from the scored result (e.g. llm_recommendation);
+                the template sentence is kept when it is None, fails or returns too little
+        """
+        engine = self.engine
+        cand_skills = engine.candidate_skill_sets[i]
+        must_have = engine.job_must_have[j]
+        skills_matched = [name for name, key in must_have if key in cand_skills]
+        skills_missing = [name for name, key in must_have if key not in cand_skills]
+
+        years = float(engine.years[i])
+        required = float(engine.required_years[j])
+        if years >= required:
+            experience_gap = f"Meets requirement: {years:g} years vs {required:g} required"
+        else:
+            experience_gap = f"Short by {required - years:g} years ({years:g} vs {required:g} required)"
+
+        diff = int(self.career_level_diff[i, j])
+        career_level_match = "exact_match" if diff == 0 else "one_level_off" if diff == 1 else "two_plus_levels_off"
+        overall = float(self.overall_score[i, j])
+        category = match_category(overall)
+
+        result = JobMatchResult(
+            candidate_name=engine.candidate_names[i],
+            job_title=engine.job_titles[j],
+            job_id=engine.job_ids[j],
+            overall_score=overall,
+            breakdown=ScoreBreakdown(
+                skills_score=float(self.skills_score[i, j]),
+                experience_score=float(self.experience_score[i, j]),
+                education_score=float(self.education_score[i, j]),
+                career_level_score=float(self.career_level_score[i, j]),
+            ),
+            skills_matched=skills_matched,
+            skills_missing=skills_missing,
+            skills_match_percentage=float(self.skills_match_percentage[i, j]),
+            candidate_experience_years=years,
+            required_experience_years=required,
+            experience_gap=experience_gap,
+            education_match=bool(self.education_match[i, j]),
+            career_level_match=career_level_match,
+            recommendation=template_recommendation(overall, category, len(skills_matched), len(must_have)),
+            match_category=category,
+        )
+        if recommend_fn is not None:
+            try:
+                text = recommend_fn(result).strip()
+            except Exception as e:
+                logger.warning(f"Recommendation for {engine.candidate_ids[i]} x {engine.job_ids[j]} failed: {e}")
+                text = ""
+            if len(text) >= 10:
+                result.recommendation = text
+        return result
+
+    def iter_results(self) -> Iterator[Tuple[int, int, JobMatchResult]]:
+        """Yield (candidate index, job index, JobMatchResult) for every pair."""
+        n_candidates, n_jobs = self.shape
+        for i in range(n_candidates):
+            for j in range(n_jobs):
+                yield i, j, self.result(i, j)
+
+    def ranked(self, j: int, top_k: Optional[int] = None) -> List[int]:
+        """Return candidate indices for job j ordered by descending overall score."""
+        order = np.argsort(-self.overall_score[:, j], kind="stable")
+        return order[:top_k].tolist() if top_k else order.tolist()
+
+
+class ScoringEngine:
+    """
+    Deterministic, vectorized ScoreBreakdown computation for every candidate x job pair.
+
+    Skills, years of experience, education level and career level are turned into
+    NumPy arrays once, and the whole score matrix is computed with broadcasting:
+        - skills (40): share of must-have (80%) and nice-to-have (20%) skills present
+        - experience (30): candidate years / required years, capped at 1
+        - education (20): full points if the required level is met, half if one level below
+        - career level (10): 10 / 5 / 0 for exact, one-off, two-plus levels apart
+    """
+
+    def __init__(self, candidates: Sequence[CandidateCV], jobs: Sequence[Dict[str, Any]],
+                 candidate_ids: Optional[Sequence[str]] = None):
+        self.candidates = list(candidates)
+        self.candidate_ids = list(candidate_ids) if candidate_ids is not None else [
+            cv.source_file or cv.contact_information.full_name for cv in self.candidates
+        ]
+        self.candidate_names = [cv.contact_information.full_name for cv in self.candidates]
+        self.candidate_skill_sets = [set(candidate_skills(cv)) for cv in self.candidates]
+        self.years = np.array([round(candidate_years(cv), 2) for cv in self.candidates], dtype=np.float64)
+        self.education = np.array([candidate_education_rank(cv) for cv in self.candidates], dtype=np.int8)
+        self.career = np.array([candidate_career_level(cv) for cv in self.candidates], dtype=np.int8)
+        self._set_jobs(jobs)
+
+    @classmethod
+    def from_table(cls, table: Any, jobs: Sequence[Dict[str, Any]]) -> "ScoringEngine":
+        """
+        Build an engine from a CandidateTable (see app.cv_store) without CandidateCV objects.
+
+        `candidates` is left empty; use table.cv(i) when a full CV is needed.
+        """
+        engine = cls.__new__(cls)
+        engine.candidates = []
+        engine.candidate_ids = list(table.ids)
+        engine.candidate_names = list(table.names)
+        engine.candidate_skill_sets = [set(skills) for skills in table.skills]
+        engine.years = np.asarray(table.years, dtype=np.float64)
+        engine.education = np.asarray(table.education, dtype=np.int8)
+        engine.career = np.asarray(table.career, dtype=np.int8)
+        engine._set_jobs(jobs)
+        return engine
+
+    def _set_jobs(self, jobs: Sequence[Dict[str, Any]]) -> None:
+        self.jobs = list(jobs)
+        self.job_ids = [job.get("job_id", job_title(job)) for job in self.jobs]
+        self.job_titles = [job_title(job) for job in self.jobs]
+        self.job_must_have = [
+            [(name, normalize_skill(name)) for name in job_must_have_skills(job)] for job in self.jobs
+        ]
+        self._vectorize()
+
+    def _vectorize(self) -> None:
+        must = [{key for _, key in pairs} for pairs in self.job_must_have]
+        nice = [{normalize_skill(s) for s in job.get("nice_to_have_skills") or []} for job in self.jobs]
+        vocabulary = sorted(set().union(*must, *nice)) if self.jobs else []
+        index = {skill: k for k, skill in enumerate(vocabulary)}
+
+        self.candidate_matrix = np.zeros((len(self.candidate_ids), len(vocabulary)), dtype=np.float32)
+        for i, skills in enumerate(self.candidate_skill_sets):
+            cols = [index[s] for s in skills if s in index]
+            self.candidate_matrix[i, cols] = 1.0
+
+        self.must_matrix = np.zeros((len(self.jobs), len(vocabulary)), dtype=np.float32)
+        self.nice_matrix = np.zeros((len(self.jobs), len(vocabulary)), dtype=np.float32)
+        for j in range(len(self.jobs)):
+            self.must_matrix[j, [index[s] for s in must[j]]] = 1.0
+            self.nice_matrix[j, [index[s] for s in nice[j]]] = 1.0
+
+        self.required_years = np.array([job_required_years(job) for job in self.jobs], dtype=np.float64)
+        self.required_education = np.array([job_education_rank(job) for job in self.jobs], dtype=np.int8)
+        self.target_career = np.array([job_career_level(job) for job in self.jobs], dtype=np.int8)
+
+    def score(self) -> ScoreMatrix:
+        """Compute the full candidates x jobs score matrix in one vectorized pass."""
+        must_total = self.must_matrix.sum(axis=1)
+        nice_total = self.nice_matrix.sum(axis=1)
+        must_hits = self.candidate_matrix @ self.must_matrix.T
+        nice_hits = self.candidate_matrix @ self.nice_matrix.T
+
+        must_frac = np.divide(must_hits, must_total, out=np.ones_like(must_hits), where=must_total > 0)
+        nice_frac = np.divide(nice_hits, nice_total, out=np.zeros_like(nice_hits), where=nice_total > 0)
+        must_weight = np.where(nice_total > 0, MUST_HAVE_WEIGHT, 1.0)
+        skills_score = SKILLS_POINTS * (must_weight * must_frac + (1.0 - must_weight) * nice_frac)
+
+        years = self.years[:, None]
+        required = self.required_years[None, :]
+        experience_ratio = np.divide(
+            np.broadcast_to(years, must_hits.shape), required,
+            out=np.ones_like(must_hits), where=required > 0,
+        )
+        experience_score = EXPERIENCE_POINTS * np.minimum(experience_ratio, 1.0)
+
+        education_gap = self.required_education[None, :].astype(np.int16) - self.education[:, None]
+        education_match = education_gap <= 0
+        education_score = np.where(education_match, EDUCATION_POINTS,
+                                   np.where(education_gap == 1, EDUCATION_POINTS / 2, 0.0))
+
+        career_level_diff = np.abs(self.career[:, None].astype(np.int16) - self.target_career[None, :])
+        career_level_score = np.select(
+            [career_level_diff == 0, career_level_diff == 1], [CAREER_LEVEL_POINTS, CAREER_LEVEL_POINTS / 2], 0.0
+        )
+
+        overall_score = skills_score + experience_score + education_score + career_level_score
+        return ScoreMatrix(
+            self,
+            skills_score=skills_score,
+            experience_score=experience_score,
+            education_score=education_score,
+            career_level_score=career_level_score,
+            overall_score=np.clip(overall_score, 0.0, 100.0),
+            skills_match_percentage=100.0 * must_frac,
+            education_match=education_match,
+            career_level_diff=career_level_diff,
+        )
+
+
+def load_candidates(json_dir: str) -> Tuple[List[str], List[CandidateCV]]:
+    """
+    Load every CandidateCV JSON file in json_dir.
+
+    Returns:
+        (candidate ids (file stems), CandidateCV objects); invalid files are logged and skipped
+    """
+    ids, candidates = [], []
+    if not os.path.isdir(json_dir):
+        return ids, candidates
+    for name in sorted(os.listdir(json_dir)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(json_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                candidates.append(CandidateCV.model_validate_json(f.read()))
+            ids.append(os.path.splitext(name)[0])
+        except Exception as e:
+            logger.warning(f"Skipping invalid candidate file {path}: {e}")
+    return ids, candidates
+
+
+def write_match_results(
+    engine: ScoringEngine, matrix: ScoreMatrix, output_dir: str, recommend_fn: Optional[RecommendFn] = None
+) -> List[str]:
+    """
+    Write one JSON file per candidate to output_dir holding its JobMatchResults, best first.
+
+    Args:
+        engine: Engine the matrix was computed by
+        matrix: Scores to write
+        output_dir: Output folder
+        recommend_fn: Writes each recommendation (see ScoreMatrix.result); None keeps the template
+
+    Returns:
+        The written file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for i, candidate_id in enumerate(engine.candidate_ids):
+        order = np.argsort(-matrix.overall_score[i], kind="stable")
+        results = [matrix.result(i, int(j), recommend_fn).model_dump(mode="json") for j in order]
+        path = os.path.join(output_dir, f"{candidate_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        written.append(path)
+    return written
+
+
+def score_all(
+    json_dir: str = "processed-CVs",
+    knowledge_dir: str = "knowledge",
+    store_dir: Optional[str] = None,
+) -> Tuple[ScoringEngine, ScoreMatrix]:
+    """
+    Load all processed CVs and job descriptions and score every pair.
+
+    Args:
+        json_dir: Folder with per-candidate CandidateCV JSON files
+        knowledge_dir: Folder with job description JSON files
+        store_dir: Read candidates from this consolidated CV store (see app.cv_store)
+            instead of json_dir, when it is up to date with json_dir
+    """
+    started = time.perf_counter()
+    jobs = load_job_descriptions(knowledge_dir)
+    from app.cv_store import CVStore
+
+    store = CVStore(store_dir) if store_dir else None
+    table = store.load() if store is not None and store.exists() else None
+    if table is not None and not store.is_current(json_dir, table):
+        logger.warning(f"CV store {store_dir} is out of date with {json_dir}; reading {json_dir} instead")
+        table = None
+    if table is not None:
+        engine = ScoringEngine.from_table(table, jobs)
+    else:
+        candidate_ids, candidates = load_candidates(json_dir)
+        engine = ScoringEngine(candidates, jobs, candidate_ids=candidate_ids)
+    matrix = engine.score()
+    logger.info(
+        f"Scored {len(engine.candidate_ids)} candidates x {len(jobs)} jobs "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return engine, matrix
+
+
+if __name__ == "__main__":
+    engine, matrix = score_all()
+    write_match_results(engine, matrix, "job-matches-results")
@@ -0,0 +1,334 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.knowledge import job_must_have_skills
+from app.logging_config import get_logger
+from app.model import JobMatchResult
+from app.scoring import (
+    CAREER_LEVEL_POINTS,
+    EXPERIENCE_POINTS,
+    SKILLS_POINTS,
+    ScoreMatrix,
+    ScoringEngine,
+    score_all,
+)
+from app.skill_index import DEFAULT_INDEX_PATH, SkillIndex, load_skill_index
+
+logger = get_logger(__name__)
+
+PRESCORE_POINTS = SKILLS_POINTS + EXPERIENCE_POINTS + CAREER_LEVEL_POINTS
+PREFILTERED_SUFFIX = ".prefiltered.json"
+
+
+class ShortlistConfig(BaseModel):
+    """How many candidates per job are sent on to the job matcher agent"""
+    top_k: Optional[int] = Field(10, ge=1, description="Keep the best K candidates per job")
+    threshold: Optional[float] = Field(
+        None, ge=0, le=100, description="Also keep every candidate whose pre-score reaches this value"
+    )
+    must_haves: bool = Field(
+        True, description="Also keep every candidate who has all of a job's must-have skills (see app.skill_index)"
+    )
+    reference_dir: Optional[str] = Field(
+        None, description="Results of a full (unfiltered) matcher pass to measure the shortlist's recall against"
+    )
+
+    @classmethod
+    def from_env(cls) -> "ShortlistConfig":
+        """
+        Build the config from SHORTLIST_TOP_K / SHORTLIST_THRESHOLD / SHORTLIST_REFERENCE_DIR
+        (empty disables) and SHORTLIST_MUST_HAVES (0 disables).
+        """
+        top_k = os.getenv("SHORTLIST_TOP_K", "10")
+        threshold = os.getenv("SHORTLIST_THRESHOLD", "")
+        return cls(
+            top_k=int(top_k) if top_k else None,
+            threshold=float(threshold) if threshold else None,
+            must_haves=os.getenv("SHORTLIST_MUST_HAVES", "1") != "0",
+            reference_dir=os.getenv("SHORTLIST_REFERENCE_DIR") or None,
+        )
+
+
+class Shortlist(BaseModel):
+    """Outcome of the stage-one pre-score"""
+    selected: Dict[str, List[str]] = Field(
+        default_factory=dict, description="job_id -> candidate ids to send to the job matcher, best first"
+    )
+    total_pairs: int = 0
+    shortlisted_pairs: int = 0
+    recall: Optional[Dict[str, float]] = Field(
+        None, description="shortlist_recall() against the reference_dir full pass, when one is configured"
+    )
+
+    @property
+    def prefiltered_pairs(self) -> int:
+        return self.total_pairs - self.shortlisted_pairs
+
+    def pairs(self) -> Set[Tuple[str, str]]:
+        """Return the shortlisted (candidate id, job id) pairs."""
+        return {(candidate_id, job_id) for job_id, ids in self.selected.items() for candidate_id in ids}
+
+
+def prescore(matrix: ScoreMatrix) -> np.ndarray:
+    """
+    Cheap 0-100 pre-score for every candidate x job pair.
+
+    Built from skill overlap, years of experience against experience_required_years
+    and career level fit, rescaled to 100.
+    """
+    return 100.0 * (matrix.skills_score + matrix.experience_score + matrix.career_level_score) / PRESCORE_POINTS
+
+
+def build_shortlist(
+    engine: ScoringEngine, matrix: ScoreMatrix, config: ShortlistConfig, skill_index: Optional[SkillIndex] = None
+) -> Shortlist:
+    """
+    Select, per job, the top-K candidates and/or those above the threshold.
+
+    With config.must_haves and a skill_index, every candidate the index finds
+    with all of a job's must-have skills is kept as well.
+    """
+    scores = prescore(matrix)
+    n_candidates, n_jobs = scores.shape
+    keep = np.zeros(scores.shape, dtype=bool)
+
+    if config.top_k:
+        k = min(config.top_k, n_candidates)
+        if k:
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            keep[top, np.arange(n_jobs)[None, :]] = True
+    if config.threshold is not None:
+        keep |= scores >= config.threshold
+    by_skills = config.must_haves and skill_index is not None
+    if by_skills:
+        rows_of = {candidate_id: i for i, candidate_id in enumerate(engine.candidate_ids)}
+        for j, job in enumerate(engine.jobs):
+            if not job_must_have_skills(job):
+                continue
+            rows = [rows_of[c] for c in skill_index.candidates_for_job(job) if c in rows_of]
+            keep[rows, j] = True
+
+    shortlist = Shortlist(total_pairs=int(scores.size), shortlisted_pairs=int(keep.sum()))
+    for j, job_id in enumerate(engine.job_ids):
+        rows = np.flatnonzero(keep[:, j])
+        rows = rows[np.argsort(-scores[rows, j], kind="stable")]
+        shortlist.selected[job_id] = [engine.candidate_ids[i] for i in rows]
+
+    logger.info(
+        f"Shortlisted {shortlist.shortlisted_pairs}/{shortlist.total_pairs} candidate-job pairs "
+        f"(top_k={config.top_k}, threshold={config.threshold}, must_haves={by_skills})"
+    )
+    return shortlist
+
+
+def full_result_pairs(engine: ScoringEngine, results_dir: str) -> Set[Tuple[str, str]]:
+    """(candidate id, job id) pairs that already have a full matcher result in results_dir (by job_id or title)."""
+    by_title = {title.lower(): job_id for job_id, title in zip(engine.job_ids, engine.job_titles)}
+    known = set(engine.job_ids)
+    pairs = set()
+    for candidate_id in engine.candidate_ids:
+        try:
+            with open(os.path.join(results_dir, f"{candidate_id}.json"), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                continue
+            job_id = item.get("job_id")
+            if job_id not in known:
+                job_id = by_title.get(str(item.get("job_title", "")).lower())
+            if job_id is not None:
+                pairs.add((candidate_id, job_id))
+    return pairs
+
+
+def prefiltered_results(
+    engine: ScoringEngine, matrix: ScoreMatrix, shortlist: Shortlist, skip: Iterable[Tuple[str, str]] = ()
+) -> Dict[str, List[JobMatchResult]]:
+    """
+    Build local results, marked as pre-filtered, for every pair not on the shortlist.
+
+    The match category follows the local score (a good pair outside top_k is
+    not reported as weak); pre_filtered=True says the job matcher never saw it.
+
+    Args:
+        engine: Engine the matrix was computed by
+        matrix: Local scores
+        shortlist: Pairs sent on to the job matcher
+        skip: Pairs to leave out, e.g. those with a full result already (see full_result_pairs)
+    """
+    kept = shortlist.pairs() | set(skip)
+    results: Dict[str, List[JobMatchResult]] = {}
+    for i, candidate_id in enumerate(engine.candidate_ids):
+        for j, job_id in enumerate(engine.job_ids):
+            if (candidate_id, job_id) in kept:
+                continue
+            result = matrix.result(i, j)
+            result.pre_filtered = True
+            result.recommendation = (
+                f"Not shortlisted by the local pre-filter ({len(result.skills_matched)}/"
+                f"{len(result.skills_matched) + len(result.skills_missing)} required skills matched); "
+                f"not reviewed by the job matcher."
+            )
+            results.setdefault(candidate_id, []).append(result)
+    return results
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_prefiltered_results(
+    results: Dict[str, List[JobMatchResult]], output_dir: str, candidate_ids: Iterable[str] = ()
+) -> List[str]:
+    """
+    Write pre-filtered results as `<candidate id>.prefiltered.json` files in output_dir.
+
+    The file of each of candidate_ids that has no pre-filtered result left is removed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for candidate_id, matches in results.items():
+        path = os.path.join(output_dir, f"{candidate_id}{PREFILTERED_SUFFIX}")
+        _write_json(path, [m.model_dump(mode="json") for m in matches])
+        written.append(path)
+    for candidate_id in set(candidate_ids) - set(results):
+        try:
+            os.remove(os.path.join(output_dir, f"{candidate_id}{PREFILTERED_SUFFIX}"))
+        except FileNotFoundError:
+            pass
+    return written
+
+
+def prune_prefiltered(output_dir: str, job_ids: Iterable[str], candidate_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Drop the pre-filtered results of job_ids (matched in full since, or removed) from output_dir.
+
+    Args:
+        output_dir: Folder holding the `<candidate id>.prefiltered.json` files
+        job_ids: Jobs whose pre-filtered results are stale
+        candidate_ids: Only prune these candidates' files (default: all)
+
+    Returns:
+        Number of results dropped; a file left empty is removed
+    """
+    job_ids = set(job_ids)
+    if not job_ids or not os.path.isdir(output_dir):
+        return 0
+    if candidate_ids is None:
+        names = [name for name in os.listdir(output_dir) if name.endswith(PREFILTERED_SUFFIX)]
+    else:
+        names = [f"{candidate_id}{PREFILTERED_SUFFIX}" for candidate_id in candidate_ids]
+    dropped = 0
+    for name in names:
+        path = os.path.join(output_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        kept = [item for item in items if item.get("job_id") not in job_ids]
+        if len(kept) == len(items):
+            continue
+        dropped += len(items) - len(kept)
+        if kept:
+            _write_json(path, kept)
+        else:
+            os.remove(path)
+    return dropped
+
+
+def load_reference_results(results_dir: str) -> List[JobMatchResult]:
+    """Load full-pass JobMatchResults (one JSON object or list per file), ignoring pre-filtered files."""
+    results = []
+    for name in sorted(os.listdir(results_dir)):
+        if not name.endswith(".json") or name.endswith(PREFILTERED_SUFFIX):
+            continue
+        with open(os.path.join(results_dir, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for item in data if isinstance(data, list) else [data]:
+            results.append(JobMatchResult.model_validate(item))
+    return results
+
+
+def shortlist_recall(
+    engine: ScoringEngine,
+    shortlist: Shortlist,
+    reference: Iterable[JobMatchResult],
+    categories: Tuple[str, ...] = ("strong_match", "moderate_match"),
+) -> Dict[str, float]:
+    """
+    Measure how many of a full LLM pass's good matches survived the pre-filter.
+
+    Pairs are joined on (candidate_name, job_title).
+
+    Returns:
+        Dict with relevant, recalled and recall (1.0 when there is nothing relevant)
+    """
+    names = dict(zip(engine.candidate_ids, engine.candidate_names))
+    titles = dict(zip(engine.job_ids, engine.job_titles))
+    kept = {(names[c], titles[j]) for c, j in shortlist.pairs()}
+
+    relevant = {(r.candidate_name, r.job_title) for r in reference if r.match_category in categories}
+    recalled = len(relevant & kept)
+    recall = recalled / len(relevant) if relevant else 1.0
+    logger.info(f"Shortlist recall against full pass: {recalled}/{len(relevant)} = {recall:.1%}")
+    return {"relevant": len(relevant), "recalled": recalled, "recall": recall}
+
+
+def run_shortlist(
+    json_dir: str = "processed-CVs",
+    knowledge_dir: str = "knowledge",
+    output_dir: Optional[str] = "job-matches-results",
+    config: Optional[ShortlistConfig] = None,
+    store_dir: Optional[str] = None,
+    skill_index_path: str = DEFAULT_INDEX_PATH,
+) -> Shortlist:
+    """
+    Stage one of two-stage matching: pre-score all pairs, write pre-filtered results.
+
+    Pairs that already have a full matcher result in output_dir get no
+    pre-filtered result, and stale pre-filtered files are replaced or removed.
+    With config.reference_dir set, the shortlist's recall against that full
+    pass is logged and returned on the Shortlist.
+
+    Args:
+        json_dir: Folder with CandidateCV JSON files
+        knowledge_dir: Folder with job description JSON files
+        output_dir: Where pre-filtered results are written (None to skip writing)
+        config: Shortlist rules (default: from environment)
+        store_dir: Consolidated CV store to read candidates from instead of json_dir (when up to date)
+        skill_index_path: Skill index of json_dir used by config.must_haves (refreshed first)
+
+    Returns:
+        The Shortlist to hand to the job matcher agent
+    """
+    config = config or ShortlistConfig.from_env()
+    engine, matrix = score_all(json_dir, knowledge_dir, store_dir=store_dir)
+    skill_index = load_skill_index(json_dir, skill_index_path) if config.must_haves else None
+    shortlist = build_shortlist(engine, matrix, config, skill_index)
+    if config.reference_dir and os.path.isdir(config.reference_dir):
+        shortlist.recall = shortlist_recall(engine, shortlist, load_reference_results(config.reference_dir))
+    if output_dir:
+        results = prefiltered_results(engine, matrix, shortlist, skip=full_result_pairs(engine, output_dir))
+        write_prefiltered_results(results, output_dir, engine.candidate_ids)
+    return shortlist
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m app.shortlist [full-pass results dir]: report recall of the cascade against a full LLM pass
+    engine, matrix = score_all()
+    config = ShortlistConfig.from_env()
+    shortlist = build_shortlist(engine, matrix, config, load_skill_index() if config.must_haves else None)
+    if len(sys.argv) > 1:
+        print(json.dumps(shortlist_recall(engine, shortlist, load_reference_results(sys.argv[1]))))
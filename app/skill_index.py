@@ -0,0 +1,317 @@
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.knowledge import job_must_have_skills
+from app.logging_config import get_logger
+from app.manifest import hash_file
+
+logger = get_logger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(".cache", "skill_index.json")
+INDEX_VERSION = 1
+
+# canonical skill -> spellings that mean the same thing (all lower-case)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "postgresql": ["postgres", "postgre sql", "psql", "postgresql database"],
+    "rest apis": ["rest", "rest api", "restful", "restful api", "restful apis", "restful services", "rest services"],
+    "graphql": ["graph ql"],
+    "javascript": ["js", "java script", "ecmascript"],
+    "typescript": ["ts"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["react.js", "reactjs", "react js"],
+    "kubernetes": ["k8s", "kube"],
+    "ci/cd": ["cicd", "ci cd", "ci / cd", "continuous integration", "continuous delivery"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "natural language processing": ["nlp"],
+    "large language models": ["llm", "llms"],
+    "python": ["python3", "python 3"],
+    "django": ["django framework"],
+    "sql": ["structured query language"],
+    "power bi": ["powerbi", "microsoft power bi"],
+    "excel": ["microsoft excel", "ms excel"],
+    "git": ["git scm"],
+    "github actions": ["gh actions"],
+    "pytorch": ["torch"],
+    "tensorflow": ["tensor flow"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "project management": ["project mgmt"],
+    "pmp": ["project management professional"],
+}
+
+_ALIAS_LOOKUP: Dict[str, str] = {
+    alias: canonical for canonical, aliases in SKILL_ALIASES.items() for alias in aliases
+}
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t.,;:()[]"
+
+
+def normalize_skill(name: str) -> str:
+    """Normalize a free-text skill name and resolve known aliases to their canonical spelling."""
+    key = _WHITESPACE.sub(" ", name.strip(_EDGE_PUNCTUATION).lower())
+    return _ALIAS_LOOKUP.get(key, key)
+
+
+def raw_candidate_skills(data: Dict[str, Any]) -> Set[str]:
+    """Return the normalized skills of a CandidateCV given as a plain dict (no model validation)."""
+    names = [skill.get("name") for skill in data.get("skills") or []]
+    for experience in data.get("work_experience") or []:
+        names.extend(experience.get("technologies") or [])
+    for project in data.get("projects") or []:
+        names.extend(project.get("technologies") or [])
+    return {normalize_skill(name) for name in names if isinstance(name, str) and name.strip()}
+
+
+class SkillVocabulary:
+    """Interns normalized skill names as dense integer IDs."""
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.names: List[str] = list(names or [])
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, name: str) -> int:
+        """Return the ID of a skill, adding it to the vocabulary if new."""
+        key = normalize_skill(name)
+        skill_id = self.ids.get(key)
+        if skill_id is None:
+            skill_id = self.ids[key] = len(self.names)
+            self.names.append(key)
+        return skill_id
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Return the ID of a skill, or None if no candidate has it."""
+        return self.ids.get(normalize_skill(name))
+
+
+class SkillIndex:
+    """
+    Persistent inverted index from skills to candidates.
+
+    Every candidate (a CandidateCV JSON file in processed-CVs/, identified by its
+    file stem) gets a slot number and a skill bitset (bit i set = has skill ID i).
+    Each skill ID maps to a candidate bitset (bit n set = slot n has the skill), so
+    "candidates with all of these skills" is an AND over a handful of Python ints.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self.vocabulary = SkillVocabulary()
+        self.slots: List[Optional[str]] = []            # slot -> candidate id (None = free)
+        self.slot_of: Dict[str, int] = {}               # candidate id -> slot
+        self.skill_bits: Dict[str, int] = {}            # candidate id -> skill bitset
+        self.fingerprints: Dict[str, Dict[str, Any]] = {}  # candidate id -> {mtime_ns, size, sha256}
+        self.postings: Dict[int, int] = {}              # skill id -> candidate bitset
+        self._free: List[int] = []                      # free slots, reused before growing
+        self._all = 0
+
+    # ----- persistence -----
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "SkillIndex":
+        """Load the index from disk, starting empty if it is missing or unreadable."""
+        index = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return index
+        except Exception as e:
+            logger.warning(f"Could not read skill index {path}, rebuilding: {e}")
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+
+        index.vocabulary = SkillVocabulary(data["vocabulary"])
+        index.slots = data["slots"]
+        index.fingerprints = data["fingerprints"]
+        for slot, candidate_id in enumerate(index.slots):
+            if candidate_id is None:
+                index._free.append(slot)
+            else:
+                index._set(candidate_id, slot, int(data["skill_bits"][candidate_id], 16))
+        return index
+
+    def save(self) -> None:
+        """Write the index atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "vocabulary": self.vocabulary.names,
+                    "slots": self.slots,
+                    "fingerprints": self.fingerprints,
+                    "skill_bits": {cid: format(bits, "x") for cid, bits in self.skill_bits.items()},
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+    # ----- updates -----
+
+    def _set(self, candidate_id: str, slot: int, bits: int) -> None:
+        self.slot_of[candidate_id] = slot
+        self.skill_bits[candidate_id] = bits
+        candidate_bit = 1 << slot
+        self._all |= candidate_bit
+        skill_id = 0
+        while bits:
+            if bits & 1:
+                self.postings[skill_id] = self.postings.get(skill_id, 0) | candidate_bit
+            bits >>= 1
+            skill_id += 1
+
+    def remove(self, candidate_id: str) -> None:
+        """Drop a candidate from the index."""
+        slot = self.slot_of.pop(candidate_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        bits = self.skill_bits.pop(candidate_id)
+        skill_id = 0
+        while bits:
+            if bits & 1:
+                self.postings[skill_id] &= mask
+            bits >>= 1
+            skill_id += 1
+        self._all &= mask
+        self.slots[slot] = None
+        self._free.append(slot)
+        self.fingerprints.pop(candidate_id, None)
+
+    def add(self, candidate_id: str, skills: Iterable[str]) -> None:
+        """Add or replace a candidate with the given skill names."""
+        self.remove(candidate_id)
+        bits = 0
+        for name in skills:
+            bits |= 1 << self.vocabulary.intern(name)
+        if self._free:
+            slot = self._free.pop()
+            self.slots[slot] = candidate_id
+        else:
+            slot = len(self.slots)
+            self.slots.append(candidate_id)
+        self._set(candidate_id, slot, bits)
+
+    def refresh(self, json_dir: str = "processed-CVs") -> Dict[str, int]:
+        """
+        Bring the index in line with the CandidateCV JSON files in json_dir.
+
+        Only new or modified files are re-read (mtime/size first, then content
+        hash); candidates whose file disappeared are removed.
+
+        Returns:
+            Counts of added, updated, removed and unchanged candidates
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen = set()
+        names = sorted(os.listdir(json_dir)) if os.path.isdir(json_dir) else []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            candidate_id = os.path.splitext(name)[0]
+            path = os.path.join(json_dir, name)
+            seen.add(candidate_id)
+            stat = os.stat(path)
+            known = self.fingerprints.get(candidate_id)
+            if known and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                counts["unchanged"] += 1
+                continue
+            sha256 = hash_file(path)
+            if known and known["sha256"] == sha256 and candidate_id in self.slot_of:
+                known.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                counts["unchanged"] += 1
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    skills = raw_candidate_skills(json.load(f))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable candidate file {path}: {e}")
+                continue
+            counts["updated" if candidate_id in self.slot_of else "added"] += 1
+            self.add(candidate_id, skills)
+            self.fingerprints[candidate_id] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256}
+
+        for candidate_id in list(self.slot_of):
+            if candidate_id not in seen:
+                self.remove(candidate_id)
+                counts["removed"] += 1
+
+        if counts["added"] or counts["updated"] or counts["removed"]:
+            logger.info(f"Skill index refreshed from {json_dir}: {counts}")
+        return counts
+
+    # ----- queries -----
+
+    def _ids(self, bitset: int) -> List[str]:
+        ids = []
+        while bitset:
+            low = bitset & -bitset
+            ids.append(self.slots[low.bit_length() - 1])
+            bitset ^= low
+        return ids
+
+    def bitset_all(self, skills: Iterable[str]) -> int:
+        """Candidate bitset of everyone who has every one of skills."""
+        result = self._all
+        for name in skills:
+            skill_id = self.vocabulary.lookup(name)
+            if skill_id is None:
+                return 0
+            result &= self.postings.get(skill_id, 0)
+            if not result:
+                break
+        return result
+
+    def bitset_any(self, skills: Iterable[str]) -> int:
+        """Candidate bitset of everyone who has at least one of skills."""
+        result = 0
+        for name in skills:
+            skill_id = self.vocabulary.lookup(name)
+            if skill_id is not None:
+                result |= self.postings.get(skill_id, 0)
+        return result
+
+    def candidates_with_all(self, skills: Iterable[str]) -> List[str]:
+        """Return the ids of candidates that have every one of skills."""
+        return self._ids(self.bitset_all(skills))
+
+    def candidates_with_any(self, skills: Iterable[str]) -> List[str]:
+        """Return the ids of candidates that have at least one of skills."""
+        return self._ids(self.bitset_any(skills))
+
+    def candidates_for_job(self, job: Dict[str, Any]) -> List[str]:
+        """Return the ids of candidates that have all of a job description's must-have skills."""
+        return self.candidates_with_all(job_must_have_skills(job))
+
+    def skills_of(self, candidate_id: str) -> List[str]:
+        """Return the normalized skills indexed for a candidate."""
+        bits = self.skill_bits.get(candidate_id, 0)
+        return [name for i, name in enumerate(self.vocabulary.names) if bits >> i & 1]
+
+    def overlap(self, candidate_id: str, skills: Iterable[str]) -> int:
+        """Count how many of skills a candidate has."""
+        wanted = 0
+        for name in skills:
+            skill_id = self.vocabulary.lookup(name)
+            if skill_id is not None:
+                wanted |= 1 << skill_id
+        return (self.skill_bits.get(candidate_id, 0) & wanted).bit_count()
+
+
+def load_skill_index(json_dir: str = "processed-CVs", path: str = DEFAULT_INDEX_PATH) -> SkillIndex:
+    """Load the persisted index, apply any changes in json_dir and save it back."""
+    index = SkillIndex.load(path)
+    counts = index.refresh(json_dir)
+    if counts["added"] or counts["updated"] or counts["removed"] or not os.path.exists(path):
+        index.save()
+    return index
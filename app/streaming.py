@@ -0,0 +1,302 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.batch_matching import match_candidate_batch
+from app.compaction import prepare_cv_text
+from app.cv_store import CVStore, CVStoreWriter
+from app.dispatcher import PRIORITY_BULK
+from app.knowledge import load_job_descriptions
+from app.llm import complete, structured_call
+from app.llm_cache import get_default_cache
+from app.logging_config import get_logger
+from app.match_store import MatchStore, MatchStoreWriter
+from app.model import CandidateCV, JobMatchResult
+from app.pdf_extraction import extract_pdf_to_file, list_pdf_files, record_extraction
+from app.pre_extract import analyze_with_pre_extraction, pre_extract_enabled
+from app.prompts import ANALYZER_SYSTEM, MATCHER_SYSTEM, analysis_prompt, match_prompt
+from app.telemetry import finish_run, span
+
+logger = get_logger(__name__)
+
+AnalyzeFn = Callable[[str, str], CandidateCV]
+MatchFn = Callable[[CandidateCV, Dict[str, Any]], JobMatchResult]
+BatchMatchFn = Callable[[CandidateCV, List[Dict[str, Any]]], List[JobMatchResult]]
+
+
+class StreamingConfig(BaseModel):
+    """Concurrency limits and queue sizes for the streaming pipeline"""
+    extract_workers: int = Field(2, ge=1, description="Parallel PDF extractions (worker processes)")
+    analyze_concurrency: int = Field(4, ge=1, description="Concurrent analyzer LLM calls")
+    match_concurrency: int = Field(4, ge=1, description="Concurrent matcher LLM calls")
+    queue_size: int = Field(16, ge=1, description="Max items waiting between two stages")
+    batch_matching: bool = Field(True, description="Match each candidate against all jobs in one LLM call")
+
+
+class CandidateOutcome(BaseModel):
+    """What happened to one CV as it went through the pipeline"""
+    stem: str
+    status: str = "pending"
+    error: Optional[str] = None
+    matches: int = 0
+    finished_after: Optional[float] = Field(None, description="Seconds since pipeline start")
+
+
+class StreamingSummary(BaseModel):
+    """Totals for a streaming run"""
+    total: int = 0
+    matched: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    first_result_after: Optional[float] = None
+    outcomes: List[CandidateOutcome] = Field(default_factory=list)
+
+
+def analyze_cv_text(cv_text: str, source_file: str, priority: int = PRIORITY_BULK) -> CandidateCV:
+    """Default analyzer stage: one structured LLM call per CV (only for the fields pre-extraction left open)."""
+    cv_text = prepare_cv_text(cv_text, source_file)
+    if pre_extract_enabled():
+        return analyze_with_pre_extraction(cv_text, source_file, complete_fn=partial(complete, priority=priority))
+    cv = structured_call(analysis_prompt(cv_text, source_file), CandidateCV, system=ANALYZER_SYSTEM, priority=priority)
+    cv.source_file = source_file
+    return cv
+
+
+def match_candidate(cv: CandidateCV, job: Dict[str, Any]) -> JobMatchResult:
+    """Default matcher stage: one structured LLM call per candidate/job pair."""
+    result = structured_call(match_prompt(cv, job), JobMatchResult, system=MATCHER_SYSTEM)
+    result.job_id = job.get("job_id")
+    return result
+
+
+class StreamingPipeline:
+    """
+    Moves each CV through PDF -> txt -> CandidateCV -> JobMatchResults on its own.
+
+    Stages are connected by bounded asyncio queues and each stage has its own
+    concurrency limit, so extraction, analysis and matching overlap and the
+    first match results are written as soon as the first CV gets through.
+    When a CVStore is given, every analyzed CV is also appended to a new store
+    segment for this run; when a MatchStore is given, match results are written
+    to it in batched transactions as candidates finish.
+    """
+
+    def __init__(
+        self,
+        inputs: Dict[str, str],
+        knowledge_dir: str = "knowledge",
+        config: Optional[StreamingConfig] = None,
+        analyze_fn: AnalyzeFn = analyze_cv_text,
+        match_fn: MatchFn = match_candidate,
+        batch_match_fn: BatchMatchFn = match_candidate_batch,
+        on_result: Optional[Callable[[str, List[JobMatchResult]], None]] = None,
+        cv_store: Optional[CVStore] = None,
+        match_store: Optional[MatchStore] = None,
+    ):
+        self.inputs = inputs
+        self.jobs = load_job_descriptions(knowledge_dir)
+        self.config = config or StreamingConfig()
+        self.analyze_fn = analyze_fn
+        self.match_fn = match_fn
+        self.batch_match_fn = batch_match_fn
+        self.on_result = on_result
+        self.cv_store = cv_store
+        self._store_writer: Optional[CVStoreWriter] = None
+        self.match_store = match_store
+        self._match_writer: Optional[MatchStoreWriter] = None
+        self.outcomes: Dict[str, CandidateOutcome] = {}
+        self._started = 0.0
+        self._match_slots: Optional[asyncio.Semaphore] = None
+
+    def _fail(self, stem: str, stage: str, error: Exception) -> None:
+        outcome = self.outcomes[stem]
+        outcome.status = f"{stage}_failed"
+        outcome.error = str(error)
+        outcome.finished_after = time.perf_counter() - self._started
+        logger.warning(f"{stem}: {stage} failed: {error}")
+
+    async def _stage(self, source: asyncio.Queue, sink: Optional[asyncio.Queue], workers: int, handler) -> None:
+        """Run `workers` consumers of source; forward non-None results to sink, then close sink."""
+
+        async def worker():
+            while True:
+                item = await source.get()
+                if item is None:
+                    return
+                result = await handler(item)
+                if result is not None and sink is not None:
+                    await sink.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+    async def _extract(self, pdf_path: str, executor: ProcessPoolExecutor) -> Optional[str]:
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(executor, extract_pdf_to_file, pdf_path, self.inputs["txt_files_path"])
+        except Exception as e:
+            # extract_pdf_to_file never raises; this is the pool itself (e.g. BrokenProcessPool after a crash)
+            self._fail(stem, "extract", e)
+            return None
+        record_extraction(result)
+        if result.status != "success":
+            self._fail(stem, "extract", Exception(result.error))
+            return None
+        logger.info(f"{stem}: extracted {result.pages} page(s) in {result.seconds:.2f}s")
+        return result.output_path
+
+    async def _analyze(self, txt_path: str) -> Optional[tuple]:
+        stem = os.path.splitext(os.path.basename(txt_path))[0]
+        try:
+            with span("analyze", cv=stem) as s:
+                with open(txt_path, "r", encoding="utf-8") as f:
+                    cv_text = f.read()
+                s.set(chars=len(cv_text))
+                cv = await asyncio.to_thread(self.analyze_fn, cv_text, f"{stem}.pdf")
+                json_dir = self.inputs["json_files_path"]
+                os.makedirs(json_dir, exist_ok=True)
+                with open(os.path.join(json_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+                    f.write(cv.model_dump_json(indent=2))
+                if self._store_writer is not None:
+                    self._store_writer.append(stem, cv)
+        except Exception as e:
+            self._fail(stem, "analyze", e)
+            return None
+        logger.info(f"{stem}: analyzed")
+        return stem, cv
+
+    async def _match_one(self, cv: CandidateCV, job: Dict[str, Any]) -> JobMatchResult:
+        async with self._match_slots:
+            return await asyncio.to_thread(self.match_fn, cv, job)
+
+    async def _match(self, item: tuple) -> None:
+        stem, cv = item
+        try:
+            with span("match", cv=stem, jobs=len(self.jobs)):
+                if self.config.batch_matching:
+                    async with self._match_slots:
+                        results = await asyncio.to_thread(self.batch_match_fn, cv, self.jobs)
+                else:
+                    results = await asyncio.gather(*(self._match_one(cv, job) for job in self.jobs))
+                results = sorted(results, key=lambda r: r.overall_score, reverse=True)
+                matches_dir = self.inputs["matches_output_path"]
+                os.makedirs(matches_dir, exist_ok=True)
+                with open(os.path.join(matches_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+                    json.dump([r.model_dump(mode="json") for r in results], f, indent=2, ensure_ascii=False)
+                if self._match_writer is not None:
+                    self._match_writer.add(stem, results)
+        except Exception as e:
+            self._fail(stem, "match", e)
+            return None
+
+        outcome = self.outcomes[stem]
+        outcome.status = "matched"
+        outcome.matches = len(results)
+        outcome.finished_after = time.perf_counter() - self._started
+        logger.info(f"{stem}: matched against {len(results)} job(s) after {outcome.finished_after:.2f}s")
+        if self.on_result:
+            self.on_result(stem, results)
+
+    async def run(self, pdf_files: Optional[List[str]] = None) -> StreamingSummary:
+        """
+        Stream the given PDFs (default: every PDF in pdf_files_path) through all stages.
+
+        Returns:
+            StreamingSummary with one CandidateOutcome per CV
+        """
+        self._started = time.perf_counter()
+        pdf_files = list_pdf_files(self.inputs["pdf_files_path"]) if pdf_files is None else pdf_files
+        self.outcomes = {
+            os.path.splitext(os.path.basename(p))[0]: CandidateOutcome(stem=os.path.splitext(os.path.basename(p))[0])
+            for p in pdf_files
+        }
+        cfg = self.config
+        # without batching the matcher fans out one call per job, so its slots are divided by the job count;
+        # the semaphore keeps in-flight calls within match_concurrency when there are more jobs than slots
+        calls_per_candidate = 1 if cfg.batch_matching else max(1, len(self.jobs))
+        match_workers = max(1, cfg.match_concurrency // calls_per_candidate)
+        self._match_slots = asyncio.Semaphore(max(1, cfg.match_concurrency))
+
+        pdf_queue: asyncio.Queue = asyncio.Queue()
+        txt_queue: asyncio.Queue = asyncio.Queue(maxsize=cfg.queue_size)
+        cv_queue: asyncio.Queue = asyncio.Queue(maxsize=cfg.queue_size)
+        for path in pdf_files:
+            pdf_queue.put_nowait(path)
+        for _ in range(cfg.extract_workers):
+            pdf_queue.put_nowait(None)
+
+        async def close(queue: asyncio.Queue, workers: int, upstream):
+            await upstream
+            for _ in range(workers):
+                await queue.put(None)
+
+        if self.cv_store is not None:
+            self._store_writer = self.cv_store.writer()
+        if self.match_store is not None:
+            self._match_writer = self.match_store.writer(source="streaming", replace=True)
+        try:
+            with ProcessPoolExecutor(max_workers=cfg.extract_workers) as executor:
+                await asyncio.gather(
+                    close(txt_queue, cfg.analyze_concurrency,
+                          self._stage(pdf_queue, txt_queue, cfg.extract_workers, lambda p: self._extract(p, executor))),
+                    close(cv_queue, match_workers,
+                          self._stage(txt_queue, cv_queue, cfg.analyze_concurrency, self._analyze)),
+                    self._stage(cv_queue, None, match_workers, self._match),
+                )
+        finally:
+            if self._store_writer is not None:
+                self._store_writer.close()
+                self._store_writer = None
+            if self._match_writer is not None:
+                self._match_writer.flush()
+                self._match_writer = None
+
+        outcomes = list(self.outcomes.values())
+        finished = [o.finished_after for o in outcomes if o.status == "matched"]
+        summary = StreamingSummary(
+            total=len(outcomes),
+            matched=len(finished),
+            failed=len(outcomes) - len(finished),
+            seconds=time.perf_counter() - self._started,
+            first_result_after=min(finished) if finished else None,
+            outcomes=outcomes,
+        )
+        logger.info(
+            f"Streaming run finished: {summary.matched}/{summary.total} matched, {summary.failed} failed "
+            f"in {summary.seconds:.2f}s (first result after {summary.first_result_after or 0:.2f}s)"
+        )
+        cache = get_default_cache()
+        if cache:
+            cache.log_stats()
+        finish_run()
+        return summary
+
+
+def run_streaming(
+    inputs: Dict[str, str],
+    knowledge_dir: str = "knowledge",
+    config: Optional[StreamingConfig] = None,
+    pdf_files: Optional[List[str]] = None,
+    **kwargs,
+) -> StreamingSummary:
+    """Synchronous entry point for StreamingPipeline.run()."""
+    pipeline = StreamingPipeline(inputs, knowledge_dir=knowledge_dir, config=config, **kwargs)
+    return asyncio.run(pipeline.run(pdf_files))
+
+
+if __name__ == "__main__":
+    from app.logging_config import setup_logging
+
+    setup_logging()
+    run_streaming({
+        "pdf_files_path": "CV",
+        "txt_files_path": "preprocessed-CVs",
+        "json_files_path": "processed-CVs",
+        "matches_output_path": "job-matches-results",
+    }, cv_store=CVStore(), match_store=MatchStore.from_env())
@@ -0,0 +1,287 @@
+"""
+Local stub of an OpenAI-compatible chat completions endpoint.
+
+Replies with schema-valid CandidateCV / JobMatchResult / JobMatchBatch JSON
+(chosen from the request's response_format name) after a configurable latency,
+and can inject 5xx errors and 429 rate limits. Point the app at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub MODEL=openai/gpt-4o-mini
+
+Run it with `python -m app.stub_llm --port 8001 --latency 0.5 --error-rate 0.05 --rpm 60`.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_SOURCE_FILE = re.compile(r"source file: ([^)\s]+)")
+_JOB_ID = re.compile(r"^\[([^\]]+)\] ", re.M)
+_TITLE = re.compile(r'"title": "([^"]+)"')
+_KNOWN_SKILLS = ["Python", "Django", "PostgreSQL", "Docker", "AWS", "SQL", "Git", "Kubernetes", "Excel", "PyTorch"]
+
+
+class StubConfig(BaseModel):
+    """Behaviour of the stub server"""
+    latency: float = Field(0.2, ge=0, description="Mean reply latency in seconds")
+    jitter: float = Field(0.1, ge=0, description="Uniform +/- jitter on the latency in seconds")
+    error_rate: float = Field(0.0, ge=0, le=1, description="Share of requests answered with HTTP 500")
+    rate_limit_rate: float = Field(0.0, ge=0, le=1, description="Share of requests answered with HTTP 429")
+    rpm: Optional[int] = Field(None, ge=1, description="Server-side requests-per-minute limit (429 when exceeded)")
+    seed: Optional[int] = None
+
+
+def sample_candidate(prompt: str) -> Dict[str, Any]:
+    """Schema-valid CandidateCV for a prompt."""
+    match = _SOURCE_FILE.search(prompt)
+    name = (match.group(1).rsplit(".", 1)[0] if match else "Stub Candidate").replace("_", " ").title()
+    skills = [s for s in _KNOWN_SKILLS if s.lower() in prompt.lower()] or ["Python"]
+    return {
+        "contact_information": {"full_name": name, "email": "candidate@example.com"},
+        "summary": "Stub summary.",
+        "work_experience": [
+            {"company": "Stub Corp", "position": "Engineer", "start_date": "2019-01-01",
+             "end_date": "2023-12-31", "technologies": skills[:3], "duration_years": 5.0}
+        ],
+        "education": [{"institution": "Stub University", "degree": "BSc Computer Science", "level": "bachelor"}],
+        "skills": [{"name": s, "level": "advanced"} for s in skills],
+        "cv_analysis": {"total_years_experience": 5.0, "career_level": "mid", "job_hopping_score": 2.0},
+        "agent_assessment": {
+            "overall_rating": "good", "rating_score": 70, "experience_assessment": "Stub assessment.",
+            "technical_assessment": "Stub assessment.", "summary": "Stub summary.",
+        },
+        "source_file": match.group(1) if match else None,
+    }
+
+
+def sample_match(job_id: Optional[str] = None, title: str = "Stub Job") -> Dict[str, Any]:
+    """Schema-valid JobMatchResult."""
+    return {
+        "candidate_name": "Stub Candidate", "job_title": title, "job_id": job_id,
+        "overall_score": 65.0,
+        "breakdown": {"skills_score": 25, "experience_score": 20, "education_score": 15, "career_level_score": 5},
+        "skills_matched": ["Python"], "skills_missing": [], "skills_match_percentage": 60.0,
+        "candidate_experience_years": 5.0, "required_experience_years": 3.0,
+        "experience_gap": "Meets requirement", "education_match": True, "career_level_match": "exact_match",
+        "recommendation": "Stub recommendation for load testing.", "match_category": "moderate_match",
+    }
+
+
+def sample_reply(schema_name: Optional[str], prompt: str, fields: Optional[List[str]] = None) -> str:
+    """
+    Return the JSON body for the structured output named schema_name.
+
+    CandidateCV* schemas (e.g. the pre-extractor's CandidateCVRemainder) get
+    only the requested `fields` when those are given.
+    """
+    if schema_name and schema_name.startswith("CandidateCV"):
+        candidate = sample_candidate(prompt)
+        if fields is not None:
+            candidate = {name: value for name, value in candidate.items() if name in fields}
+        return json.dumps(candidate)
+    if schema_name == "JobMatchBatch":
+        titles = _TITLE.findall(prompt)
+        job_ids = _JOB_ID.findall(prompt)
+        return json.dumps({"matches": [
+            sample_match(job_id, titles[i] if i < len(titles) else "Stub Job") for i, job_id in enumerate(job_ids)
+        ]})
+    if schema_name == "JobMatchResult":
+        titles = _TITLE.findall(prompt)
+        return json.dumps(sample_match(title=titles[0] if titles else "Stub Job"))
+    return "Stub reply."
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer carrying the stub config and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, config: StubConfig):
+        super().__init__(address, _StubHandler)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.recent: deque = deque()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    def admit(self) -> Optional[int]:
+        """Decide the fate of one request: None to serve it, else the HTTP error code."""
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.config.rpm:
+                while self.recent and now - self.recent[0] > 60:
+                    self.recent.popleft()
+                if len(self.recent) >= self.config.rpm:
+                    self.stats["rate_limited"] += 1
+                    return 429
+                self.recent.append(now)
+            roll = self.random.random()
+            if roll < self.config.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return 429
+            if roll < self.config.rate_limit_rate + self.config.error_rate:
+                self.stats["errors"] += 1
+                return 500
+            self.stats["ok"] += 1
+            delay = self.config.latency + self.random.uniform(-self.config.jitter, self.config.jitter)
+        time.sleep(max(0.0, delay))
+        return None
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: StubLLMServer
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        code = self.server.admit()
+        if code == 429:
+            self._send(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                       {"Retry-After": "1"})
+            return
+        if code == 500:
+            self._send(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        messages: List[Dict[str, Any]] = request.get("messages", [])
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        json_schema = (request.get("response_format") or {}).get("json_schema") or {}
+        properties = (json_schema.get("schema") or {}).get("properties")
+        content = sample_reply(json_schema.get("name"), prompt, list(properties) if properties else None)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        self._send(200, {
+            "id": f"stub-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+def serve(host: str = "127.0.0.1", port: int = 8001, config: Optional[StubConfig] = None,
+          background: bool = False) -> StubLLMServer:
+    """
+    Start the stub server.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one; see server.server_address)
+        config: Latency / error behaviour
+        background: Serve from a daemon thread and return immediately
+
+    Returns:
+        The running StubLLMServer (call .shutdown() to stop a background server)
+    """
+    server = StubLLMServer((host, port), config or StubConfig())
+    logger.info(f"Stub LLM listening on http://{host}:{server.server_address[1]}/v1")
+    if background:
+        threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+
+def load_test(requests: int = 100, priority_every: int = 10) -> Dict[str, Any]:
+    """
+    Push `requests` uncached match calls through app.llm.complete and report throughput.
+
+    Uses the dispatcher configured from the environment, so set OPENAI_BASE_URL to
+    the stub and LLM_RPM / LLM_TPM / LLM_MAX_IN_FLIGHT to the limits under test.
+    Every `priority_every`-th call goes in the interactive lane.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.dispatcher import PRIORITY_BULK, PRIORITY_INTERACTIVE, get_default_dispatcher
+    from app.llm import complete
+    from app.model import JobMatchResult
+
+    latencies: Dict[str, List[float]] = {"interactive": [], "bulk": []}
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        failed = False
+        lane = "interactive" if priority_every and i % priority_every == 0 else "bulk"
+        started = time.perf_counter()
+        try:
+            complete(f"load test request {i}", JobMatchResult, cache=False,
+                     priority=PRIORITY_INTERACTIVE if lane == "interactive" else PRIORITY_BULK)
+        except Exception:
+            failed = True
+        with lock:
+            errors += failed
+            latencies[lane].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(64, requests)) as pool:
+        list(pool.map(one, range(requests)))
+    seconds = time.perf_counter() - started
+
+    def p50(values: List[float]) -> float:
+        return sorted(values)[len(values) // 2] if values else 0.0
+
+    dispatcher = get_default_dispatcher()
+    report = {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "requests_per_minute": round(requests / seconds * 60, 1) if seconds else 0.0,
+        "p50_interactive": round(p50(latencies["interactive"]), 3),
+        "p50_bulk": round(p50(latencies["bulk"]), 3),
+        "dispatcher": dict(dispatcher.stats) if dispatcher else None,
+    }
+    logger.info(f"Load test finished: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    from app.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Run a local stub LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    setup_logging()
+    serve(args.host, args.port, StubConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, rpm=args.rpm, seed=args.seed,
+    ))
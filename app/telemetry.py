@@ -0,0 +1,339 @@
+"""
+Lightweight tracing spans and Prometheus metrics for the pipeline.
+
+Wrap a unit of work in a span:
+
+    with span("analyze", cv="jane-doe") as s:
+        ...
+        s.set(pages=3)
+
+Each finished span is logged as a structured record (see
+StructuredFormatter; the span fields are under "span") and folded into
+process-wide counters and duration histograms. Outermost spans (one per CV and
+stage) and spans that failed or needed retries are logged at INFO, so a run's
+log shows which CVs caused errors or retries; the other nested spans (single
+LLM requests) only at DEBUG. Numeric work counters (pages, bytes, tokens,
+retries) and cache hits / misses of nested spans are also rolled up into their
+parent, so the "analyze" span of a CV shows the tokens and retries of the LLM
+calls made for it. Call finish_run() at the end of a run to write the metrics file and
+log the slowest spans of each stage (at INFO).
+"""
+
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_METRICS_PATH = os.path.join(".cache", "metrics.prom")
+METRIC_PREFIX = "hr_pipeline"
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# numeric span attributes exported as counters and rolled up into parent spans
+COUNTED_FIELDS = ("pages", "bytes", "prompt_tokens", "completion_tokens", "retries")
+SLOWEST_KEPT = 5
+
+RUN_ID = uuid.uuid4().hex[:12]
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(labels: LabelSet, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, histograms and slowest-span lists rendered in Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counters: Dict[str, Dict[LabelSet, float]] = {}
+        self.histograms: Dict[str, Dict[LabelSet, List[float]]] = {}
+        self.help: Dict[str, str] = {}
+        self.slowest: Dict[str, List[Tuple[float, int, Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, help: str = "", **labels) -> None:
+        """Add value to a counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+            if help:
+                self.help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels) -> None:
+        """Record one observation in a histogram."""
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            # per-bucket counts (non-cumulative), then sum and count
+            state = series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+            if help:
+                self.help.setdefault(name, help)
+
+    def track_slowest(self, stage: str, duration: float, attributes: Dict[str, Any]) -> None:
+        """Keep the SLOWEST_KEPT slowest spans of a stage."""
+        with self._lock:
+            heap = self.slowest.setdefault(stage, [])
+            entry = (duration, next(_span_ids), attributes)
+            if len(heap) < SLOWEST_KEPT:
+                heapq.heappush(heap, entry)
+            elif duration > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+
+    def slowest_spans(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Stage -> slowest span attributes (with duration_seconds), slowest first."""
+        with self._lock:
+            return {
+                stage: [{"duration_seconds": round(d, 4), **attrs} for d, _, attrs in sorted(heap, reverse=True)]
+                for stage, heap in self.slowest.items()
+            }
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                full = f"{METRIC_PREFIX}_{name}"
+                if name in self.help:
+                    lines.append(f"# HELP {full} {self.help[name]}")
+                lines.append(f"# TYPE {full} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}{_render_labels(labels)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                full = f"{METRIC_PREFIX}_{name}"
+                if name in self.help:
+                    lines.append(f"# HELP {full} {self.help[name]}")
+                lines.append(f"# TYPE {full} histogram")
+                for labels, state in sorted(series.items()):
+                    cumulative = 0.0
+                    for i, bound in enumerate(self.buckets):
+                        cumulative += state[i]
+                        lines.append(f"{full}_bucket{_render_labels(labels, ('le', f'{bound:g}'))} {cumulative:g}")
+                    lines.append(f"{full}_bucket{_render_labels(labels, ('le', '+Inf'))} {state[-1]:g}")
+                    lines.append(f"{full}_sum{_render_labels(labels)} {state[-2]:.6f}")
+                    lines.append(f"{full}_count{_render_labels(labels)} {state[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Atomically write the metrics to path (node_exporter textfile collector compatible)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.slowest.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class Span:
+    """
+    One timed unit of work (a PDF extraction, an analyzer call, a match call, an LLM request).
+
+    Args:
+        name: Span name, used as the `span` metric label (e.g. "extract", "analyze", "match", "llm")
+        **attributes: Fields logged with the span (file, cv, pages, bytes, prompt_tokens, cache, ...)
+    """
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.rollup: Dict[str, float] = {}
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.span_id = next(_span_ids)
+        self.parent: Optional["Span"] = _current_span.get()
+        self.duration: Optional[float] = None
+        self._started = 0.0
+        self._token = None
+        # children finishing on other threads (asyncio.to_thread, thread pools) update rollup concurrently
+        self._lock = threading.Lock()
+
+    @property
+    def stage(self) -> str:
+        """Name of the outermost enclosing span (the pipeline stage this work belongs to)."""
+        return self.parent.stage if self.parent else self.name
+
+    def set(self, **attributes) -> "Span":
+        """Set span attributes."""
+        self.attributes.update(attributes)
+        return self
+
+    def fail(self, error: Any) -> "Span":
+        """Mark the span as failed without raising."""
+        self.status = "error"
+        self.error = str(error)
+        return self
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.fail(f"{exc_type.__name__}: {exc}")
+        self.finish(time.perf_counter() - self._started)
+        return False
+
+    def _absorb(self, child: "Span") -> None:
+        with child._lock:
+            child_rollup = dict(child.rollup)
+        cache = child.attributes.get("cache")
+        with self._lock:
+            for field in COUNTED_FIELDS:
+                value = child.attributes.get(field, 0) + child_rollup.get(field, 0)
+                if value:
+                    self.rollup[field] = self.rollup.get(field, 0) + value
+            for key, result in (("cache_hits", "hit"), ("cache_misses", "miss")):
+                value = child_rollup.get(key, 0) + (1 if cache == result else 0)
+                if value:
+                    self.rollup[key] = self.rollup.get(key, 0) + value
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Span fields as logged under "span"."""
+        data = {
+            "name": self.name,
+            "stage": self.stage,
+            "run_id": RUN_ID,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "duration_seconds": round(self.duration or 0.0, 4),
+            "status": self.status,
+            **self.attributes,
+        }
+        with self._lock:
+            rollup = dict(self.rollup)
+        if rollup:
+            data["children"] = rollup
+        if self.error:
+            data["error"] = self.error
+        return data
+
+    def finish(self, duration: float) -> None:
+        """Record the span: log it, update metrics and roll its counters up into the parent."""
+        self.duration = duration
+        labels = {"span": self.name, "stage": self.stage}
+        metrics.observe("span_duration_seconds", duration, help="Span wall-clock duration", **labels)
+        metrics.inc("spans_total", help="Finished spans", status=self.status, **labels)
+        for field in COUNTED_FIELDS:
+            value = self.attributes.get(field)
+            if isinstance(value, (int, float)) and value:
+                metrics.inc(f"{field}_total", value, help=f"Sum of span {field}", **labels)
+        if self.attributes.get("cache") in ("hit", "miss"):
+            metrics.inc("llm_cache_total", help="LLM response cache lookups", result=self.attributes["cache"], **labels)
+        if self.parent is not None:
+            self.parent._absorb(self)
+        else:
+            metrics.track_slowest(self.name, duration, {k: v for k, v in self.as_dict().items()
+                                                        if k not in ("run_id", "span_id", "parent_id", "stage")})
+
+        notable = self.parent is None or self.status != "ok" or bool(self.attributes.get("retries"))
+        level = logging.INFO if notable else logging.DEBUG
+        if logger.isEnabledFor(level):
+            logger.log(
+                level,
+                f"span {self.name} {self.status} in {duration * 1000:.1f}ms",
+                extra={"extra_fields": {"span": self.as_dict()}},
+            )
+
+
+def span(name: str, **attributes) -> Span:
+    """Start a span; use as a context manager."""
+    return Span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost open span of this context, if any."""
+    return _current_span.get()
+
+
+def record_span(name: str, duration: float, status: str = "ok", error: Optional[str] = None, **attributes) -> Span:
+    """
+    Record a span whose duration was measured elsewhere (e.g. in a worker process).
+
+    The span is attached to the current span of the caller, if any.
+    """
+    finished = Span(name, **attributes)
+    if status != "ok":
+        finished.fail(error or status)
+    finished.finish(duration)
+    return finished
+
+
+def metrics_path() -> Optional[str]:
+    """Metrics file from METRICS_PATH (default .cache/metrics.prom); empty disables writing."""
+    path = os.getenv("METRICS_PATH", DEFAULT_METRICS_PATH)
+    return path or None
+
+
+def log_slowest() -> None:
+    """Log the slowest spans of each stage as one structured record."""
+    slowest = metrics.slowest_spans()
+    for stage, spans in slowest.items():
+        described = ", ".join(
+            f"{s.get('file') or s.get('cv') or s.get('schema') or '?'} ({s['duration_seconds']:.2f}s)" for s in spans
+        )
+        logger.info(f"Slowest {stage} spans: {described}")
+    if slowest:
+        logger.info("Slowest spans per stage", extra={"extra_fields": {"run_id": RUN_ID, "slowest_spans": slowest}})
+
+
+def finish_run(path: Optional[str] = None) -> Optional[str]:
+    """
+    Write the metrics file and log the slowest spans of the run.
+
+    Args:
+        path: Metrics file (default: METRICS_PATH env var or .cache/metrics.prom)
+
+    Returns:
+        The path written, or None when metrics writing is disabled
+    """
+    log_slowest()
+    path = path or metrics_path()
+    if not path:
+        return None
+    metrics.inc("runs_total", help="Finished pipeline runs")
+    metrics.write(path)
+    logger.info(f"Metrics written to {path}")
+    return path
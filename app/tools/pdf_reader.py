@@ -4,6 +4,15 @@ from pydantic import BaseModel, Field
 import os
 import PyPDF2
 
+from app.pdf_extraction import (
+    ExtractionLimits,
+    batch_extract,
+    extract_links_from_page,
+    extract_pdf_to_file,
+    stream_pdf_text,
+)
+from app.telemetry import Span, span
+
 class PDFReaderToolInput(BaseModel):
     """Input schema for PDFReaderTool."""
     file_path: str = Field(..., description="The path to the PDF file to read")
@@ -19,67 +28,70 @@ class PDFReaderTool(BaseTool):
 
     def _extract_links_from_page(self, page: PyPDF2._page.PageObject) -> List[str]:
         """Extract hyperlinks from a single PDF page, if any."""
-        links = []
-        if "/Annots" in page:
-            for annot in page["/Annots"]:
-                try:
-                    annot_obj = annot.get_object()
-                    if "/A" in annot_obj and "/URI" in annot_obj["/A"]:
-                        uri = annot_obj["/A"]["/URI"]
-                        links.append(uri)
-                except Exception:
-                    continue
-        return links
+        return extract_links_from_page(page)
 
     def _run(self, file_path: str, output_dir: Optional[str] = None) -> str:
         """
         Extract text from a PDF file. For each page, if hyperlinks are found,
         they are appended right after that page's text. Optionally save to output_dir.
         """
+        with span("extract", file=os.path.basename(file_path)) as s:
+            result = self._extract(file_path, output_dir, s)
+            if result.startswith("Error"):
+                s.fail(result)
+            return result
+
+    def _extract(self, file_path: str, output_dir: Optional[str], s: Span) -> str:
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                full_text_parts = []
+            if output_dir:
+                # pages are streamed to the output file as they are read
+                result = extract_pdf_to_file(file_path, output_dir, ExtractionLimits.from_env())
+                s.set(pages=result.pages, bytes=result.bytes)
+                if result.status == "error":
+                    if not os.path.exists(file_path):
+                        raise FileNotFoundError(file_path)
+                    if result.error.startswith("Could not extract text"):
+                        return f"Error: {result.error}"
+                    return f"Error reading PDF: {result.error}"
+                return f"Text (with page links) extracted and saved to {result.output_path}"
 
-                for page_idx, page in enumerate(pdf_reader.pages, start=1):
-                    # extract page text
-                    page_text = page.extract_text() or ""
-                    # extract links for this page
-                    page_links = self._extract_links_from_page(page)
+            with open(os.devnull, "w", encoding="utf-8") as sink:
+                pages, has_text, _ = stream_pdf_text(file_path, sink)
+            s.set(pages=pages, bytes=os.path.getsize(file_path))
 
-                    # build page output
-                    page_output = page_text.rstrip()
+            if not has_text:
+                return "Error: Could not extract text from PDF. The file might be empty or image-based."
 
-                    if page_links:
-                        # add a small header so we know these links belong to this page
-                        links_lines = [f"{i+1}. {link}" for i, link in enumerate(page_links)]
-                        page_output += "\n\n[Links on this page]\n" + "\n".join(links_lines)
+            # if you want to return the whole text instead, use extract_pdf_text(file_path)
+            return "Successfully extracted text (links added next to their pages)."
 
-                    # separate pages clearly
-                    full_text_parts.append(page_output)
+        except FileNotFoundError:
+            return f"Error: File not found at path: {file_path}"
+        except Exception as e:
+            return f"Error reading PDF: {str(e)}"
 
-                full_text = "\n\n--- PAGE BREAK ---\n\n".join(full_text_parts).strip()
 
-                if not full_text:
-                    return "Error: Could not extract text from PDF. The file might be empty or image-based."
+class PDFBatchReaderToolInput(BaseModel):
+    """Input schema for PDFBatchReaderTool."""
+    input_dir: str = Field(..., description="Directory containing the PDF files to read")
+    output_dir: str = Field(..., description="Directory to save the extracted text files")
+    max_workers: Optional[int] = Field(None, description="Number of worker processes (default: CPU count)")
 
-                # Save extracted text if output_dir is provided
-                output_path = None
-                if output_dir:
-                    os.makedirs(output_dir, exist_ok=True)
-                    base_name = os.path.basename(file_path)
-                    file_name = os.path.splitext(base_name)[0] + ".txt"
-                    output_path = os.path.join(output_dir, file_name)
-                    with open(output_path, "w", encoding="utf-8") as out_file:
-                        out_file.write(full_text)
 
-                if output_path:
-                    return f"Text (with page links) extracted and saved to {output_path}"
-                else:
-                    # if you want to return the whole text instead, change this line
-                    return "Successfully extracted text (links added next to their pages)."
+class PDFBatchReaderTool(BaseTool):
+    name: str = "PDF Batch Reader"
+    description: str = (
+        "Extracts text (with per-page hyperlinks) from every PDF in a directory in parallel, "
+        "saves one .txt file per PDF and returns a compact per-file summary."
+    )
+    args_schema: Type[BaseModel] = PDFBatchReaderToolInput
 
-        except FileNotFoundError:
-            return f"Error: File not found at path: {file_path}"
+    def _run(self, input_dir: str, output_dir: str, max_workers: Optional[int] = None) -> str:
+        """Extract all PDFs in input_dir and return the batch summary as JSON."""
+        if not os.path.isdir(input_dir):
+            return f"Error: Directory not found at path: {input_dir}"
+        try:
+            summary = batch_extract(input_dir, output_dir, max_workers=max_workers)
         except Exception as e:
-            return f"Error reading PDF: {str(e)}"
+            return f"Error reading PDFs: {str(e)}"
+        return summary.model_dump_json(exclude={"input_dir"})
@@ -0,0 +1,46 @@
+from crewai.tools import BaseTool
+from typing import Type, Optional
+from pydantic import BaseModel, Field
+import os
+
+from app.shortlist import ShortlistConfig, run_shortlist
+
+class CandidateShortlistToolInput(BaseModel):
+    """Input schema for CandidateShortlistTool."""
+    json_dir: str = Field(..., description="Directory containing the structured candidate JSON files")
+    output_dir: str = Field(..., description="Directory where pre-filtered match results are saved")
+    knowledge_dir: str = Field("knowledge", description="Directory containing the job description JSON files")
+    top_k: Optional[int] = Field(None, description="Number of candidates to shortlist per job")
+    threshold: Optional[float] = Field(None, description="Shortlist every candidate with a pre-score at or above this (0-100)")
+
+class CandidateShortlistTool(BaseTool):
+    name: str = "Candidate Shortlist"
+    description: str = (
+        "Pre-scores every candidate against every job description locally (skills overlap, experience, "
+        "career level) and returns, per job_id, the candidates worth a full match review. Every other "
+        "candidate-job pair is saved as a pre-filtered result (pre_filtered=true, category from the local "
+        "score) and must not be matched again."
+    )
+    args_schema: Type[BaseModel] = CandidateShortlistToolInput
+
+    def _run(
+        self,
+        json_dir: str,
+        output_dir: str,
+        knowledge_dir: str = "knowledge",
+        top_k: Optional[int] = None,
+        threshold: Optional[float] = None,
+    ) -> str:
+        """Build the shortlist and return it as JSON."""
+        if not os.path.isdir(json_dir):
+            return f"Error: Directory not found at path: {json_dir}"
+        try:
+            config = ShortlistConfig.from_env()
+            if top_k is not None:
+                config.top_k = top_k
+            if threshold is not None:
+                config.threshold = threshold
+            shortlist = run_shortlist(json_dir, knowledge_dir, output_dir, config)
+        except Exception as e:
+            return f"Error building shortlist: {str(e)}"
+        return shortlist.model_dump_json()
@@ -0,0 +1,377 @@
+"""
+Validation of structured LLM replies that keeps everything that is valid.
+
+CandidateCV is a deep model (nested lists, EmailStr / HttpUrl fields,
+constrained floats), and a single bad value in a reply used to fail the whole
+reply, so the analyzer was asked for the full CV again. validate_reply()
+validates a reply with a cached TypeAdapter and, only when that fails,
+isolates each error to the smallest sub-object it can:
+
+- values with a mechanical fix are coerced ("linkedin.com/in/x" gets a
+  scheme, "3.6/4.0" becomes 3.6, "Full-Time" becomes full_time, "2019-03"
+  becomes 2019-03-01, a rating of 101 is clamped to 100)
+- anything else is dropped: the bad list item (one other_links URL), or the
+  optional field, which falls back to its default
+
+Top-level fields that lost a whole object (an education entry without an
+institution) or a required value are sent back to the model in one repair
+prompt holding only those fields and their errors. The caller only sees the
+ValidationError when the reply cannot be made valid even then.
+
+validate_many() validates a batch of replies in a single TypeAdapter call and
+isolates only the items that fail.
+"""
+
+import copy
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, create_model
+
+from app.logging_config import get_logger
+from app.prompts import repair_prompt
+from app.telemetry import current_span
+
+logger = get_logger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+# coerce / drop passes before giving up on a reply
+MAX_ISOLATION_ROUNDS = 8
+# out-of-range numbers this close to the bound (share of the bound) are clamped, others dropped
+CLAMP_TOLERANCE = 0.1
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.I)
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_PARTIAL_DATE = re.compile(r"^(\d{4})(?:[-/.](\d{1,2}))?$")
+_DOMAIN = re.compile(r"^(?:www\.)?[\w-]+(?:\.[\w-]+)+(?:[/?#]\S*)?$")
+_EXPECTED = re.compile(r"'([^']*)'")
+_OPEN_ENDED = {"present", "current", "now", "ongoing", "to date"}
+_MONTH_FORMATS = ("%b %Y", "%B %Y", "%m/%Y")
+_NO_FIX = object()
+_DROP = object()
+
+
+class ValidationReport(BaseModel):
+    """What validate_reply() changed to get a valid reply"""
+    coerced: List[str] = Field(default_factory=list, description="Paths of values coerced to a valid form")
+    dropped: List[str] = Field(default_factory=list, description="Paths of invalid list items / optional fields dropped")
+    repaired: List[str] = Field(default_factory=list, description="Top-level fields replaced by the repair call")
+    repair_calls: int = Field(0, description="Repair prompts sent")
+
+    @property
+    def clean(self) -> bool:
+        """True when the reply validated as it was."""
+        return not (self.coerced or self.dropped or self.repaired or self.repair_calls)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter for tp, built once per type (building one compiles a validator)."""
+    return TypeAdapter(tp)
+
+
+@lru_cache(maxsize=None)
+def field_subset_model(model: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """
+    Model holding only `fields` of `model` (same types, defaults and descriptions).
+
+    Named <Model>Remainder, so a subset of a subset keeps the original name.
+    """
+    base = model.__name__[: -len("Remainder")] if model.__name__.endswith("Remainder") else model.__name__
+    definitions: Dict[str, Any] = {
+        name: (info.annotation, info) for name, info in model.model_fields.items() if name in fields
+    }
+    return create_model(f"{base}Remainder", __doc__=f"{base} fields still to extract", **definitions)
+
+
+def _unfence(text: str) -> str:
+    """Strip whitespace and a markdown code fence (the regex only runs on fenced replies)."""
+    text = text.strip()
+    return _CODE_FENCE.sub("", text) if text.startswith("```") else text
+
+
+def reply_data(raw: Any) -> Any:
+    """The JSON value of a model reply: a model instance, a dict / list, or a JSON string (optionally code-fenced)."""
+    if isinstance(raw, BaseModel):
+        return raw.model_dump(mode="json")
+    if isinstance(raw, (dict, list)):
+        return raw
+    return json.loads(_unfence(str(raw)))
+
+
+def _dotted(path: Sequence[Any]) -> str:
+    return ".".join(str(part) for part in path)
+
+
+def _resolve(data: Any, loc: Tuple[Any, ...], missing: bool) -> Optional[List[Any]]:
+    """
+    Turn an error location into a path of real keys / indexes in data.
+
+    Union members add tags such as "function-after[...]" to the location;
+    those are skipped. None when the location is gone (dropped earlier this pass).
+    """
+    path: List[Any] = []
+    node = data
+    for i, part in enumerate(loc):
+        if node is _DROP:
+            return None
+        if isinstance(node, dict):
+            if part in node:
+                path.append(part)
+                node = node[part]
+            elif missing and i == len(loc) - 1:
+                path.append(part)
+        elif isinstance(node, list) and isinstance(part, int):
+            if not 0 <= part < len(node):
+                return None
+            path.append(part)
+            node = node[part]
+        else:
+            break
+    return None if node is _DROP else path
+
+
+def _get(data: Any, path: Sequence[Any]) -> Any:
+    for part in path:
+        data = data[part]
+    return data
+
+
+def _coerce(value: Any, error: Dict[str, Any]) -> Any:
+    """A valid form of value for a mechanical error, else _NO_FIX."""
+    kind, ctx = error["type"], error.get("ctx") or {}
+    fixed: Any = _NO_FIX
+    if isinstance(value, str):
+        text = value.strip()
+        if kind.startswith("url_"):
+            text = text.strip("<>()[]'\"")
+            if "://" not in text and _DOMAIN.match(text):
+                fixed = f"https://{text}"
+        elif kind == "value_error" and "email" in str(error.get("msg", "")).lower():
+            fixed = re.sub(r"^mailto:", "", text.strip("<>"), flags=re.I).strip()
+        elif kind in ("float_parsing", "int_parsing"):
+            number = _NUMBER.search(text)
+            if number:
+                fixed = float(number.group()) if kind == "float_parsing" else int(float(number.group()))
+        elif kind in ("enum", "literal_error"):
+            normalized = re.sub(r"[\s-]+", "_", text.lower())
+            if normalized in _EXPECTED.findall(str(ctx.get("expected", ""))):
+                fixed = normalized
+        elif kind.startswith("date"):
+            fixed = _coerce_date(text)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if kind in ("less_than_equal", "greater_than_equal"):
+            bound = ctx.get("le", ctx.get("ge"))
+            if bound is not None and abs(value - bound) <= CLAMP_TOLERANCE * max(abs(bound), 1):
+                fixed = bound
+        elif kind == "string_type":
+            fixed = str(value)
+    if kind == "list_type" and isinstance(value, (str, dict)):
+        fixed = [value]
+    return _NO_FIX if fixed is _NO_FIX or fixed == value else fixed
+
+
+def _coerce_date(text: str) -> Any:
+    if text.lower() in _OPEN_ENDED:
+        return None
+    match = _PARTIAL_DATE.match(text)
+    if match:
+        month = int(match.group(2) or 1)
+        return f"{match.group(1)}-{month:02d}-01" if 1 <= month <= 12 else _NO_FIX
+    for fmt in _MONTH_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return _NO_FIX
+
+
+def _sweep(node: Any) -> Any:
+    """Remove the items marked _DROP from every list (in place)."""
+    if isinstance(node, dict):
+        for value in node.values():
+            _sweep(value)
+    elif isinstance(node, list):
+        node[:] = [item for item in node if item is not _DROP]
+        for item in node:
+            _sweep(item)
+    return node
+
+
+def _isolate(
+    data: Dict[str, Any], model: Type[T], report: ValidationReport
+) -> Tuple[Optional[T], Dict[str, List[str]]]:
+    """
+    Coerce or drop invalid values of data until it validates as model.
+
+    Returns:
+        (the instance, or None if required values are still invalid,
+         top-level field -> errors of the fields worth a repair call)
+    """
+    adapter = type_adapter(model)
+    data = copy.deepcopy(data)
+    needs_repair: Dict[str, List[str]] = {}
+    for _ in range(MAX_ISOLATION_ROUNDS):
+        try:
+            return adapter.validate_python(data), needs_repair
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+
+        changed = False
+        for error in errors:
+            missing = error["type"] == "missing"
+            path = _resolve(data, error["loc"], missing)
+            if not path:
+                continue
+            message = f"{_dotted(path)}: {error['msg']}"
+            if not missing:
+                fixed = _coerce(_get(data, path), error)
+                if fixed is not _NO_FIX:
+                    _get(data, path[:-1])[path[-1]] = fixed
+                    report.coerced.append(_dotted(path))
+                    changed = True
+                    continue
+
+            # drop the value, or for a missing one the object lacking it
+            target = path[:-1] if missing else path
+            field = path[0]
+            if not target or (len(target) == 1 and model.model_fields[field].is_required()):
+                needs_repair.setdefault(field, []).append(message)
+                continue
+            parent = _get(data, target[:-1])
+            if isinstance(parent, list):
+                dropped, parent[target[-1]] = parent[target[-1]], _DROP
+            else:
+                dropped = parent.pop(target[-1])
+            if isinstance(dropped, dict):
+                needs_repair.setdefault(field, []).append(message)
+            report.dropped.append(_dotted(target))
+            changed = True
+
+        _sweep(data)
+        if not changed:
+            break
+    return None, needs_repair
+
+
+def validate_reply(
+    raw: Any,
+    model: Type[T],
+    complete_fn: Optional[Callable[..., Any]] = None,
+    system: Optional[str] = None,
+) -> Tuple[T, ValidationReport]:
+    """
+    Validate a model reply, isolating invalid values instead of rejecting the reply.
+
+    Args:
+        raw: The reply (model instance, dict, or JSON string)
+        model: Pydantic model the reply should validate as
+        complete_fn: Function performing the repair call (see app.llm.complete); None never calls the model
+        system: System message for the repair call
+
+    Returns:
+        (the validated instance, what had to be changed)
+
+    Raises:
+        ValidationError: if required values are still invalid after the repair call
+    """
+    report = ValidationReport()
+    if isinstance(raw, model):
+        return raw, report
+    adapter = type_adapter(model)
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    try:
+        if isinstance(raw, str):
+            return adapter.validate_json(_unfence(raw)), report
+        return adapter.validate_python(reply_data(raw)), report
+    except ValidationError as e:
+        original = e
+    try:
+        data = reply_data(raw)
+    except ValueError:
+        raise original from None
+    if not isinstance(data, dict):
+        raise original
+
+    instance, needs_repair = _isolate(data, model, report)
+    if needs_repair and complete_fn is not None:
+        fields = sorted(needs_repair)
+        errors = [message for field in fields for message in needs_repair[field]]
+        logger.info(f"{model.__name__}: asking the model to repair {', '.join(fields)}")
+        try:
+            repaired = reply_data(complete_fn(
+                repair_prompt({field: data.get(field) for field in fields}, errors),
+                field_subset_model(model, frozenset(fields)),
+                system=system,
+            ))
+            merged = {**data, **{field: repaired[field] for field in fields if field in repaired}}
+            retry_report = ValidationReport(repaired=[field for field in fields if field in repaired], repair_calls=1)
+            retry, _ = _isolate(merged, model, retry_report)
+        except Exception as e:
+            logger.warning(f"{model.__name__}: repair call failed: {e}")
+            retry = None
+        if retry is not None:
+            instance, report = retry, retry_report
+        else:
+            report.repair_calls = 1
+    if instance is None:
+        raise original
+
+    logger.debug(
+        f"{model.__name__}: coerced {report.coerced or '-'}, dropped {report.dropped or '-'}, "
+        f"repaired {report.repaired or '-'}"
+    )
+    s = current_span()
+    if s is not None:
+        s.set(
+            validation_coerced=len(report.coerced),
+            validation_dropped=len(report.dropped),
+            validation_repaired=report.repaired,
+        )
+    return instance, report
+
+
+def validate_many(
+    raws: Sequence[Any],
+    model: Type[T],
+    complete_fn: Optional[Callable[..., Any]] = None,
+    system: Optional[str] = None,
+) -> List[Optional[T]]:
+    """
+    Validate a batch of replies in one TypeAdapter call.
+
+    When some items fail, the others are validated again as a batch and only
+    the failing ones go through validate_reply() (isolation, then a repair call
+    when complete_fn is given).
+
+    Returns:
+        One instance per reply, in order; None for replies that could not be made valid
+    """
+    if not raws:
+        return []
+    adapter = type_adapter(List[model])
+    try:
+        if all(isinstance(raw, str) for raw in raws):
+            return adapter.validate_json("[" + ",".join(_unfence(raw) for raw in raws) + "]")
+        return adapter.validate_python(list(raws))
+    except ValidationError as e:
+        failed = {error["loc"][0] for error in e.errors() if error["loc"] and isinstance(error["loc"][0], int)}
+        if not failed:
+            # unparseable JSON somewhere: every item on its own
+            failed = set(range(len(raws)))
+
+    results: List[Optional[T]] = [None] * len(raws)
+    valid = [i for i in range(len(raws)) if i not in failed]
+    for i, instance in zip(valid, validate_many([raws[i] for i in valid], model, complete_fn, system)):
+        results[i] = instance
+    for i in sorted(failed):
+        try:
+            results[i], _ = validate_reply(raws[i], model, complete_fn=complete_fn, system=system)
+        except (ValidationError, ValueError) as e:
+            logger.debug(f"{model.__name__} item {i} is invalid: {e}")
+    return results
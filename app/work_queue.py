@@ -0,0 +1,568 @@
+"""
+Crash-safe work queue on a shared directory, for running the pipeline in many
+worker processes or on several machines that share a volume.
+
+    <queue>/pending/<item>.json      waiting to be claimed
+    <queue>/claimed/<item>.json      being processed (lease = file modification time)
+    <queue>/done/<item>.json         finished, with per-candidate outcome
+    <queue>/failed/<item>.json       gave up after max_attempts
+    <queue>/checkpoints/<stem>.json  stages already finished for one CV (with their hashes)
+
+An item holds one CV (or a batch of CVs). A worker claims an item by renaming
+it from pending/ to claimed/ (atomic on a POSIX file system, so exactly one
+worker wins) and keeps touching the claimed file while it works. Claims whose
+file was not touched for lease_seconds belong to a dead worker and are moved
+back to pending/ by any worker or by the coordinator. Each CV goes through
+PDF -> txt -> CandidateCV -> JobMatchResults; every output file is written to
+a temporary name and renamed, and the stage is then checkpointed, so a
+re-claimed item resumes after its last finished stage and done items are
+never processed again. The CVs of a batch item that failed go back to the
+queue as a new item. Workers do not share the pipeline manifest; the
+coordinator records the finished CVs in it (and in the match store) with
+sync_manifest() once the workers are done.
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.batch_matching import match_candidate_batch
+from app.knowledge import job_content_hashes, job_set_hash, load_job_descriptions
+from app.logging_config import get_logger
+from app.manifest import DEFAULT_MANIFEST_PATH, PipelineManifest, PipelinePlan, hash_file
+from app.match_store import MatchStore
+from app.model import CandidateCV, JobMatchResult
+from app.pdf_extraction import ExtractionResult, extract_pdf_to_file, list_pdf_files, record_extraction
+from app.telemetry import span
+
+logger = get_logger(__name__)
+
+DEFAULT_QUEUE_DIR = os.path.join(".cache", "work-queue")
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+STATES = ("pending", "claimed", "done", "failed")
+
+ExtractFn = Callable[[str, str], ExtractionResult]
+AnalyzeFn = Callable[[str, str], CandidateCV]
+BatchMatchFn = Callable[[CandidateCV, List[Dict[str, Any]]], List[JobMatchResult]]
+
+
+def worker_id() -> str:
+    """Identify this worker process across machines: host, pid and a random suffix."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+
+
+def _write_atomic(path: str, data: str) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _touched_at(path: str) -> float:
+    """Last claim or heartbeat time (rename updates ctime, heartbeats update mtime)."""
+    st = os.stat(path)
+    return max(st.st_mtime, st.st_ctime)
+
+
+class WorkItem(BaseModel):
+    """One unit of queued work"""
+    id: str
+    stems: List[str] = Field(..., description="PDF file stems in this item")
+    attempts: int = 0
+    worker: Optional[str] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class QueueStatus(BaseModel):
+    """Progress of a queue, as reported by the coordinator"""
+    pending: int = 0
+    claimed: int = 0
+    done: int = 0
+    failed: int = 0
+    expired_claims: int = 0
+    candidates_done: int = 0
+    candidates_failed: int = 0
+    workers: Dict[str, int] = Field(default_factory=dict, description="Items finished per worker")
+    items_per_minute: float = Field(0.0, description="Finish rate over the last window")
+    eta_seconds: Optional[float] = None
+
+
+class WorkQueue:
+    """
+    Directory-based work queue with atomic-rename claims and time-based leases.
+
+    Args:
+        root: Queue directory, shared by every worker
+        lease_seconds: A claim not renewed for this long is considered abandoned
+        max_attempts: Claims per item before it is moved to failed/
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_QUEUE_DIR,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.root = root
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for state in STATES + ("checkpoints",):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    def _path(self, state: str, item_id: str) -> str:
+        return os.path.join(self.root, state, f"{item_id}.json")
+
+    def _ids(self, state: str) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(os.path.join(self.root, state)) if name.endswith(".json"))
+
+    def count(self, state: str) -> int:
+        return len(self._ids(state))
+
+    def enqueue(self, stems: List[str], batch_size: int = 1) -> int:
+        """
+        Add CVs (PDF file stems) that are not already queued, running or done.
+
+        Returns:
+            Number of items added
+        """
+        known = set()
+        for state in STATES:
+            for item_id in self._ids(state):
+                item = _read_json(self._path(state, item_id))
+                known.update(item.get("stems", []) if item else [])
+        todo = [stem for stem in stems if stem not in known]
+        added = 0
+        for start in range(0, len(todo), max(1, batch_size)):
+            batch = todo[start:start + max(1, batch_size)]
+            item_id = batch[0] if batch_size <= 1 else f"batch-{uuid.uuid4().hex[:8]}-{batch[0]}"
+            _write_atomic(self._path("pending", item_id), WorkItem(id=item_id, stems=batch).model_dump_json())
+            added += 1
+        logger.info(f"Queued {len(todo)} CV(s) in {added} item(s) ({len(stems) - len(todo)} already known)")
+        return added
+
+    def claim(self, worker: str) -> Optional[WorkItem]:
+        """Claim one pending item (None when nothing is pending)."""
+        pending = self._ids("pending")
+        # start at a random position so concurrent workers rarely race for the same file
+        offset = random.randrange(len(pending)) if pending else 0
+        for item_id in pending[offset:] + pending[:offset]:
+            claimed_path = self._path("claimed", item_id)
+            try:
+                os.rename(self._path("pending", item_id), claimed_path)
+            except FileNotFoundError:
+                continue  # another worker won
+            os.utime(claimed_path)
+            if os.path.exists(self._path("done", item_id)):
+                os.remove(claimed_path)  # finished by a worker whose lease had expired
+                continue
+            data = _read_json(claimed_path)
+            if data is None:
+                logger.warning(f"Dropping unreadable queue item {item_id}")
+                os.replace(claimed_path, self._path("failed", item_id))
+                continue
+            item = WorkItem(**data)
+            item.attempts += 1
+            item.worker = worker
+            # persist the attempt so an item that keeps killing its worker ends up in failed/
+            _write_atomic(claimed_path, item.model_dump_json())
+            return item
+        return None
+
+    def _owns(self, item: WorkItem) -> bool:
+        """True while claimed/ holds this claim of item (not a later claim by another worker)."""
+        data = _read_json(self._path("claimed", item.id))
+        return data is not None and data.get("worker") == item.worker and data.get("attempts") == item.attempts
+
+    def renew(self, item: WorkItem) -> bool:
+        """Extend the lease of a claimed item; False if the claim was lost."""
+        if not self._owns(item):
+            return False
+        try:
+            os.utime(self._path("claimed", item.id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, item: WorkItem, outcomes: Dict[str, str], seconds: float) -> None:
+        """Record a finished item (its stems are the CVs it finished) and release its claim."""
+        record = {**item.model_dump(), "outcomes": outcomes, "seconds": round(seconds, 3), "finished_at": time.time()}
+        _write_atomic(self._path("done", item.id), json.dumps(record))
+        if not self._owns(item):
+            logger.warning(
+                f"Lease of {item.id} expired before it finished; it was completed anyway, leaving the claim to its new owner"
+            )
+            return
+        try:
+            os.remove(self._path("claimed", item.id))
+        except FileNotFoundError:
+            pass
+
+    def release(self, item: WorkItem, error: str) -> None:
+        """Give a failed item back to the queue, or move it to failed/ after max_attempts."""
+        # check the claim while item still names its claimant
+        if not self.renew(item):
+            logger.warning(f"Lost the claim on {item.id}, leaving it to its new owner")
+            return
+        item.errors.append(f"{item.worker}: {error}")
+        state = "failed" if item.attempts >= self.max_attempts else "pending"
+        item.worker = None if state == "pending" else item.worker
+        claimed_path = self._path("claimed", item.id)
+        # rewrite in place, then move: the rename is what publishes it
+        _write_atomic(claimed_path, item.model_dump_json())
+        os.replace(claimed_path, self._path(state, item.id))
+        logger.warning(f"Item {item.id} attempt {item.attempts} failed ({error}); moved to {state}/")
+
+    def retry(self, item: WorkItem, stems: List[str], error: str) -> WorkItem:
+        """
+        Queue the CVs of a claimed batch item that failed as a new item, keeping its attempts.
+
+        The new item goes to failed/ instead when the batch used up max_attempts.
+        """
+        retry = WorkItem(
+            id=f"retry-{uuid.uuid4().hex[:8]}-{stems[0]}",
+            stems=stems,
+            attempts=item.attempts,
+            errors=item.errors + [f"{item.worker}: {error}"],
+        )
+        state = "failed" if retry.attempts >= self.max_attempts else "pending"
+        _write_atomic(self._path(state, retry.id), retry.model_dump_json())
+        logger.warning(f"{len(stems)} CV(s) of {item.id} failed ({error}); moved to {state}/{retry.id}")
+        return retry
+
+    def done_stems(self) -> List[str]:
+        """CVs finished by some item in done/."""
+        stems = set()
+        for item_id in self._ids("done"):
+            record = _read_json(self._path("done", item_id)) or {}
+            stems.update(stem for stem, outcome in record.get("outcomes", {}).items() if outcome == "matched")
+        return sorted(stems)
+
+    def requeue_expired(self) -> int:
+        """Move claims whose lease expired back to pending/ (or failed/). Returns how many were moved."""
+        moved = 0
+        now = time.time()
+        for item_id in self._ids("claimed"):
+            claimed_path = self._path("claimed", item_id)
+            try:
+                if now - _touched_at(claimed_path) < self.lease_seconds:
+                    continue
+                data = _read_json(claimed_path) or {}
+                state = "failed" if data.get("attempts", 0) >= self.max_attempts else "pending"
+                os.rename(claimed_path, self._path(state, item_id))
+            except FileNotFoundError:
+                continue  # finished or requeued meanwhile
+            logger.warning(f"Lease of {item_id} expired (worker {data.get('worker')}); moved to {state}/")
+            moved += 1
+        return moved
+
+    def checkpoint(self, stem: str) -> Dict[str, Any]:
+        return _read_json(os.path.join(self.root, "checkpoints", f"{stem}.json")) or {}
+
+    def save_checkpoint(self, stem: str, stages: Dict[str, Any]) -> None:
+        _write_atomic(os.path.join(self.root, "checkpoints", f"{stem}.json"), json.dumps(stages))
+
+    def status(self, window_seconds: float = 300.0) -> QueueStatus:
+        """Count items per state and estimate throughput and time to completion."""
+        status = QueueStatus(**{state: self.count(state) for state in STATES})
+        now = time.time()
+        for item_id in self._ids("claimed"):
+            try:
+                if now - _touched_at(self._path("claimed", item_id)) >= self.lease_seconds:
+                    status.expired_claims += 1
+            except FileNotFoundError:
+                pass
+        recent = 0
+        for item_id in self._ids("done"):
+            record = _read_json(self._path("done", item_id)) or {}
+            worker = record.get("worker") or "?"
+            status.workers[worker] = status.workers.get(worker, 0) + 1
+            outcomes = record.get("outcomes", {}).values()
+            status.candidates_done += sum(1 for outcome in outcomes if outcome == "matched")
+            if now - record.get("finished_at", 0) <= window_seconds:
+                recent += 1
+        for item_id in self._ids("failed"):
+            status.candidates_failed += len((_read_json(self._path("failed", item_id)) or {}).get("stems", []))
+        status.items_per_minute = round(recent * 60.0 / window_seconds, 2)
+        remaining = status.pending + status.claimed
+        if recent and remaining:
+            status.eta_seconds = round(remaining * window_seconds / recent, 1)
+        return status
+
+
+class QueueWorker:
+    """
+    Claims items from a WorkQueue and runs each CV through extraction, analysis and matching.
+
+    Args:
+        queue: The shared queue
+        inputs: The crew inputs (pdf_files_path, txt_files_path, json_files_path, matches_output_path)
+        knowledge_dir: Folder holding the job description JSON files
+        extract_fn / analyze_fn / match_fn: Stage functions (defaults call PyPDF2 and the LLM)
+        idle_exit: Stop once nothing is pending and no other claim is running
+        poll_seconds: Wait between claims when only other workers' items are left
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        inputs: Dict[str, str],
+        knowledge_dir: str = "knowledge",
+        extract_fn: ExtractFn = extract_pdf_to_file,
+        analyze_fn: Optional[AnalyzeFn] = None,
+        match_fn: BatchMatchFn = match_candidate_batch,
+        idle_exit: bool = True,
+        poll_seconds: float = 5.0,
+    ):
+        if analyze_fn is None:
+            from app.streaming import analyze_cv_text as analyze_fn
+        self.queue = queue
+        self.inputs = inputs
+        self.jobs = load_job_descriptions(knowledge_dir)
+        self.jd_set_hash = job_set_hash(job_content_hashes(self.jobs))
+        self.extract_fn = extract_fn
+        self.analyze_fn = analyze_fn
+        self.match_fn = match_fn
+        self.idle_exit = idle_exit
+        self.poll_seconds = poll_seconds
+        self.worker = worker_id()
+        self.processed = 0
+
+    def _paths(self, stem: str) -> Dict[str, str]:
+        return {
+            "pdf": os.path.join(self.inputs["pdf_files_path"], f"{stem}.pdf"),
+            "txt": os.path.join(self.inputs["txt_files_path"], f"{stem}.txt"),
+            "json": os.path.join(self.inputs["json_files_path"], f"{stem}.json"),
+            "match": os.path.join(self.inputs["matches_output_path"], f"{stem}.json"),
+        }
+
+    def _done(self, checkpoint: Dict[str, Any], stage: str, path: str) -> bool:
+        return stage in checkpoint and checkpoint[stage] == hash_file(path)
+
+    def process(self, stem: str) -> None:
+        """Run one CV through the stages its checkpoint does not cover yet."""
+        paths = self._paths(stem)
+        checkpoint = self.queue.checkpoint(stem)
+        for key in ("txt_files_path", "json_files_path", "matches_output_path"):
+            os.makedirs(self.inputs[key], exist_ok=True)
+
+        if not self._done(checkpoint, "txt", paths["txt"]):
+            result = self.extract_fn(paths["pdf"], self.inputs["txt_files_path"])
+            record_extraction(result)
+            if result.status != "success":
+                raise RuntimeError(f"extract failed: {result.error}")
+            checkpoint = {"pdf": hash_file(paths["pdf"]), "txt": hash_file(paths["txt"])}
+            self.queue.save_checkpoint(stem, checkpoint)
+
+        if not self._done(checkpoint, "json", paths["json"]):
+            with span("analyze", cv=stem) as s:
+                with open(paths["txt"], "r", encoding="utf-8") as f:
+                    cv_text = f.read()
+                s.set(chars=len(cv_text))
+                cv = self.analyze_fn(cv_text, f"{stem}.pdf")
+                _write_atomic(paths["json"], cv.model_dump_json(indent=2))
+            checkpoint = {"pdf": checkpoint.get("pdf"), "txt": checkpoint["txt"], "json": hash_file(paths["json"])}
+            self.queue.save_checkpoint(stem, checkpoint)
+        else:
+            with open(paths["json"], "r", encoding="utf-8") as f:
+                cv = CandidateCV.model_validate_json(f.read())
+
+        if not self._done(checkpoint, "match", paths["match"]) or checkpoint.get("jd_set") != self.jd_set_hash:
+            with span("match", cv=stem, jobs=len(self.jobs)):
+                results = sorted(self.match_fn(cv, self.jobs), key=lambda r: r.overall_score, reverse=True)
+                _write_atomic(
+                    paths["match"],
+                    json.dumps([r.model_dump(mode="json") for r in results], indent=2, ensure_ascii=False),
+                )
+            checkpoint.update(match=hash_file(paths["match"]), jd_set=self.jd_set_hash)
+            self.queue.save_checkpoint(stem, checkpoint)
+
+    def _heartbeat(self, item: WorkItem, stop: threading.Event) -> None:
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(item):
+                logger.warning(f"Lost the claim on {item.id}")
+                return
+
+    def run_item(self, item: WorkItem) -> None:
+        """Process a claimed item, renewing its lease until it is completed or released."""
+        started = time.perf_counter()
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(item, stop), daemon=True)
+        heartbeat.start()
+        outcomes: Dict[str, str] = {}
+        try:
+            for stem in item.stems:
+                try:
+                    self.process(stem)
+                    outcomes[stem] = "matched"
+                except Exception as e:
+                    outcomes[stem] = f"failed: {e}"
+                    logger.warning(f"{stem}: {e}")
+        finally:
+            stop.set()
+            heartbeat.join()
+        failed = [stem for stem, outcome in outcomes.items() if outcome != "matched"]
+        if len(failed) == len(outcomes):
+            self.queue.release(item, "; ".join(outcomes.values()))
+            return
+        if failed:
+            # only the finished CVs go to done/; the others are retried as an item of their own
+            self.queue.retry(item, failed, "; ".join(f"{stem}: {outcomes[stem]}" for stem in failed))
+        finished = [stem for stem in item.stems if stem not in failed]
+        self.queue.complete(
+            item.model_copy(update={"stems": finished}),
+            {stem: outcomes[stem] for stem in finished},
+            time.perf_counter() - started,
+        )
+        self.processed += 1
+        logger.info(f"{self.worker} finished {item.id} in {time.perf_counter() - started:.2f}s")
+
+    def run(self) -> int:
+        """
+        Process items until the queue is drained (or forever when idle_exit is False).
+
+        Returns:
+            Number of items this worker completed
+        """
+        logger.info(f"Worker {self.worker} started on {self.queue.root}")
+        while True:
+            item = self.queue.claim(self.worker)
+            if item is not None:
+                self.run_item(item)
+                continue
+            if self.queue.requeue_expired():
+                continue
+            if self.idle_exit and not self.queue.count("claimed"):
+                break
+            time.sleep(self.poll_seconds)
+        logger.info(f"Worker {self.worker} done: {self.processed} item(s)")
+        return self.processed
+
+
+def sync_manifest(
+    queue: WorkQueue,
+    inputs: Dict[str, str],
+    knowledge_dir: str = "knowledge",
+    manifest_path: str = DEFAULT_MANIFEST_PATH,
+    match_store: Optional[MatchStore] = None,
+) -> PipelinePlan:
+    """
+    Record the CVs finished by the queue workers in the pipeline manifest and the match store.
+
+    A stage is recorded only while its checkpointed hash still matches the file
+    on disk (and, for matches, the current JD set), so outputs changed since the
+    worker wrote them are left for the next run. CVs already recorded with the
+    same matches are skipped, so calling this again is cheap.
+
+    Returns:
+        The stems recorded per stage
+    """
+    manifest = PipelineManifest.load(manifest_path)
+    job_hashes = job_content_hashes(load_job_descriptions(knowledge_dir))
+    recorded = PipelinePlan(jd_set_hash=job_set_hash(job_hashes), job_hashes=job_hashes)
+    for stem in queue.done_stems():
+        checkpoint = queue.checkpoint(stem)
+        paths = {
+            "pdf": os.path.join(inputs["pdf_files_path"], f"{stem}.pdf"),
+            "txt": os.path.join(inputs["txt_files_path"], f"{stem}.txt"),
+            "json": os.path.join(inputs["json_files_path"], f"{stem}.json"),
+            "match": os.path.join(inputs["matches_output_path"], f"{stem}.json"),
+        }
+        current = {stage: hash_file(path) for stage, path in paths.items()}
+        entry = manifest.entries.get(stem)
+        if entry is not None and entry.match_hash == current["match"] and entry.match_source == (
+            f"{current['json']}:{recorded.jd_set_hash}"
+        ):
+            continue
+        if current["pdf"] is None or any(checkpoint.get(stage) != current[stage] for stage in ("pdf", "txt")):
+            continue
+        recorded.extract.append(stem)
+        if checkpoint.get("json") == current["json"]:
+            recorded.analyze.append(stem)
+            if checkpoint.get("match") == current["match"] and checkpoint.get("jd_set") == recorded.jd_set_hash:
+                recorded.match.append(stem)
+
+    if not recorded.extract:
+        return recorded
+    manifest.record(inputs, recorded, recorded, update_jobs=bool(recorded.match))
+    manifest.save()
+    if match_store is not None and recorded.match:
+        match_store.import_results_dir(inputs["matches_output_path"], candidate_ids=recorded.match)
+    logger.info(
+        f"Recorded {len(recorded.extract)} queued CV(s) in {manifest_path} ({len(recorded.match)} with matches)"
+    )
+    return recorded
+
+
+def _worker_process(root: str, inputs: Dict[str, str], knowledge_dir: str, lease_seconds: float) -> int:
+    from app.logging_config import setup_logging
+    from app.telemetry import finish_run
+
+    setup_logging()
+    processed = QueueWorker(WorkQueue(root, lease_seconds=lease_seconds), inputs, knowledge_dir).run()
+    finish_run()
+    return processed
+
+
+if __name__ == "__main__":
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor
+
+    from app.logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="Shared-directory work queue for the CV pipeline.")
+    parser.add_argument("command", choices=["enqueue", "worker", "status", "requeue", "sync"])
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_DIR, help="Queue directory (shared by all workers)")
+    parser.add_argument("--pdf-dir", default="CV")
+    parser.add_argument("--txt-dir", default="preprocessed-CVs")
+    parser.add_argument("--json-dir", default="processed-CVs")
+    parser.add_argument("--matches-dir", default="job-matches-results")
+    parser.add_argument("--knowledge-dir", default="knowledge")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH, help="Pipeline manifest (worker, sync)")
+    parser.add_argument("--batch-size", type=int, default=1, help="CVs per queue item (enqueue)")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this machine")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="Lease length, seconds")
+    args = parser.parse_args()
+
+    setup_logging()
+    queue = WorkQueue(args.queue, lease_seconds=args.lease)
+    inputs = {
+        "pdf_files_path": args.pdf_dir,
+        "txt_files_path": args.txt_dir,
+        "json_files_path": args.json_dir,
+        "matches_output_path": args.matches_dir,
+    }
+    if args.command == "enqueue":
+        stems = [os.path.splitext(os.path.basename(path))[0] for path in list_pdf_files(args.pdf_dir)]
+        queue.enqueue(stems, batch_size=args.batch_size)
+    elif args.command == "worker":
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            futures = [
+                pool.submit(_worker_process, args.queue, inputs, args.knowledge_dir, args.lease)
+                for _ in range(args.processes)
+            ]
+            logger.info(f"Workers finished {sum(f.result() for f in futures)} item(s)")
+        sync_manifest(queue, inputs, args.knowledge_dir, args.manifest, MatchStore.from_env())
+    elif args.command == "sync":
+        sync_manifest(queue, inputs, args.knowledge_dir, args.manifest, MatchStore.from_env())
+    elif args.command == "requeue":
+        print(json.dumps({"requeued": queue.requeue_expired()}))
+    else:
+        print(queue.status().model_dump_json(indent=2))
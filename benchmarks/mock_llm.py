@@ -0,0 +1,89 @@
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from app.dispatcher import estimate_tokens
+from app.stub_llm import sample_reply
+
+_CV_TEXT_MARKER = "--- CV TEXT ---"
+
+
+def corrupt_candidate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the kind of mistakes models make to a CandidateCV(-subset) reply (in place).
+
+    A URL without a scheme, a link that is not a URL, a GPA written as "3.6/4.0",
+    enum values in the wrong case, a month-only date, an out-of-range score and
+    an education entry without an institution. Only fields present are touched.
+    """
+    contact = data.get("contact_information")
+    if isinstance(contact, dict):
+        contact["linkedin"] = "linkedin.com/in/candidate"
+        contact["other_links"] = ["https://portfolio.example.com", "see portfolio on request"]
+    for entry in data.get("work_experience") or []:
+        entry.update(employment_type="Full-Time", start_date="2019-03")
+    education = data.get("education")
+    if isinstance(education, list):
+        for entry in education:
+            entry.update(gpa="3.6/4.0", level=str(entry.get("level") or "bachelor").title())
+        education.append({"degree": "Professional Diploma"})
+    if isinstance(data.get("cv_analysis"), dict):
+        data["cv_analysis"]["job_hopping_score"] = 12.5
+    if isinstance(data.get("agent_assessment"), dict):
+        data["agent_assessment"]["rating_score"] = 101
+    return data
+
+
+class MockLLM:
+    """
+    In-process stand-in for app.llm.complete returning fixed, schema-valid replies.
+
+    Use `mock.complete` anywhere a `complete_fn` is accepted. Replies come from the
+    stub LLM server's fixtures, so they exercise the same parsing and validation
+    as real model output. With invalid_rate, that share of the analyzer replies
+    is corrupted (see corrupt_candidate) to exercise the validation / repair path.
+    """
+
+    def __init__(self, latency: float = 0.0, invalid_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.invalid_rate = invalid_rate
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.invalid_replies = 0
+        self.repair_calls = 0
+        self.repair_tokens = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: Any, response_model: Optional[Type[BaseModel]] = None, **kwargs) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        text = prompt if isinstance(prompt, str) else "\n".join(str(m.get("content") or "") for m in prompt)
+        reply = sample_reply(
+            response_model.__name__ if response_model else None,
+            text,
+            list(response_model.model_fields) if response_model else None,
+        )
+        analyzer = bool(response_model) and response_model.__name__.startswith("CandidateCV")
+        # analyzer prompts carry the CV text; the validation layer's repair prompts do not
+        repair = analyzer and _CV_TEXT_MARKER not in text
+        corrupt = False
+        if self.invalid_rate and analyzer and not repair:
+            with self._lock:
+                corrupt = self._random.random() < self.invalid_rate
+        if corrupt:
+            reply = json.dumps(corrupt_candidate(json.loads(reply)))
+        with self._lock:
+            self.calls += 1
+            self.invalid_replies += corrupt
+            if repair:
+                self.repair_calls += 1
+                self.repair_tokens += estimate_tokens(text) + estimate_tokens(reply)
+            self.prompt_tokens += estimate_tokens(text)
+            self.completion_tokens += estimate_tokens(reply)
+        return reply
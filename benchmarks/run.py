@@ -0,0 +1,286 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence
+
+from app.batch_matching import match_candidate_batch
+from app.compaction import compact_cv_text
+from app.knowledge import load_job_descriptions
+from app.logging_config import get_logger, setup_logging
+from app.model import CandidateCV
+from app.pdf_extraction import batch_extract
+from app.pre_extract import analyze_with_pre_extraction, pre_extract
+from app.prompts import ANALYZER_SYSTEM, analysis_prompt
+from app.validation import type_adapter, validate_many, validate_reply
+from benchmarks.mock_llm import MockLLM, corrupt_candidate
+from benchmarks.synthetic import generate_cv_corpus, generate_job_descriptions
+
+logger = get_logger(__name__)
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_OUTPUT = "bench-results.json"
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def stage_report(items: int, seconds: float, latencies: List[float], unit: str) -> Dict[str, Any]:
+    """Throughput and latency summary for one stage."""
+    return {
+        "items": items,
+        "seconds": round(seconds, 4),
+        f"{unit}_per_second": round(items / seconds, 2) if seconds else 0.0,
+        "p50_latency_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_latency_ms": round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its (reaped) children, in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB on Linux
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def _timed_map(fn: Callable[[Any], Any], items: Sequence[Any], concurrency: int) -> List[float]:
+    def timed(item):
+        started = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - started
+
+    if concurrency <= 1:
+        return [timed(item) for item in items]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, items))
+
+
+def bench_validation(replies: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Validation throughput for CandidateCV replies: one by one, as one batch,
+    and with invalid values isolated (each reply corrupted, no repair calls).
+    Each is timed `repeat` times and the fastest run reported.
+    """
+    def rate(fn: Callable[[], Any]) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return round(len(replies) / min(timings), 2) if replies and min(timings) else 0.0
+
+    if replies:
+        # the adapter is built and warmed once per process, as in the pipeline
+        type_adapter(List[CandidateCV]).validate_json(f"[{replies[0]}]")
+    corrupted = [json.dumps(corrupt_candidate(json.loads(reply))) for reply in replies]
+    return {
+        "items": len(replies),
+        "per_item_replies_per_second": rate(lambda: [CandidateCV.model_validate_json(reply) for reply in replies]),
+        "batched_replies_per_second": rate(lambda: validate_many(replies, CandidateCV)),
+        "isolated_replies_per_second": rate(lambda: [validate_reply(reply, CandidateCV) for reply in corrupted]),
+    }
+
+
+def prepare_corpus(workdir: str, size: int, jobs: int, seed: int) -> Dict[str, str]:
+    """Generate (or reuse) the synthetic CVs and JDs for one corpus size."""
+    root = os.path.join(workdir, f"corpus-{size}")
+    pdf_dir = os.path.join(root, "CV")
+    knowledge_dir = os.path.join(root, "knowledge")
+    if not os.path.isdir(pdf_dir) or len(os.listdir(pdf_dir)) != size:
+        logger.info(f"Generating {size} synthetic CVs in {pdf_dir}")
+        generate_cv_corpus(pdf_dir, size, seed=seed)
+    if not os.path.isdir(knowledge_dir) or len(os.listdir(knowledge_dir)) != jobs:
+        generate_job_descriptions(knowledge_dir, jobs, seed=seed)
+    return {
+        "pdf_files_path": pdf_dir,
+        "knowledge_dir": knowledge_dir,
+        "txt_files_path": os.path.join(root, "preprocessed-CVs"),
+        "json_files_path": os.path.join(root, "processed-CVs"),
+        "matches_output_path": os.path.join(root, "job-matches-results"),
+    }
+
+
+def bench_size(size: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run extraction, analysis and matching over a corpus of `size` CVs and report each stage."""
+    paths = prepare_corpus(options["workdir"], size, options["jobs"], options["seed"])
+    mock = MockLLM(latency=options["llm_latency"], invalid_rate=options.get("invalid_rate", 0.0), seed=options["seed"])
+    concurrency = options["concurrency"]
+    report: Dict[str, Any] = {"size": size, "jobs": options["jobs"], "stages": {}}
+
+    # Stage 1: PDF -> txt
+    summary = batch_extract(paths["pdf_files_path"], paths["txt_files_path"], max_workers=options["workers"])
+    report["stages"]["extract"] = stage_report(
+        summary.succeeded, summary.seconds, [r.seconds for r in summary.results], "pdfs"
+    )
+    report["stages"]["extract"]["failed"] = summary.failed
+    report["stages"]["extract"]["pages"] = sum(r.pages for r in summary.results)
+
+    # Stage 2: txt -> CandidateCV (mocked model)
+    os.makedirs(paths["json_files_path"], exist_ok=True)
+    txt_files = sorted(r.output_path for r in summary.results if r.output_path)
+    candidates: Dict[str, CandidateCV] = {}
+    prefilled: List[int] = []
+    cv_tokens: List[tuple] = []
+
+    def analyze(txt_path: str) -> None:
+        stem = os.path.splitext(os.path.basename(txt_path))[0]
+        with open(txt_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if options.get("token_budget") is not None:
+            compacted = compact_cv_text(text, options["token_budget"])
+            cv_tokens.append((compacted.tokens_before, compacted.tokens_after))
+            text = compacted.text
+        if options.get("pre_extract"):
+            prefilled.append(len(pre_extract(text, f"{stem}.pdf").filled()))
+            cv = analyze_with_pre_extraction(text, f"{stem}.pdf", complete_fn=mock.complete)
+        else:
+            raw = mock.complete(analysis_prompt(text, f"{stem}.pdf"), CandidateCV, system=ANALYZER_SYSTEM)
+            cv, _ = validate_reply(raw, CandidateCV, complete_fn=mock.complete, system=ANALYZER_SYSTEM)
+        with open(os.path.join(paths["json_files_path"], f"{stem}.json"), "w", encoding="utf-8") as f:
+            f.write(cv.model_dump_json())
+        candidates[stem] = cv
+
+    started = time.perf_counter()
+    latencies = _timed_map(analyze, txt_files, concurrency)
+    report["stages"]["analyze"] = stage_report(len(txt_files), time.perf_counter() - started, latencies, "cvs")
+    report["stages"]["analyze"]["prompt_tokens_est"] = mock.prompt_tokens
+    report["stages"]["analyze"]["completion_tokens_est"] = mock.completion_tokens
+    if cv_tokens:
+        report["stages"]["analyze"]["cv_tokens_before"] = sum(before for before, _ in cv_tokens)
+        report["stages"]["analyze"]["cv_tokens_after"] = sum(after for _, after in cv_tokens)
+    if prefilled:
+        report["stages"]["analyze"]["prefilled_fields_avg"] = round(sum(prefilled) / len(prefilled), 2)
+    # invalid replies are repaired field by field, never re-analyzed in full
+    report["stages"]["analyze"]["invalid_replies"] = mock.invalid_replies
+    report["stages"]["analyze"]["repair_calls"] = mock.repair_calls
+    report["stages"]["analyze"]["repair_tokens_est"] = mock.repair_tokens
+
+    report["stages"]["validate"] = bench_validation([candidates[stem].model_dump_json() for stem in sorted(candidates)])
+
+    # Stage 3: CandidateCV -> JobMatchResults (one batched mocked call per candidate)
+    jobs = load_job_descriptions(paths["knowledge_dir"])
+    os.makedirs(paths["matches_output_path"], exist_ok=True)
+
+    def match(stem: str) -> None:
+        results = match_candidate_batch(candidates[stem], jobs, complete_fn=mock.complete)
+        with open(os.path.join(paths["matches_output_path"], f"{stem}.json"), "w", encoding="utf-8") as f:
+            json.dump([r.model_dump(mode="json") for r in results], f)
+
+    started = time.perf_counter()
+    latencies = _timed_map(match, sorted(candidates), concurrency)
+    seconds = time.perf_counter() - started
+    report["stages"]["match"] = stage_report(len(candidates) * len(jobs), seconds, latencies, "matches")
+    report["stages"]["match"]["p50_latency_ms_per_candidate"] = report["stages"]["match"].pop("p50_latency_ms")
+    report["stages"]["match"]["p95_latency_ms_per_candidate"] = report["stages"]["match"].pop("p95_latency_ms")
+
+    report["llm"] = {
+        "calls": mock.calls,
+        "prompt_tokens_est": mock.prompt_tokens,
+        "completion_tokens_est": mock.completion_tokens,
+    }
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def _bench_child(size: int, options: Dict[str, Any], results) -> None:
+    setup_logging()
+    results.put(bench_size(size, options))
+
+
+def _child_report(process, results, poll_seconds: float = 1.0) -> Dict[str, Any]:
+    """Wait for a benchmark child's report; raise if the child dies without sending one."""
+    while True:
+        try:
+            return results.get(timeout=poll_seconds)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+        # the child exited: its report may still be in flight through the queue's pipe
+        try:
+            return results.get(timeout=poll_seconds)
+        except queue.Empty:
+            raise RuntimeError(f"Benchmark process exited with code {process.exitcode} without a report") from None
+
+
+def run_benchmarks(sizes: Sequence[int], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Benchmark each size in a fresh process (so peak RSS is per size) and collect the reports."""
+    context = multiprocessing.get_context("spawn")
+    reports = []
+    for size in sizes:
+        queue = context.Queue()
+        process = context.Process(target=_bench_child, args=(size, options, queue))
+        process.start()
+        report = _child_report(process, queue)
+        process.join()
+        logger.info(f"Benchmark size {size}: {json.dumps(report['stages'])}")
+        reports.append(report)
+    return {"meta": run_metadata(options), "results": reports}
+
+
+def run_metadata(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe the environment a benchmark ran in."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": options,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on a synthetic corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (number of CVs)")
+    parser.add_argument("--jobs", type=int, default=5, help="Number of synthetic job descriptions")
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent mocked LLM calls")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Mocked LLM latency per call, seconds")
+    parser.add_argument("--pre-extract", action="store_true", help="Pre-fill CV fields with rules before the analyzer")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Compact CV text to this many tokens before the analyzer (0: compact without trimming)")
+    parser.add_argument("--invalid-rate", type=float, default=0.0,
+                        help="Share of analyzer replies given invalid values, to exercise validation / repair")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=os.path.join(".cache", "bench"), help="Where corpora are generated")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Machine-readable results file (JSON)")
+    args = parser.parse_args()
+
+    setup_logging()
+    results = run_benchmarks(args.sizes, {
+        "jobs": args.jobs,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "llm_latency": args.llm_latency,
+        "pre_extract": args.pre_extract,
+        "token_budget": args.token_budget,
+        "invalid_rate": args.invalid_rate,
+        "seed": args.seed,
+        "workdir": args.workdir,
+    })
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Benchmark results written to {args.output}")
@@ -0,0 +1,189 @@
+import json
+import os
+import random
+from typing import List, Optional, Sequence
+
+FIRST_NAMES = ["Aisha", "Omar", "Fatma", "Said", "Maryam", "Khalid", "Noor", "Hamed", "Layla", "Yusuf", "Sara", "Ali"]
+LAST_NAMES = ["Al Balushi", "Al Harthy", "Al Rashdi", "Al Zadjali", "Al Hinai", "Smith", "Khan", "Garcia", "Chen"]
+COMPANIES = ["Muscat Tech", "Gulf Data", "Oman Telecom", "Desert Cloud", "Harbor Analytics", "Falcon Systems"]
+POSITIONS = ["Software Engineer", "Data Analyst", "DevOps Engineer", "Project Manager", "ML Engineer", "Backend Developer"]
+DEGREES = ["BSc Computer Science", "MSc Data Science", "Bachelor of Engineering", "Diploma in IT", "PhD Computer Science"]
+SKILLS = [
+    "Python", "Django", "REST APIs", "PostgreSQL", "Git", "Docker", "AWS", "Celery", "Redis", "CI/CD", "SQL",
+    "Excel", "Power BI", "Tableau", "Kubernetes", "Terraform", "Linux", "Jenkins", "PyTorch", "TensorFlow",
+    "Scrum", "Jira", "MS Project", "Risk Management", "LangChain", "Pandas", "FastAPI", "GraphQL",
+]
+FILLER = (
+    "Delivered features across the stack, collaborated with cross-functional teams, improved reliability "
+    "and performance, mentored junior engineers and documented designs and runbooks."
+)
+
+LINES_PER_PAGE = 48
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: Sequence[Sequence[str]], links: Sequence[Sequence[str]] = ()) -> None:
+    """
+    Write a minimal text PDF (Helvetica, one text block per page).
+
+    Args:
+        path: Output file path
+        pages: Lines of text for each page
+        links: Per page, URIs added as link annotations (may be shorter than pages)
+    """
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_parts = []
+    for page_no, lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(f"({_pdf_string(line)}) Tj T*" for line in lines) + " ET"
+        data = stream.encode("latin-1", "replace")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        page_links = links[page_no] if page_no < len(links) else []
+        annot_ids = [
+            add(f"<< /Type /Annot /Subtype /Link /Rect [50 {40 + 12 * i} 250 {50 + 12 * i}] "
+                f"/Border [0 0 0] /A << /S /URI /URI ({_pdf_string(uri)}) >> >>".encode("latin-1", "replace"))
+            for i, uri in enumerate(page_links)
+        ]
+        page_parts.append((content_id, annot_ids))
+
+    pages_id = len(objects) + len(page_parts) + 1
+    kids = []
+    for content_id, annot_ids in page_parts:
+        annots = f" /Annots [{' '.join(f'{i} 0 R' for i in annot_ids)}]" if annot_ids else ""
+        kids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >>{annots} >>".encode("ascii")
+        ))
+    add(f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode("ascii"))
+    catalog_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("ascii"))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def cv_lines(rng: random.Random, name: str, pages: int) -> List[List[str]]:
+    """Text lines of a synthetic CV spread over `pages` pages."""
+    handle = name.lower().replace(" ", ".")
+    lines = [
+        name,
+        f"{handle}@example.com | +968 9{rng.randint(1000000, 9999999)} | Muscat, Oman",
+        "",
+        "SUMMARY",
+        f"{rng.choice(POSITIONS)} with {rng.randint(1, 15)} years of experience. {FILLER}",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(rng.randint(1, 3 + pages)):
+        start = year - rng.randint(1, 4)
+        lines += [
+            f"{rng.choice(POSITIONS)} - {rng.choice(COMPANIES)} ({start} - {year})",
+            f"Technologies: {', '.join(rng.sample(SKILLS, 4))}",
+            FILLER,
+            "",
+        ]
+        year = start - rng.randint(0, 1)
+    lines += ["EDUCATION", f"{rng.choice(DEGREES)} - Sultan Qaboos University ({year - 4} - {year})", "",
+              "SKILLS", ", ".join(rng.sample(SKILLS, rng.randint(5, 12))), "", "PROJECTS"]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(f"Project {len(lines)}: {FILLER[:90]}")
+
+    # wrap long lines so they fit the page width
+    wrapped = []
+    for line in lines:
+        while len(line) > 95:
+            wrapped.append(line[:95])
+            line = line[95:]
+        wrapped.append(line)
+    per_page = max(1, -(-len(wrapped) // pages))
+    chunks = [wrapped[i:i + per_page] for i in range(0, len(wrapped), per_page)][:pages]
+    # running footer, as most CV templates print one
+    return [chunk + [f"{name} | Curriculum Vitae | Page {n} of {len(chunks)}"] for n, chunk in enumerate(chunks, 1)]
+
+
+def generate_cv_corpus(
+    output_dir: str,
+    count: int,
+    seed: int = 0,
+    min_pages: int = 1,
+    max_pages: int = 20,
+    link_ratio: float = 0.5,
+) -> List[str]:
+    """
+    Write `count` synthetic PDF CVs of min_pages..max_pages pages to output_dir.
+
+    About link_ratio of them carry LinkedIn / GitHub link annotations so the
+    per-page link extraction is exercised.
+
+    Returns:
+        The written file paths
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        pages = cv_lines(rng, name, rng.randint(min_pages, max_pages))
+        links: List[List[str]] = []
+        if rng.random() < link_ratio:
+            handle = name.lower().replace(" ", "-")
+            links = [[f"https://www.linkedin.com/in/{handle}-{i}", f"https://github.com/{handle}{i}"]]
+            if len(pages) > 1:
+                links += [[] for _ in range(len(pages) - 2)] + [[f"https://{handle}{i}.example.com"]]
+        path = os.path.join(output_dir, f"cv-{i:05d}.pdf")
+        write_pdf(path, pages, links)
+        paths.append(path)
+    return paths
+
+
+def generate_job_descriptions(output_dir: str, count: int, seed: int = 0,
+                              template_path: Optional[str] = "knowledge/jd-01.json") -> List[str]:
+    """
+    Write `count` synthetic job description JSON files shaped like knowledge/jd-01.json.
+
+    Returns:
+        The written file paths
+    """
+    rng = random.Random(seed)
+    template = {}
+    if template_path and os.path.exists(template_path):
+        with open(template_path, "r", encoding="utf-8") as f:
+            template = json.load(f)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        title = rng.choice(POSITIONS)
+        level = rng.choice(["Junior", "Mid-level", "Senior", "Lead"])
+        job = dict(template)
+        job.update({
+            "job_id": f"JD-{i + 1:03d}",
+            "title": f"{level} {title}",
+            "summary": f"We are hiring a {level.lower()} {title.lower()}.",
+            "must_have_skills": rng.sample(SKILLS, 5),
+            "nice_to_have_skills": rng.sample(SKILLS, 5),
+            "tools_technologies": rng.sample(SKILLS, 4),
+            "experience_required_years": rng.randint(0, 8),
+            "education_required": [f"{rng.choice(['Bachelor', 'Master'])}'s degree in a related field"],
+        })
+        path = os.path.join(output_dir, f"jd-{i + 1:03d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        paths.append(path)
+    return paths
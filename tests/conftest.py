@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+from app.model import CandidateCV
+from app.stub_llm import sample_candidate
+from benchmarks import synthetic
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    """Crew inputs pointing at empty stage folders under tmp_path."""
+    paths = {
+        "pdf_files_path": tmp_path / "CV",
+        "txt_files_path": tmp_path / "preprocessed-CVs",
+        "json_files_path": tmp_path / "processed-CVs",
+        "matches_output_path": tmp_path / "job-matches",
+    }
+    for path in paths.values():
+        path.mkdir()
+    return {key: str(path) for key, path in paths.items()}
+
+
+@pytest.fixture
+def knowledge_dir(tmp_path):
+    path = tmp_path / "knowledge"
+    path.mkdir()
+    write_job(str(path), 1, "Data Engineer", ["sql"])
+    write_job(str(path), 2, "Backend Developer", ["python"])
+    return str(path)
+
+
+def write_job(knowledge_dir, number, title, skills):
+    with open(os.path.join(knowledge_dir, f"jd-{number}.json"), "w", encoding="utf-8") as f:
+        json.dump({"job_id": f"JD-{number}", "title": title, "must_have_skills": skills}, f)
+
+
+def write_candidate(inputs, stem, pdf=b"%PDF-1.4"):
+    """Write the PDF, txt and CandidateCV JSON of one processed candidate."""
+    with open(os.path.join(inputs["pdf_files_path"], f"{stem}.pdf"), "wb") as f:
+        f.write(pdf)
+    with open(os.path.join(inputs["txt_files_path"], f"{stem}.txt"), "w", encoding="utf-8") as f:
+        f.write(f"CV text of {stem}")
+    cv = CandidateCV.model_validate(sample_candidate(stem))
+    with open(os.path.join(inputs["json_files_path"], f"{stem}.json"), "w", encoding="utf-8") as f:
+        f.write(cv.model_dump_json())
+
+
+def write_pdf(path, pages):
+    """Write a text PDF with one line per page ("" gives a page without text)."""
+    synthetic.write_pdf(str(path), [[text] if text else [] for text in pages])
+    return str(path)
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from app.batch_matching import BatchMatchError, match_candidate_batch, parse_batch
+from app.model import CandidateCV
+from app.stub_llm import sample_candidate, sample_match
+
+JOBS = [
+    {"job_id": "JD-1", "title": "Data Engineer"},
+    {"job_id": "JD-2", "title": "Backend Developer"},
+    {"job_id": "JD-3", "title": "Analyst"},
+]
+
+
+def reply(*items):
+    return json.dumps({"matches": list(items)})
+
+
+def test_items_are_paired_by_id_title_and_validated_one_by_one():
+    broken = {**sample_match(None, "Backend Developer"), "overall_score": "high"}
+    broken.pop("job_id")
+    unknown = sample_match(None, "Something Else")
+    by_title = sample_match(None, "analyst")
+
+    valid, failed = parse_batch(reply(unknown, sample_match("JD-1", "Data Engineer"), by_title, broken), JOBS)
+
+    assert sorted(valid) == ["JD-1", "JD-3"]
+    assert valid["JD-3"].job_id == "JD-3"
+    assert failed == ["JD-2"]
+
+
+def test_only_failed_jobs_are_retried():
+    prompts = []
+
+    def complete_fn(prompt, response_model, model=None, system=None):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return reply(sample_match("JD-1", "Data Engineer"), sample_match("JD-3", "Analyst"))
+        return reply(sample_match("JD-2", "Backend Developer"))
+
+    cv = CandidateCV.model_validate(sample_candidate("a"))
+    results = match_candidate_batch(cv, JOBS, complete_fn=complete_fn)
+
+    assert [r.job_id for r in results] == ["JD-1", "JD-2", "JD-3"]
+    assert len(prompts) == 2
+    assert "Backend Developer" in prompts[1] and "Data Engineer" not in prompts[1]
+
+
+def test_jobs_still_invalid_after_the_retries_raise():
+    def complete_fn(prompt, response_model, model=None, system=None):
+        return reply(sample_match("JD-1", "Data Engineer"))
+
+    cv = CandidateCV.model_validate(sample_candidate("a"))
+    with pytest.raises(BatchMatchError) as e:
+        match_candidate_batch(cv, JOBS, max_retries=1, complete_fn=complete_fn)
+
+    assert e.value.failed_job_ids == ["JD-2", "JD-3"]
+    assert [r.job_id for r in e.value.results] == ["JD-1"]
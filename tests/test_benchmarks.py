@@ -0,0 +1,22 @@
+from benchmarks.run import bench_size, percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile([], 50)) == (50.0, 95.0, 0.0)
+
+
+def test_small_corpus_runs_every_stage(tmp_path):
+    options = {
+        "jobs": 2, "workers": 1, "concurrency": 2, "llm_latency": 0.0, "pre_extract": True,
+        "token_budget": 0, "invalid_rate": 0.5, "seed": 1, "workdir": str(tmp_path),
+    }
+
+    report = bench_size(3, options)
+
+    stages = report["stages"]
+    assert (stages["extract"]["items"], stages["extract"]["failed"]) == (3, 0)
+    assert stages["analyze"]["items"] == 3 and stages["analyze"]["cv_tokens_after"] > 0
+    assert stages["validate"]["items"] == 3
+    assert stages["match"]["items"] == 6
+    assert report["llm"]["calls"] >= 6
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import batch_matching
+from app.cli import main
+from app.manifest import PipelineManifest
+from app.model import JobMatchResult
+from app.stub_llm import sample_match
+
+from tests.conftest import write_candidate
+
+
+@pytest.fixture
+def folders(tmp_path, inputs, knowledge_dir, monkeypatch):
+    monkeypatch.setenv("MATCH_DB", "0")
+    return [
+        "--cv-dir", inputs["pdf_files_path"],
+        "--txt-dir", inputs["txt_files_path"],
+        "--json-dir", inputs["json_files_path"],
+        "--matches-dir", inputs["matches_output_path"],
+        "--knowledge-dir", knowledge_dir,
+        "--manifest", str(tmp_path / "manifest.json"),
+    ]
+
+
+def test_status_reports_pending_stages_without_importing_crewai(inputs, folders):
+    with open(os.path.join(inputs["pdf_files_path"], "new.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4")
+    code = (
+        "import sys; from app.cli import main; main(sys.argv[1:]); "
+        "assert 'crewai' not in sys.modules, 'crewai imported'"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code, "status", "--json", *folders],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(__file__)),
+    ).stdout
+
+    status = json.loads(out)
+    assert status["candidates"] == 1 and status["to_extract"] == 1
+    assert status["jobs"] == 2 and sorted(status["jobs_added"]) == ["JD-1", "JD-2"]
+
+
+def test_match_is_incremental(tmp_path, inputs, knowledge_dir, folders, monkeypatch, capsys):
+    write_candidate(inputs, "a")
+    manifest = PipelineManifest(str(tmp_path / "manifest.json"))
+    analyzed = manifest.plan(inputs, knowledge_dir).model_copy(update={"match": []})
+    manifest.record(inputs, analyzed, analyzed, update_jobs=False)
+    manifest.save()
+    calls = []
+
+    def match_fn(cv, jobs):
+        calls.append(cv.contact_information.full_name)
+        return [JobMatchResult.model_validate(sample_match(job["job_id"], job["title"])) for job in jobs]
+
+    monkeypatch.setattr(batch_matching, "match_candidate_batch", match_fn)
+
+    assert main(["match", *folders]) == 0
+    assert main(["match", *folders]) == 0
+
+    assert len(calls) == 1
+    with open(os.path.join(inputs["matches_output_path"], "a.json"), "r", encoding="utf-8") as f:
+        assert sorted(item["job_id"] for item in json.load(f)) == ["JD-1", "JD-2"]
+    assert capsys.readouterr().out.splitlines()[-1] == "Nothing to match"
+
+
+def test_local_match_writes_scores_apart(tmp_path, inputs, folders):
+    write_candidate(inputs, "a")
+    local_dir = str(tmp_path / "local")
+
+    assert main(["match", "--local", "--local-dir", local_dir, *folders]) == 0
+
+    assert os.listdir(local_dir) == ["a.json"]
+    assert os.listdir(inputs["matches_output_path"]) == []
@@ -0,0 +1,62 @@
+from app.compaction import compact_cv_text, prepare_cv_text
+from app.pdf_extraction import LINKS_HEADER
+
+PAGE_ONE = f"""Jane Doe - Curriculum Vitae
+Jane Doe
+jane@example.com
+
+Experience
+Data Engineer at Acme Corp    2019 - Present
+- Built  the   ingestion plat-
+form
+
+Page 1 of 2
+{LINKS_HEADER}
+1. https://github.com/janedoe
+"""
+
+PAGE_TWO = f"""Jane Doe - Curriculum Vitae
+Skills
+Python, SQL
+
+Publications
+{chr(10).join(f"Paper number {i} on distributed data systems, Journal of Things" for i in range(80))}
+
+Interests
+Chess
+
+Page 2 of 2
+{LINKS_HEADER}
+1. https://github.com/janedoe
+"""
+
+CV_TEXT = PAGE_ONE + "\n--- PAGE BREAK ---\n" + PAGE_TWO
+
+
+def test_furniture_links_and_whitespace_are_cleaned():
+    compacted = compact_cv_text(CV_TEXT, token_budget=None)
+
+    assert compacted.furniture_lines == 2
+    assert compacted.text.count("Curriculum Vitae") == 1
+    assert "Page 2 of 2" not in compacted.text
+    assert compacted.text.count("https://github.com/janedoe") == 1
+    assert "Built the ingestion platform" in compacted.text
+    assert compacted.trimmed == []
+
+
+def test_expendable_sections_are_trimmed_first():
+    compacted = compact_cv_text(CV_TEXT, token_budget=300)
+
+    assert compacted.tokens_after <= 300 < compacted.tokens_before
+    assert compacted.trimmed[0] == "interests"
+    assert "publications" in compacted.trimmed
+    assert "Built the ingestion platform" in compacted.text
+    assert "Python, SQL" in compacted.text
+
+
+def test_prepare_cv_text_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("CV_COMPACT", "0")
+    assert prepare_cv_text(CV_TEXT) == CV_TEXT
+    monkeypatch.setenv("CV_COMPACT", "1")
+    monkeypatch.setenv("CV_TOKEN_BUDGET", "0")
+    assert prepare_cv_text(CV_TEXT) == compact_cv_text(CV_TEXT, token_budget=None).text
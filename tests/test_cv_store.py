@@ -0,0 +1,56 @@
+import json
+import os
+
+import numpy as np
+
+from app.cv_store import COLUMNS_FILE, CVStore
+from app.model import CandidateCV
+from app.scoring import score_all
+from app.stub_llm import sample_candidate
+
+from tests.conftest import write_candidate
+
+
+def test_store_matches_the_json_files(tmp_path, inputs, knowledge_dir):
+    for stem in ("a", "b"):
+        write_candidate(inputs, stem)
+    store = CVStore(str(tmp_path / "cv-store"))
+    assert store.import_json_dir(inputs["json_files_path"], run_id="1") == 2
+
+    table = store.load()
+    assert table.ids == ["a", "b"] and store.is_current(inputs["json_files_path"], table)
+    _, from_json = score_all(inputs["json_files_path"], knowledge_dir)
+    _, from_store = score_all(inputs["json_files_path"], knowledge_dir, store_dir=store.root)
+    np.testing.assert_array_equal(from_json.overall_score, from_store.overall_score)
+
+    exported = store.export_json(str(tmp_path / "exported"), ["b"])
+    with open(exported[0], "r", encoding="utf-8") as f, \
+            open(os.path.join(inputs["json_files_path"], "b.json"), "r", encoding="utf-8") as g:
+        assert CandidateCV.model_validate(json.load(f)) == CandidateCV.model_validate_json(g.read())
+
+
+def test_later_segments_win_and_truncated_rows_are_skipped(tmp_path):
+    store = CVStore(str(tmp_path / "cv-store"))
+    cv = CandidateCV.model_validate(sample_candidate("ann.pdf"))
+    with store.writer("1") as writer:
+        writer.append("a", cv)
+    with store.writer("2") as writer:
+        writer.append("a", cv.model_copy(update={"summary": "Updated."}))
+    with open(os.path.join(store.root, "2", COLUMNS_FILE), "a", encoding="utf-8") as f:
+        f.write('{"id": "b", "na')
+
+    table = store.load()
+
+    assert table.ids == ["a"]
+    assert table.cv(0).summary == "Updated."
+
+
+def test_new_json_file_makes_the_store_stale(tmp_path, inputs):
+    write_candidate(inputs, "a")
+    store = CVStore(str(tmp_path / "cv-store"))
+    store.import_json_dir(inputs["json_files_path"])
+
+    write_candidate(inputs, "b")
+
+    assert not store.is_current(inputs["json_files_path"], store.load())
+
@@ -0,0 +1,76 @@
+import json
+import os
+import urllib.request
+
+import pytest
+
+from app.daemon import PipelineDaemon, serve
+from app.model import CandidateCV, JobMatchResult
+from app.skill_index import SkillIndex
+from app.stub_llm import sample_candidate, sample_match
+
+from tests.conftest import write_job, write_pdf
+
+
+@pytest.fixture
+def daemon(tmp_path, inputs, knowledge_dir, monkeypatch):
+    monkeypatch.setenv("MATCH_DB", "0")
+    calls = []
+
+    def analyze_fn(cv_text, source_file):
+        calls.append(("analyze", source_file))
+        return CandidateCV.model_validate({**sample_candidate(cv_text), "source_file": source_file})
+
+    def match_fn(cv, jobs):
+        calls.append(("match", tuple(job["job_id"] for job in jobs)))
+        return [JobMatchResult.model_validate(sample_match(job["job_id"], job["title"])) for job in jobs]
+
+    daemon = PipelineDaemon(
+        inputs,
+        knowledge_dir=knowledge_dir,
+        analyze_fn=analyze_fn,
+        match_fn=match_fn,
+        manifest_path=str(tmp_path / "manifest.json"),
+        knowledge_index=False,
+        skill_index_path=str(tmp_path / "skill_index.json"),
+    )
+    daemon.calls = calls
+    return daemon
+
+
+def test_poll_processes_new_pdfs_once(tmp_path, inputs, daemon):
+    write_pdf(os.path.join(inputs["pdf_files_path"], "ann.pdf"), ["Ann knows Python and SQL"])
+
+    assert daemon.poll_once() == 1
+    assert daemon.poll_once() == 0
+
+    assert daemon.calls == [("analyze", "ann.pdf"), ("match", ("JD-1", "JD-2"))]
+    assert os.path.exists(os.path.join(inputs["matches_output_path"], "ann.json"))
+    assert SkillIndex.load(str(tmp_path / "skill_index.json")).candidates_with_all(["sql"]) == ["ann"]
+
+
+def test_edited_job_is_rematched_on_the_next_poll(inputs, knowledge_dir, daemon):
+    write_pdf(os.path.join(inputs["pdf_files_path"], "ann.pdf"), ["Ann knows Python"])
+    daemon.poll_once()
+    write_job(knowledge_dir, 2, "Backend Developer", ["python", "go"])
+
+    daemon.poll_once()
+
+    assert daemon.calls[-1] == ("match", ("JD-2",))
+    assert daemon.status_snapshot()["jobs"] == 2
+
+
+def test_match_endpoint_answers_without_writing(inputs, daemon):
+    server = serve(daemon, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/match?name=bob.txt"
+        request = urllib.request.Request(url, data=b"Bob knows Docker", headers={"Content-Type": "text/plain"})
+        with urllib.request.urlopen(request) as response:
+            body = json.loads(response.read())
+    finally:
+        server.shutdown()
+
+    assert [match["job_id"] for match in body["matches"]] == ["JD-1", "JD-2"]
+    assert body["candidate"]["source_file"] == "bob.pdf"
+    assert os.listdir(inputs["matches_output_path"]) == []
+    assert daemon.status_snapshot()["requests"] == 1
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from app.dispatcher import PRIORITY_BULK, PRIORITY_INTERACTIVE, LLMDispatcher, TokenBucket, is_retryable
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = LLMDispatcher(max_in_flight=1, max_retries=3, base_delay=0.001, max_delay=0.01)
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def flaky(failures):
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+    return fn, calls
+
+
+def test_retryable_errors_are_retried_and_counted(dispatcher):
+    fn, calls = flaky([ProviderError(429, retry_after="0"), ProviderError(503)])
+    future = dispatcher.submit(fn)
+
+    assert future.result() == "ok"
+    assert future.retries == 2 and len(calls) == 3
+    assert dispatcher.stats["retries"] == 2 and dispatcher.stats["rate_limited"] == 1
+
+
+def test_other_errors_fail_at_once(dispatcher):
+    fn, calls = flaky([ProviderError(400)])
+    with pytest.raises(ProviderError):
+        dispatcher.run(fn)
+    assert len(calls) == 1 and dispatcher.stats["failed"] == 1
+
+
+def test_gives_up_after_max_retries(dispatcher):
+    fn, calls = flaky([ProviderError(500)] * 10)
+    with pytest.raises(ProviderError):
+        dispatcher.run(fn)
+    assert len(calls) == 4
+
+
+def test_interactive_lane_runs_ahead_of_bulk(dispatcher):
+    order = []
+    gate = threading.Event()
+    dispatcher.submit(gate.wait)  # keeps the only worker busy while the others queue
+    futures = [
+        dispatcher.submit(lambda: order.append("bulk"), priority=PRIORITY_BULK),
+        dispatcher.submit(lambda: order.append("interactive"), priority=PRIORITY_INTERACTIVE),
+    ]
+    gate.set()
+    for future in futures:
+        future.result()
+    assert order == ["interactive", "bulk"]
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=6000, capacity=10)
+    assert bucket.try_acquire(10)
+    assert not bucket.try_acquire(5)
+    assert 0 < bucket.wait_time(5) <= 0.05
+    time.sleep(0.06)
+    assert bucket.try_acquire(5)
+
+
+def test_is_retryable_by_status_or_name():
+    assert is_retryable(ProviderError(429)) and not is_retryable(ProviderError(401))
+    assert is_retryable(type("APITimeoutError", (Exception,), {})())
+
+
+def test_provider_sdk_does_not_retry_under_the_dispatcher(monkeypatch, dispatcher):
+    from app.llm import complete
+    from app.model import JobMatchResult
+    from app.stub_llm import StubConfig, serve
+
+    server = serve(port=0, config=StubConfig(latency=0, jitter=0, rate_limit_rate=0.5, seed=3), background=True)
+    try:
+        monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("MODEL", "openai/gpt-4o-mini")
+        for i in range(4):
+            complete(f"match {i}", JobMatchResult, cache=False, dispatcher=dispatcher)
+    finally:
+        server.shutdown()
+
+    # every 429 the server sent was retried by the dispatcher, none inside the SDK
+    assert server.stats["rate_limited"] > 0
+    assert dispatcher.stats["retries"] == server.stats["rate_limited"]
+    assert server.stats["requests"] == 4 + dispatcher.stats["retries"]
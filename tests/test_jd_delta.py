@@ -0,0 +1,181 @@
+import json
+import os
+
+import pytest
+
+from app.jd_delta import apply_jd_delta, diff_jobs
+from app.knowledge import job_content_hashes, job_set_hash, load_job_descriptions
+from app.manifest import PipelineManifest
+from app.match_store import MatchStore
+from app.model import JobMatchResult
+from app.stub_llm import sample_match
+
+from tests.conftest import write_candidate, write_job
+
+
+def title_keyed_matches(inputs, stem, scores):
+    """Match results without job_id, as older crew runs wrote them."""
+    items = []
+    for title, score in scores.items():
+        item = sample_match(None, title)
+        item.pop("job_id", None)
+        item["overall_score"] = score
+        items.append(item)
+    with open(os.path.join(inputs["matches_output_path"], f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump(items, f)
+
+
+def read_matches(inputs, stem):
+    with open(os.path.join(inputs["matches_output_path"], f"{stem}.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def recorded(tmp_path, inputs, knowledge_dir):
+    """A candidate matched against the JD set, recorded in a manifest and a match store."""
+    write_candidate(inputs, "a")
+    title_keyed_matches(inputs, "a", {"Data Engineer": 70, "Backend Developer": 50})
+    manifest = PipelineManifest(str(tmp_path / "manifest.json"))
+    plan = manifest.plan(inputs, knowledge_dir)
+    manifest.record(inputs, plan, plan)
+    store = MatchStore(str(tmp_path / "matches.sqlite3"))
+    store.import_results_dir(inputs["matches_output_path"])
+    return manifest, store
+
+
+def delta_since(manifest, knowledge_dir):
+    jobs = load_job_descriptions(knowledge_dir)
+    job_hashes = job_content_hashes(jobs)
+    delta = diff_jobs(job_hashes, manifest.job_hashes, job_set_hash(job_hashes), manifest.jd_set_hash)
+    return jobs, delta
+
+
+def rescore(calls, score=90):
+    def match_fn(cv, jobs):
+        calls.append([job["job_id"] for job in jobs])
+        return [
+            JobMatchResult.model_validate({**sample_match(job["job_id"], job["title"]), "overall_score": score})
+            for job in jobs
+        ]
+    return match_fn
+
+
+def test_changed_job_is_rematched_and_title_keyed_results_kept(inputs, knowledge_dir, recorded):
+    manifest, store = recorded
+    write_job(knowledge_dir, 2, "Backend Developer", ["python", "go"])
+    jobs, delta = delta_since(manifest, knowledge_dir)
+    assert delta.changed == ["JD-2"]
+
+    calls = []
+    summary = apply_jd_delta(inputs, jobs, delta, manifest, rescore(calls), store)
+
+    assert calls == [["JD-2"]]
+    assert summary.updated == ["a"] and summary.failed == []
+    results = {item["job_title"]: item for item in read_matches(inputs, "a")}
+    assert results["Backend Developer"]["overall_score"] == 90
+    assert results["Backend Developer"]["job_id"] == "JD-2"
+    assert results["Data Engineer"]["overall_score"] == 70
+    assert len(results) == 2
+
+
+def test_removed_job_retires_its_title_keyed_rows(inputs, knowledge_dir, recorded):
+    manifest, store = recorded
+    os.remove(os.path.join(knowledge_dir, "jd-1.json"))
+    jobs, delta = delta_since(manifest, knowledge_dir)
+    assert delta.removed == ["JD-1"]
+
+    calls = []
+    summary = apply_jd_delta(inputs, jobs, delta, manifest, rescore(calls), store)
+
+    # the removed JD's title is gone with its file, so its result cannot be attributed
+    assert calls == []
+    assert summary.failed == ["a"]
+    current = store._conn.execute(
+        "SELECT job_title FROM matches WHERE candidate_id = 'a' AND is_current = 1"
+    ).fetchall()
+    assert [row[0] for row in current] == ["Backend Developer"]
+
+
+def test_removed_job_is_dropped_from_job_id_keyed_results(inputs, knowledge_dir, recorded):
+    manifest, store = recorded
+    write_job(knowledge_dir, 2, "Backend Developer", ["python", "go"])
+    jobs, delta = delta_since(manifest, knowledge_dir)
+    apply_jd_delta(inputs, jobs, delta, manifest, rescore([]), store)
+    write_job(knowledge_dir, 1, "Data Engineer", ["sql", "spark"])
+    jobs, delta = delta_since(manifest, knowledge_dir)
+    apply_jd_delta(inputs, jobs, delta, manifest, rescore([]), store)
+    os.remove(os.path.join(knowledge_dir, "jd-1.json"))
+    jobs, delta = delta_since(manifest, knowledge_dir)
+
+    summary = apply_jd_delta(inputs, jobs, delta, manifest, rescore([]), store)
+
+    assert summary.updated == ["a"]
+    assert [item["job_id"] for item in read_matches(inputs, "a")] == ["JD-2"]
+    current = store._conn.execute(
+        "SELECT job_id FROM matches WHERE candidate_id = 'a' AND is_current = 1"
+    ).fetchall()
+    assert [row[0] for row in current] == ["JD-2"]
+
+
+def test_unattributable_result_leaves_candidate_for_a_full_match(inputs, knowledge_dir, recorded):
+    manifest, store = recorded
+    title_keyed_matches(inputs, "a", {"Data Engineer": 70, "Some Retired Role": 40})
+    plan = manifest.plan(inputs, knowledge_dir)
+    manifest.record(inputs, plan, plan)
+    write_job(knowledge_dir, 2, "Backend Developer", ["python", "go"])
+    jobs, delta = delta_since(manifest, knowledge_dir)
+
+    before = read_matches(inputs, "a")
+    summary = apply_jd_delta(inputs, jobs, delta, manifest, rescore([]), store)
+
+    assert summary.failed == ["a"]
+    assert read_matches(inputs, "a") == before
+
+
+def test_reformatted_and_renamed_jd_keeps_matches_current(inputs, knowledge_dir, recorded):
+    manifest, _ = recorded
+    with open(os.path.join(knowledge_dir, "jd-1.json"), "r", encoding="utf-8") as f:
+        job = json.load(f)
+    os.remove(os.path.join(knowledge_dir, "jd-1.json"))
+    with open(os.path.join(knowledge_dir, "data-engineer.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(reversed(list(job.items()))), f, indent=4)
+
+    _, delta = delta_since(manifest, knowledge_dir)
+
+    assert delta.is_empty()
+    assert manifest.plan(inputs, knowledge_dir).match == []
+
+
+def test_legacy_set_hash_is_rebased_without_matching(inputs, knowledge_dir, recorded):
+    manifest, store = recorded
+    stale = "0" * 64  # recorded by a version that hashed the raw files
+    for entry in manifest.entries.values():
+        entry.match_source = f"{entry.json_hash}:{stale}"
+    manifest.jd_set_hash = stale
+    jobs, delta = delta_since(manifest, knowledge_dir)
+    assert not delta.is_empty()
+
+    calls = []
+    summary = apply_jd_delta(inputs, jobs, delta, manifest, rescore(calls), store)
+
+    assert calls == [] and summary.updated == ["a"]
+    assert manifest.plan(inputs, knowledge_dir).match == []
+
+
+def test_delta_drops_stale_prefiltered_results(inputs, knowledge_dir, recorded):
+    manifest, store = recorded
+    prefiltered = [{**sample_match(job_id, title), "pre_filtered": True}
+                   for job_id, title in [("JD-1", "Data Engineer"), ("JD-2", "Backend Developer")]]
+    for stem in ("a", "other"):
+        with open(os.path.join(inputs["matches_output_path"], f"{stem}.prefiltered.json"), "w", encoding="utf-8") as f:
+            json.dump(prefiltered, f)
+    write_job(knowledge_dir, 2, "Backend Developer", ["python", "go"])
+    jobs, delta = delta_since(manifest, knowledge_dir)
+
+    apply_jd_delta(inputs, jobs, delta, manifest, rescore([]), store)
+
+    # "a" has a full JD-2 result now; "other" was not updated, so its entry stays
+    kept = {
+        stem: [item["job_id"] for item in read_matches(inputs, f"{stem}.prefiltered")] for stem in ("a", "other")
+    }
+    assert kept == {"a": ["JD-1"], "other": ["JD-1", "JD-2"]}
@@ -0,0 +1,39 @@
+import json
+
+from app.knowledge_store import HashingEmbedder, QdrantKnowledgeStorage
+
+
+def job_text(title, skills):
+    return json.dumps({"title": title, "must_have_skills": skills})
+
+
+def test_unchanged_documents_are_not_embedded_again(tmp_path):
+    storage = QdrantKnowledgeStorage("jobs", path=str(tmp_path / "qdrant"))
+    documents = {"jd-1.json": ("h1", ["data engineer sql spark"]), "jd-2.json": ("h2", ["backend python django"])}
+    assert storage.sync(documents) == 2
+    assert storage.sync(documents) == 0
+
+    assert storage.sync({"jd-1.json": ("h1b", ["data engineer sql airflow"])}) == 1
+    assert {hit["metadata"]["source"] for hit in storage.search(["python"], limit=5)} <= {"jd-1.json"}
+
+
+def test_crewai_default_threshold_is_replaced_by_the_embedder_one(tmp_path):
+    storage = QdrantKnowledgeStorage("jobs", path=str(tmp_path / "qdrant"))
+    storage.sync({
+        "jd-1.json": ("h1", [job_text("Data Analyst", ["SQL", "Excel", "Power BI"])]),
+        "jd-2.json": ("h2", [job_text("Backend Developer", ["Python", "Django", "PostgreSQL"])]),
+    })
+
+    # crewai's Knowledge.query passes score_threshold=0.6, tuned for dense embeddings
+    hits = storage.search(["data analyst with sql and excel"], limit=1, score_threshold=0.6)
+
+    assert [hit["metadata"]["source"] for hit in hits] == ["jd-1.json"]
+    assert hits[0]["score"] < 0.6
+
+
+def test_embedder_without_threshold_keeps_the_callers(tmp_path):
+    embedder = HashingEmbedder()
+    embedder.score_threshold = None
+    storage = QdrantKnowledgeStorage("jobs", path=str(tmp_path / "qdrant"), embedder=embedder)
+    storage.sync({"jd-1.json": ("h1", [job_text("Data Analyst", ["SQL"])])})
+    assert storage.search(["data analyst sql"], score_threshold=0.99) == []
@@ -0,0 +1,73 @@
+import time
+
+from app.llm_cache import LLMResponseCache, cache_key
+from app.model import JobMatchResult
+
+
+def make_cache(tmp_path, **kwargs):
+    return LLMResponseCache(str(tmp_path / "cache.sqlite3"), **kwargs)
+
+
+def test_key_ignores_whitespace_but_not_schema_or_model():
+    key = cache_key("gpt", "Match  this\n candidate")
+    assert key == cache_key("gpt", [{"role": "user", "content": "Match this candidate"}])
+    assert key != cache_key("gpt", "Match this candidate", JobMatchResult)
+    assert key != cache_key("other", "Match this candidate")
+
+
+def test_get_counts_hits_and_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("k") is None
+    cache.put("k", "gpt", "reply")
+    assert cache.get("k") == "reply"
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": 5}
+
+
+def test_least_recently_used_entries_are_evicted_over_size(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=500)
+    for key in ("a", "b", "c"):
+        cache.put(key, "gpt", "x" * 150)
+        time.sleep(0.01)
+    cache.get("a")  # b is now the least recently used
+    cache.put("d", "gpt", "x" * 150)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) for key in ("a", "c", "d"))
+    assert cache.stats()["bytes"] == 450 and cache.evictions == 1
+
+
+def test_expired_entries_are_evicted_on_put(tmp_path):
+    cache = make_cache(tmp_path, max_age_seconds=0.05)
+    cache.put("old", "gpt", "reply")
+    time.sleep(0.1)
+    assert cache.get("old") is None
+    cache.put("new", "gpt", "reply")
+    assert cache.stats()["entries"] == 1 and cache.evictions == 1
+
+
+def test_replace_and_delete_keep_the_running_size(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k", "gpt", "x" * 100)
+    cache.put("k", "gpt", "x" * 40)
+    assert cache._bytes == 40
+    cache.delete("k")
+    assert cache._bytes == 0 and cache.stats()["entries"] == 0
+
+
+def test_clear_resets_the_running_size(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=500)
+    for key in ("a", "b", "c"):
+        cache.put(key, "gpt", "x" * 150)
+    cache.clear()
+    for key in ("d", "e", "f"):
+        cache.put(key, "gpt", "x" * 150)
+
+    assert cache.stats()["entries"] == 3
+    assert cache.evictions == 0
+
+
+def test_size_is_read_back_when_reopened(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k", "gpt", "x" * 100)
+    cache.close()
+    assert make_cache(tmp_path)._bytes == 100
@@ -0,0 +1,56 @@
+import io
+import json
+import logging
+
+from app.logging_config import LogSink, QueuedLogHandler, SamplingFilter, StructuredFormatter
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_records_are_written_as_json_with_their_message_frozen():
+    stream = io.StringIO()
+    handler = QueuedLogHandler(LogSink(stream), batch_size=2, flush_interval=0.05)
+    handler.setFormatter(StructuredFormatter())
+    logger = make_logger("tests.queued", handler)
+    skills = ["python"]
+
+    logger.info("skills: %s", skills)
+    skills.append("sql")
+    for i in range(3):
+        logger.warning("line %d", i)
+    handler.flush()
+    handler.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == ["skills: ['python']", "line 0", "line 1", "line 2"]
+    assert lines[1]["level"] == "WARNING" and lines[1]["logger"] == "tests.queued"
+
+
+def test_sink_rotates_by_size(tmp_path):
+    path = tmp_path / "app.log"
+    sink = LogSink(path=str(path), max_bytes=10, backup_count=1)
+
+    for text in ("first 123\n", "second 12\n", "third 123\n"):
+        sink.write(text)
+    sink.close()
+
+    assert path.read_text() == "third 123\n"
+    assert (tmp_path / "app.log.1").read_text() == "second 12\n"
+    assert not (tmp_path / "app.log.2").exists()
+
+
+def test_sampling_keeps_a_share_of_low_severity_records():
+    sampler = SamplingFilter({"app.telemetry": 0.25})
+
+    def kept(name, level, count=8):
+        return sum(sampler.filter(logging.makeLogRecord({"name": name, "levelno": level})) for _ in range(count))
+
+    assert kept("app.telemetry.spans", logging.DEBUG) == 2
+    assert kept("app.telemetry", logging.WARNING) == 8
+    assert kept("app.other", logging.DEBUG) == 8
@@ -0,0 +1,67 @@
+import json
+import os
+
+from app.manifest import PipelineManifest, PipelinePlan
+
+from tests.conftest import write_candidate
+
+
+def write_matches(inputs, stem):
+    with open(os.path.join(inputs["matches_output_path"], f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump([], f)
+
+
+def test_unchanged_candidates_are_skipped(tmp_path, inputs, knowledge_dir):
+    write_candidate(inputs, "a")
+    write_matches(inputs, "a")
+    manifest = PipelineManifest(str(tmp_path / "manifest.json"))
+    plan = manifest.plan(inputs, knowledge_dir)
+    assert plan.extract == plan.analyze == plan.match == ["a"]
+
+    manifest.record(inputs, plan, plan)
+    manifest.save()
+    again = PipelineManifest.load(str(tmp_path / "manifest.json")).plan(inputs, knowledge_dir)
+    assert again.is_empty()
+    assert again.skipped == ["a"]
+
+
+def test_failed_stage_clears_it_and_later_stages(tmp_path, inputs, knowledge_dir):
+    for stem in ("a", "b"):
+        write_candidate(inputs, stem)
+        write_matches(inputs, stem)
+    manifest = PipelineManifest(str(tmp_path / "manifest.json"))
+    plan = manifest.plan(inputs, knowledge_dir)
+    # b was extracted, but its analysis failed (the JSON on disk is left over from an earlier run)
+    succeeded = PipelinePlan(extract=["a", "b"], analyze=["a"], match=["a"], jd_set_hash=plan.jd_set_hash)
+    manifest.record(inputs, plan, succeeded)
+
+    entry = manifest.entries["b"]
+    assert entry.txt_hash is not None
+    assert entry.json_hash is None and entry.match_hash is None
+    again = manifest.plan(inputs, knowledge_dir)
+    assert again.extract == []
+    assert again.analyze == again.match == ["b"]
+    assert again.skipped == ["a"]
+
+
+def test_changed_pdf_reruns_every_stage(tmp_path, inputs, knowledge_dir):
+    write_candidate(inputs, "a")
+    write_matches(inputs, "a")
+    manifest = PipelineManifest(str(tmp_path / "manifest.json"))
+    plan = manifest.plan(inputs, knowledge_dir)
+    manifest.record(inputs, plan, plan)
+
+    with open(os.path.join(inputs["pdf_files_path"], "a.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4 new version")
+    again = manifest.plan(inputs, knowledge_dir)
+    assert again.extract == again.analyze == again.match == ["a"]
+
+
+def test_removed_pdf_is_forgotten(tmp_path, inputs, knowledge_dir):
+    write_candidate(inputs, "a")
+    manifest = PipelineManifest(str(tmp_path / "manifest.json"))
+    plan = manifest.plan(inputs, knowledge_dir)
+    manifest.record(inputs, plan, plan)
+    os.remove(os.path.join(inputs["pdf_files_path"], "a.pdf"))
+    manifest.record(inputs, PipelinePlan(), PipelinePlan())
+    assert "a" not in manifest.entries
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.match_store import MatchStore
+from app.model import JobMatchResult
+from app.stub_llm import sample_match
+
+
+def match(job_id, score, category="moderate_match", title=None):
+    data = {**sample_match(job_id, title or job_id), "overall_score": score, "match_category": category}
+    return JobMatchResult.model_validate(data)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_top_for_job_ranks_current_results(store):
+    with store.writer(source="test") as writer:
+        writer.add("ann", [match("JD-1", 80, "strong_match")])
+        writer.add("bob", [match("JD-1", 60)])
+        writer.add("cat", [match("JD-1", 40, "weak_match")])
+
+    assert [row["candidate_id"] for row in store.top_for_job("JD-1", k=2)] == ["ann", "bob"]
+    assert [row["candidate_id"] for row in store.top_for_job("JD-1", min_score=50)] == ["ann", "bob"]
+    assert [row["candidate_id"] for row in store.top_for_job("JD-1", category="weak_match")] == ["cat"]
+    assert store.result("ann", "JD-1").overall_score == 80
+
+
+def test_a_later_run_supersedes_but_keeps_history(store):
+    first = store.start_run(source="first")
+    store.write(first, [("ann", match("JD-1", 50)), ("ann", match("JD-2", 70))])
+    second = store.start_run(source="second")
+    store.write(second, [("ann", match("JD-1", 90))])
+
+    assert {row["job_id"]: row["overall_score"] for row in store.for_candidate("ann")} == {"JD-1": 90, "JD-2": 70}
+    assert store.result("ann", "JD-1", run_id=first).overall_score == 50
+    assert {run["run_id"]: run["results"] for run in store.runs()} == {first: 2, second: 1}
+
+
+def test_replace_retires_rows_under_any_job_key(store):
+    store.write(store.start_run(), [("ann", match(None, 50, title="Data Engineer"))])
+    store.write(store.start_run(), [("ann", match("JD-1", 60, title="Data Engineer"))], replace=True)
+
+    assert [row["job_id"] for row in store.for_candidate("ann")] == ["JD-1"]
+
+
+def test_retire_jobs_drops_removed_ids_and_unknown_titles(store):
+    store.write(store.start_run(), [
+        ("ann", match("JD-1", 60)),
+        ("ann", match("JD-2", 70)),
+        ("ann", match(None, 40, title="Retired Role")),
+    ])
+
+    assert store.retire_jobs(["JD-2"], current_titles=["JD-1"]) == 2
+    assert [row["job_id"] for row in store.for_candidate("ann")] == ["JD-1"]
+
+
+def test_import_results_dir_reads_full_and_prefiltered_files(tmp_path, store):
+    results_dir = tmp_path / "job-matches"
+    results_dir.mkdir()
+    (results_dir / "ann.json").write_text(json.dumps([sample_match("JD-1", "Data Engineer")]))
+    (results_dir / "ann.prefiltered.json").write_text(
+        json.dumps([{**sample_match("JD-2", "Backend Developer"), "pre_filtered": True}])
+    )
+    (results_dir / "bob.json").write_text("not json")
+
+    assert store.import_results_dir(str(results_dir)) == 2
+    assert sorted(row["job_id"] for row in store.for_candidate("ann")) == ["JD-1", "JD-2"]
+    assert store.for_candidate("bob") == []
@@ -0,0 +1,57 @@
+import os
+
+from app.pdf_extraction import PAGE_BREAK, ExtractionLimits, batch_extract, extract_pdf_to_file
+
+from tests.conftest import write_pdf
+
+
+def test_pages_are_written_with_page_breaks(tmp_path):
+    pdf = write_pdf(tmp_path / "jane.pdf", ["Jane Doe", "Experience"])
+
+    result = extract_pdf_to_file(pdf, str(tmp_path / "txt"))
+
+    assert result.status == "success" and result.pages == 2
+    with open(result.output_path, "r", encoding="utf-8") as f:
+        assert f.read() == "Jane Doe" + PAGE_BREAK + "Experience"
+
+
+def test_batch_reports_each_file(tmp_path):
+    cv_dir = tmp_path / "CV"
+    cv_dir.mkdir()
+    write_pdf(cv_dir / "a.pdf", ["Ann"])
+    write_pdf(cv_dir / "b.pdf", ["Bob"])
+    (cv_dir / "broken.pdf").write_bytes(b"not a pdf")
+
+    summary = batch_extract(str(cv_dir), str(tmp_path / "txt"), max_workers=1)
+
+    assert (summary.total, summary.succeeded, summary.failed) == (3, 2, 1)
+    assert sorted(os.listdir(tmp_path / "txt")) == ["a.txt", "b.txt"]
+
+
+def test_page_limit_skips_the_rest(tmp_path):
+    pdf = write_pdf(tmp_path / "long.pdf", ["One", "Two", "Three"])
+
+    result = extract_pdf_to_file(pdf, str(tmp_path / "txt"), ExtractionLimits(max_pages=2))
+
+    assert (result.status, result.pages, result.skipped_pages) == ("success", 2, 1)
+    with open(result.output_path, "r", encoding="utf-8") as f:
+        assert "Three" not in f.read()
+
+
+def test_image_only_pdf_is_given_up_early(tmp_path):
+    pdf = write_pdf(tmp_path / "scan.pdf", ["", "", "", "Late text"])
+
+    result = extract_pdf_to_file(pdf, str(tmp_path / "txt"), ExtractionLimits(empty_pages_abort=2))
+
+    assert (result.status, result.pages) == ("error", 2)
+    assert "image-based" in result.error
+    assert os.listdir(tmp_path / "txt") == []
+
+
+def test_oversized_pdf_is_rejected_unread(tmp_path):
+    pdf = write_pdf(tmp_path / "big.pdf", ["Text"])
+
+    result = extract_pdf_to_file(pdf, str(tmp_path / "txt"), ExtractionLimits(max_bytes=10))
+
+    assert (result.status, result.pages) == ("error", 0)
+    assert "limit" in result.error
@@ -0,0 +1,72 @@
+import json
+from datetime import date
+
+from app.pre_extract import PRE_EXTRACTED_FIELDS, analyze_with_pre_extraction, pre_extract, segment_sections
+
+CV_TEXT = """Jane Doe
+jane.doe@example.com | +1 555 123 4567 | Austin, TX
+linkedin.com/in/janedoe
+
+Summary
+Data engineer building batch and streaming pipelines.
+
+Experience
+Senior Data Engineer at Acme Corp    Jan 2020 - Present
+- Built the ingestion platform
+Technologies: Python, Spark, SQL
+Data Analyst - Beta Analytics    Mar 2016 - Jun 2018
+- Reporting
+
+Education
+BSc Computer Science, State University    2012 - 2016
+
+Skills
+Python, SQL, Spark, Airflow
+
+[Links on this page]
+1. https://github.com/janedoe
+"""
+
+
+def test_sections_and_fields_are_found():
+    sections = segment_sections(CV_TEXT)
+    assert set(sections) >= {"header", "summary", "experience", "education", "skills"}
+    assert "github.com" not in sections["skills"]
+
+    pre = pre_extract(CV_TEXT, "jane_doe.pdf")
+    contact = pre.cv.contact_information
+    assert (contact.full_name, contact.email, contact.location) == ("Jane Doe", "jane.doe@example.com", "Austin, TX")
+    assert str(contact.github) == "https://github.com/janedoe"
+    jobs = pre.cv.work_experience
+    assert [(job.position, job.company) for job in jobs] == [
+        ("Senior Data Engineer", "Acme Corp"), ("Data Analyst", "Beta Analytics")
+    ]
+    assert jobs[0].is_current and jobs[0].technologies == ["Python", "Spark", "SQL"]
+    assert jobs[1].start_date == date(2016, 3, 1)
+    assert pre.cv.education[0].level.value == "bachelor"
+    assert [skill.name for skill in pre.cv.skills] == ["Python", "SQL", "Spark", "Airflow"]
+    assert pre.filled() == list(PRE_EXTRACTED_FIELDS)
+    assert "cv_analysis" in pre.missing()
+
+
+def test_gaps_between_jobs_are_computed_locally():
+    analysis = pre_extract(CV_TEXT, "jane_doe.pdf").cv.cv_analysis
+    assert analysis.has_gaps
+    assert analysis.gap_details == ["19 months between 2018-06 and 2020-01"]
+
+
+def test_analyzer_is_asked_only_for_missing_fields():
+    calls = []
+
+    def complete_fn(prompt, model, system=None):
+        calls.append(set(model.model_fields))
+        return json.dumps({"cv_analysis": {"total_years_experience": 99, "career_level": "lead"}})
+
+    cv = analyze_with_pre_extraction(CV_TEXT, "jane_doe.pdf", complete_fn=complete_fn)
+
+    assert len(calls) == 1 and "cv_analysis" in calls[0]
+    assert not calls[0] & {"contact_information", "work_experience", "education", "skills"}
+    assert cv.contact_information.full_name == "Jane Doe"
+    # the analyzer's judgement is kept, the years come from the dates
+    assert cv.cv_analysis.career_level == "lead"
+    assert cv.cv_analysis.total_years_experience < 99
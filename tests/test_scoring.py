@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from app.model import CandidateCV
+from app.scoring import (
+    EDUCATION_RANKS,
+    ScoringEngine,
+    candidate_education_rank,
+    job_education_rank,
+    write_match_results,
+)
+from app.stub_llm import sample_candidate
+
+
+def candidate(skills=("Python", "Django"), years=5.0, degree="BSc Computer Science", level="bachelor"):
+    data = sample_candidate("cv")
+    data["skills"] = [{"name": name} for name in skills]
+    data["work_experience"][0]["technologies"] = []
+    data["cv_analysis"]["total_years_experience"] = years
+    data["education"][0].update(degree=degree, level=level)
+    return CandidateCV.model_validate(data)
+
+
+JOB = {
+    "job_id": "JD-1",
+    "title": "Backend Developer",
+    "must_have_skills": ["Python", "Django", "PostgreSQL", "Docker"],
+    "experience_required_years": 4,
+    "education_required": ["Bachelor's or Master's degree in Computer Science"],
+    "career_level": "mid",
+}
+
+
+def test_scores_follow_the_fixed_rules():
+    engine = ScoringEngine([candidate(years=2.0)], [JOB])
+    result = engine.score().result(0, 0)
+
+    assert result.breakdown.skills_score == 20.0  # 2 of 4 must-haves
+    assert result.breakdown.experience_score == 15.0  # 2 of 4 years
+    assert result.breakdown.education_score == 20.0
+    assert result.skills_missing == ["PostgreSQL", "Docker"]
+    assert result.overall_score == pytest.approx(sum(result.breakdown.model_dump().values()))
+
+
+def test_job_requirement_reads_the_lowest_level():
+    assert job_education_rank(JOB) == EDUCATION_RANKS["bachelor"]
+
+
+def test_candidate_degree_text_reads_the_highest_level():
+    cv = candidate(degree="BSc Physics, MSc Data Science", level=None)
+    assert candidate_education_rank(cv) == EDUCATION_RANKS["master"]
+
+
+def test_recommendation_is_written_by_the_callback_from_the_scores():
+    seen = []
+
+    def recommend(result):
+        seen.append((result.overall_score, result.match_category))
+        return "Solid backend fit; lacks PostgreSQL and Docker."
+
+    result = ScoringEngine([candidate()], [JOB]).score().result(0, 0, recommend)
+
+    assert result.recommendation == "Solid backend fit; lacks PostgreSQL and Docker."
+    assert seen == [(result.overall_score, result.match_category)]
+
+
+def test_template_recommendation_is_the_fallback(caplog):
+    def broken(result):
+        raise RuntimeError("model unavailable")
+
+    matrix = ScoringEngine([candidate()], [JOB]).score()
+    assert matrix.result(0, 0, broken).recommendation == matrix.result(0, 0).recommendation
+    assert matrix.result(0, 0, lambda result: " ").recommendation.startswith("Rule-based score")
+
+
+def test_results_are_written_best_first(tmp_path):
+    second = dict(JOB, job_id="JD-2", title="Kubernetes Engineer", must_have_skills=["Kubernetes"])
+    engine = ScoringEngine([candidate()], [second, JOB], candidate_ids=["jane"])
+    write_match_results(engine, engine.score(), str(tmp_path))
+
+    with open(tmp_path / "jane.json", "r", encoding="utf-8") as f:
+        results = json.load(f)
+    assert [r["job_id"] for r in results] == ["JD-1", "JD-2"]
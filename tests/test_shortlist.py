@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+from app.model import CandidateCV
+from app.shortlist import ShortlistConfig, prune_prefiltered, run_shortlist
+from app.skill_index import SkillIndex
+from app.stub_llm import sample_candidate, sample_match
+
+
+def write_cv(json_dir, stem, skills):
+    data = sample_candidate(stem)
+    data["contact_information"]["full_name"] = stem.title()
+    data["skills"] = [{"name": skill, "level": "advanced"} for skill in skills]
+    data["work_experience"][0]["technologies"] = skills
+    with open(os.path.join(json_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+        f.write(CandidateCV.model_validate(data).model_dump_json())
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def pool(inputs, knowledge_dir):
+    """Two candidates: ann knows SQL (JD-1), bob knows Python (JD-2)."""
+    write_cv(inputs["json_files_path"], "ann", ["SQL"])
+    write_cv(inputs["json_files_path"], "bob", ["Python"])
+    return inputs["json_files_path"], knowledge_dir, inputs["matches_output_path"]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "skill_index.json")
+
+
+def test_pairs_off_the_shortlist_are_written_as_prefiltered(pool, index_path):
+    json_dir, knowledge_dir, output_dir = pool
+
+    config = ShortlistConfig(top_k=1)
+    shortlist = run_shortlist(json_dir, knowledge_dir, output_dir, config, skill_index_path=index_path)
+
+    assert shortlist.pairs() == {("ann", "JD-1"), ("bob", "JD-2")}
+    assert shortlist.recall is None
+    ann = read_json(os.path.join(output_dir, "ann.prefiltered.json"))
+    assert [item["job_id"] for item in ann] == ["JD-2"]
+    assert ann[0]["pre_filtered"] is True
+
+
+def test_full_results_replace_stale_prefiltered_ones(pool, index_path):
+    json_dir, knowledge_dir, output_dir = pool
+    run_shortlist(json_dir, knowledge_dir, output_dir, ShortlistConfig(top_k=1), skill_index_path=index_path)
+    full = [sample_match("JD-1", "Data Engineer"), sample_match("JD-2", "Backend Developer")]
+    with open(os.path.join(output_dir, "ann.json"), "w", encoding="utf-8") as f:
+        json.dump(full, f)
+
+    run_shortlist(json_dir, knowledge_dir, output_dir, ShortlistConfig(top_k=1), skill_index_path=index_path)
+
+    assert not os.path.exists(os.path.join(output_dir, "ann.prefiltered.json"))
+    assert os.path.exists(os.path.join(output_dir, "bob.prefiltered.json"))
+
+
+def test_recall_is_reported_against_a_reference_pass(tmp_path, pool, index_path):
+    json_dir, knowledge_dir, output_dir = pool
+    reference = tmp_path / "full-pass"
+    reference.mkdir()
+    for stem, job_id, title in [("ann", "JD-1", "Data Engineer"), ("ann", "JD-2", "Backend Developer")]:
+        item = {**sample_match(job_id, title), "candidate_name": stem.title()}
+        with open(reference / f"{stem}-{job_id}.json", "w", encoding="utf-8") as f:
+            json.dump([item], f)
+
+    config = ShortlistConfig(top_k=1, reference_dir=str(reference))
+    shortlist = run_shortlist(json_dir, knowledge_dir, output_dir, config, skill_index_path=index_path)
+
+    assert shortlist.recall == {"relevant": 2, "recalled": 1, "recall": 0.5}
+
+
+def test_prune_prefiltered_drops_jobs_and_empty_files(pool, index_path):
+    json_dir, knowledge_dir, output_dir = pool
+    run_shortlist(json_dir, knowledge_dir, output_dir, ShortlistConfig(top_k=1), skill_index_path=index_path)
+
+    assert prune_prefiltered(output_dir, ["JD-2"], ["bob"]) == 0
+    assert prune_prefiltered(output_dir, ["JD-2"]) == 1
+
+    assert not os.path.exists(os.path.join(output_dir, "ann.prefiltered.json"))
+    bob = read_json(os.path.join(output_dir, "bob.prefiltered.json"))
+    assert [item["job_id"] for item in bob] == ["JD-1"]
+
+
+def test_candidates_with_all_must_haves_are_kept_beyond_top_k(pool, index_path):
+    json_dir, knowledge_dir, _ = pool
+    write_cv(json_dir, "cat", ["Postgres", "structured query language"])
+
+    by_score = run_shortlist(json_dir, knowledge_dir, None, ShortlistConfig(top_k=1, must_haves=False))
+    by_skills = run_shortlist(json_dir, knowledge_dir, None, ShortlistConfig(top_k=1), skill_index_path=index_path)
+
+    assert len(by_score.selected["JD-1"]) == 1
+    assert sorted(by_skills.selected["JD-1"]) == ["ann", "cat"]
+    assert SkillIndex.load(index_path).candidates_with_all(["postgresql"]) == ["cat"]
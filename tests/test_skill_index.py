@@ -0,0 +1,33 @@
+import json
+import os
+
+from app.skill_index import SkillIndex, load_skill_index, normalize_skill
+
+
+def write_skills(json_dir, stem, skills):
+    with open(os.path.join(json_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump({"skills": [{"name": name} for name in skills], "work_experience": []}, f)
+
+
+def test_aliases_resolve_to_one_spelling():
+    assert normalize_skill(" Postgres ") == normalize_skill("PostgreSQL") == "postgresql"
+    assert normalize_skill("RESTful  API") == "rest apis"
+
+
+def test_refresh_is_incremental_and_persisted(tmp_path):
+    json_dir, path = tmp_path / "processed-CVs", str(tmp_path / "index.json")
+    json_dir.mkdir()
+    write_skills(json_dir, "ann", ["Python", "Postgres"])
+    write_skills(json_dir, "bob", ["Python"])
+    index = load_skill_index(str(json_dir), path)
+    assert index.candidates_for_job({"must_have_skills": ["python", "PostgreSQL"]}) == ["ann"]
+
+    write_skills(json_dir, "bob", ["Python", "postgresql database"])
+    os.remove(json_dir / "ann.json")
+    counts = SkillIndex.load(path).refresh(str(json_dir))
+    assert counts == {"added": 0, "updated": 1, "removed": 1, "unchanged": 0}
+
+    index = load_skill_index(str(json_dir), path)
+    assert index.candidates_with_all(["python", "postgres"]) == ["bob"]
+    assert index.candidates_with_any(["sql", "python"]) == ["bob"]
+    assert index.overlap("bob", ["python", "k8s"]) == 1
@@ -0,0 +1,60 @@
+import os
+
+from app.cv_store import CVStore
+from app.model import CandidateCV, JobMatchResult
+from app.streaming import StreamingConfig, run_streaming
+from app.stub_llm import sample_candidate, sample_match
+
+from tests.conftest import write_pdf
+
+
+def analyze_fn(cv_text, source_file):
+    return CandidateCV.model_validate({**sample_candidate(cv_text), "source_file": source_file})
+
+
+def match(cv, job):
+    return JobMatchResult.model_validate(sample_match(job["job_id"], job["title"]))
+
+
+def test_each_cv_goes_through_on_its_own(tmp_path, inputs, knowledge_dir):
+    for stem in ("ann", "bob"):
+        write_pdf(os.path.join(inputs["pdf_files_path"], f"{stem}.pdf"), [f"{stem} knows Python"])
+    write_pdf(os.path.join(inputs["pdf_files_path"], "scan.pdf"), ["", "", "", ""])
+    results = {}
+    store = CVStore(str(tmp_path / "cv-store"))
+
+    summary = run_streaming(
+        inputs,
+        knowledge_dir,
+        StreamingConfig(extract_workers=1, analyze_concurrency=2, match_concurrency=2),
+        analyze_fn=analyze_fn,
+        batch_match_fn=lambda cv, jobs: [match(cv, job) for job in jobs],
+        on_result=lambda stem, matches: results.update({stem: len(matches)}),
+        cv_store=store,
+    )
+
+    assert (summary.total, summary.matched, summary.failed) == (3, 2, 1)
+    assert {o.stem: o.status for o in summary.outcomes}["scan"] == "extract_failed"
+    assert results == {"ann": 2, "bob": 2}
+    assert sorted(os.listdir(inputs["matches_output_path"])) == ["ann.json", "bob.json"]
+    assert store.load().ids == ["ann", "bob"]
+
+
+def test_unbatched_matching_calls_once_per_job(inputs, knowledge_dir):
+    write_pdf(os.path.join(inputs["pdf_files_path"], "ann.pdf"), ["ann knows Python"])
+    calls = []
+
+    def match_fn(cv, job):
+        calls.append(job["job_id"])
+        return match(cv, job)
+
+    summary = run_streaming(
+        inputs,
+        knowledge_dir,
+        StreamingConfig(extract_workers=1, batch_matching=False),
+        analyze_fn=analyze_fn,
+        match_fn=match_fn,
+    )
+
+    assert summary.matched == 1
+    assert sorted(calls) == ["JD-1", "JD-2"]
@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+from app.telemetry import MetricsRegistry, metrics, record_span, span
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def logged_spans(caplog):
+    return {(r.extra_fields["span"]["name"], r.levelno) for r in caplog.records if hasattr(r, "extra_fields")}
+
+
+def test_nested_counters_roll_up_into_the_stage_span():
+    with span("analyze", cv="jane") as outer:
+        with span("llm", cache="miss") as llm:
+            llm.set(prompt_tokens=100, retries=2)
+        with span("llm", cache="hit"):
+            pass
+    assert outer.as_dict()["children"] == {"prompt_tokens": 100, "retries": 2, "cache_misses": 1, "cache_hits": 1}
+
+
+def test_stage_and_notable_spans_are_logged_at_info(caplog):
+    caplog.set_level(logging.INFO, logger="app.telemetry")
+    with span("analyze", cv="jane"):
+        with span("llm"):
+            pass
+        with span("llm") as retried:
+            retried.set(retries=1)
+    with pytest.raises(ValueError):
+        with span("match", cv="john"):
+            with span("llm"):
+                raise ValueError("bad reply")
+
+    assert logged_spans(caplog) == {("analyze", logging.INFO), ("llm", logging.INFO), ("match", logging.INFO)}
+    failed = [r.extra_fields["span"] for r in caplog.records if r.extra_fields["span"]["name"] == "llm"]
+    assert {s["status"] for s in failed} == {"ok", "error"}
+
+
+def test_metrics_render_counters_and_histograms():
+    record_span("extract", 0.3, file="a.pdf", pages=2)
+    record_span("extract", 0.1, status="error", error="boom", file="b.pdf")
+    text = metrics.render()
+    assert 'hr_pipeline_spans_total{span="extract",stage="extract",status="error"} 1' in text
+    assert 'hr_pipeline_pages_total{span="extract",stage="extract"} 2' in text
+    assert 'hr_pipeline_span_duration_seconds_count{span="extract",stage="extract"} 2' in text
+    assert metrics.slowest_spans()["extract"][0]["file"] == "a.pdf"
+
+
+def test_slowest_keeps_the_top_spans():
+    registry = MetricsRegistry()
+    for i in range(10):
+        registry.track_slowest("match", float(i), {"cv": str(i)})
+    assert [s["cv"] for s in registry.slowest_spans()["match"]] == ["9", "8", "7", "6", "5"]
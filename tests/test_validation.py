@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.model import CandidateCV
+from app.stub_llm import sample_candidate
+from app.validation import validate_reply
+from benchmarks.mock_llm import MockLLM, corrupt_candidate
+
+
+def test_valid_reply_is_clean():
+    cv, report = validate_reply(json.dumps(sample_candidate("cv")), CandidateCV)
+    assert isinstance(cv, CandidateCV)
+    assert report.clean
+
+
+def test_code_fenced_reply_is_accepted():
+    _, report = validate_reply(f"```json\n{json.dumps(sample_candidate('cv'))}\n```", CandidateCV)
+    assert report.clean
+
+
+def test_mechanical_mistakes_are_coerced():
+    cv, report = validate_reply(corrupt_candidate(sample_candidate("cv")), CandidateCV)
+
+    assert str(cv.contact_information.linkedin) == "https://linkedin.com/in/candidate"
+    assert cv.work_experience[0].employment_type.value == "full_time"
+    assert cv.work_experience[0].start_date.isoformat() == "2019-03-01"
+    assert cv.education[0].gpa == 3.6
+    assert cv.agent_assessment.rating_score == 100
+    assert {
+        "contact_information.linkedin",
+        "work_experience.0.employment_type",
+        "work_experience.0.start_date",
+        "education.0.gpa",
+        "agent_assessment.rating_score",
+    } <= set(report.coerced)
+
+
+def test_invalid_values_are_dropped_without_a_model():
+    cv, report = validate_reply(corrupt_candidate(sample_candidate("cv")), CandidateCV)
+
+    # a bad list item, an object missing a required value, an optional field far out of range
+    assert [str(url) for url in cv.contact_information.other_links] == ["https://portfolio.example.com/"]
+    assert len(cv.education) == 1
+    assert cv.cv_analysis.job_hopping_score is None
+    assert {"contact_information.other_links.1", "education.1", "cv_analysis.job_hopping_score"} <= set(report.dropped)
+    assert report.repair_calls == 0
+
+
+def test_lost_objects_are_sent_to_one_repair_call():
+    prompts = []
+    mock = MockLLM()
+
+    def complete(prompt, response_model=None, **kwargs):
+        prompts.append(prompt)
+        return mock.complete(prompt, response_model, **kwargs)
+
+    cv, report = validate_reply(corrupt_candidate(sample_candidate("cv")), CandidateCV, complete)
+
+    assert report.repair_calls == 1 and len(prompts) == 1
+    assert report.repaired == ["education"]
+    assert "education" in prompts[0]
+    assert all(entry.institution for entry in cv.education)
+
+
+def test_missing_required_value_raises():
+    data = sample_candidate("cv")
+    del data["contact_information"]
+    with pytest.raises(ValidationError):
+        validate_reply(data, CandidateCV)
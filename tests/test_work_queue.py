@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from app.model import CandidateCV, JobMatchResult
+from app.pdf_extraction import ExtractionResult
+from app.stub_llm import sample_candidate, sample_match
+from app.work_queue import QueueWorker, WorkQueue
+
+
+def test_claim_moves_item_and_counts_attempts(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"))
+    assert queue.enqueue(["a", "b"]) == 2
+    assert queue.enqueue(["a", "c"]) == 1  # a is already queued
+
+    item = queue.claim("w1")
+    assert item.attempts == 1 and item.worker == "w1"
+    assert queue.count("pending") == 2 and queue.count("claimed") == 1
+    queue.complete(item, {stem: "matched" for stem in item.stems}, 0.1)
+    assert queue.count("claimed") == 0
+    assert queue.done_stems() == item.stems
+
+
+def test_expired_lease_is_requeued_then_failed(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"), lease_seconds=0, max_attempts=2)
+    queue.enqueue(["a"])
+
+    assert queue.claim("w1").attempts == 1
+    assert queue.requeue_expired() == 1
+    assert queue.count("pending") == 1
+
+    assert queue.claim("w2").attempts == 2
+    assert queue.requeue_expired() == 1
+    assert queue.count("failed") == 1 and queue.claim("w3") is None
+
+
+def test_release_requeues_then_fails_an_owned_claim(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"), max_attempts=2)
+    queue.enqueue(["a"])
+
+    queue.release(queue.claim("w1"), "boom")
+    assert queue.count("claimed") == 0 and queue.count("pending") == 1
+
+    item = queue.claim("w2")
+    assert item.errors == ["w1: boom"]
+    queue.release(item, "boom again")
+    assert queue.count("claimed") == queue.count("pending") == 0
+    assert queue.count("failed") == 1
+
+
+def test_batch_whose_cvs_all_fail_is_released(tmp_path, worker_inputs, knowledge_dir):
+    queue = WorkQueue(str(tmp_path / "queue"), max_attempts=3)
+    queue.enqueue(["a", "b"], batch_size=2)
+
+    make_worker(queue, worker_inputs, knowledge_dir, failing={"a", "b"}).run_item(queue.claim("w1"))
+
+    assert queue.count("claimed") == 0 and queue.count("pending") == 1
+
+
+def test_lost_claim_is_not_released(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"), lease_seconds=0)
+    queue.enqueue(["a"])
+    item = queue.claim("w1")
+    queue.requeue_expired()
+    queue.claim("w2")
+
+    queue.release(item, "boom")  # w2 owns it now
+    assert queue.count("claimed") == 1 and queue.count("pending") == 0
+
+
+@pytest.fixture
+def worker_inputs(inputs, knowledge_dir):
+    for stem in "abc":
+        with open(os.path.join(inputs["pdf_files_path"], f"{stem}.pdf"), "wb") as f:
+            f.write(stem.encode())
+    return inputs
+
+
+def make_worker(queue, inputs, knowledge_dir, failing):
+    def extract(pdf_path, out_dir):
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        if stem in failing:
+            return ExtractionResult(file_path=pdf_path, status="error", error="boom")
+        with open(os.path.join(out_dir, f"{stem}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"CV text of {stem}")
+        return ExtractionResult(file_path=pdf_path, status="success")
+
+    return QueueWorker(
+        queue,
+        inputs,
+        knowledge_dir,
+        extract_fn=extract,
+        analyze_fn=lambda text, source: CandidateCV.model_validate(sample_candidate(text)),
+        match_fn=lambda cv, jobs: [JobMatchResult.model_validate(sample_match(j["job_id"], j["title"])) for j in jobs],
+    )
+
+
+def test_partial_batch_completes_finished_cvs_and_retries_the_rest(tmp_path, worker_inputs, knowledge_dir):
+    queue = WorkQueue(str(tmp_path / "queue"), max_attempts=2)
+    queue.enqueue(["a", "b", "c"], batch_size=3)
+
+    make_worker(queue, worker_inputs, knowledge_dir, failing={"b"}).run()
+
+    assert queue.done_stems() == ["a", "c"]
+    assert queue.count("pending") == queue.count("claimed") == 0
+    [failed_id] = queue._ids("failed")
+    assert failed_id.startswith("retry-") and failed_id.endswith("-b")
+    assert queue.status().candidates_failed == 1
+
+
+def test_retried_cv_can_finish_later(tmp_path, worker_inputs, knowledge_dir):
+    queue = WorkQueue(str(tmp_path / "queue"), max_attempts=3)
+    queue.enqueue(["a", "b"], batch_size=2)
+    item = queue.claim("w1")
+    make_worker(queue, worker_inputs, knowledge_dir, failing={"b"}).run_item(item)
+    assert queue.count("pending") == 1
+
+    make_worker(queue, worker_inputs, knowledge_dir, failing=set()).run()
+
+    assert queue.done_stems() == ["a", "b"]
+    assert queue.count("failed") == 0
+    assert queue.enqueue(["a", "b"]) == 0